@@ -3,13 +3,38 @@ Question 4 — Smart Energy Grid Load Distribution Optimizer
 Run this file in VS Code with Python 3 installed.
 Required libraries: tkinter (built-in), matplotlib
 Install matplotlib if needed: pip install matplotlib
+
+Headless batch mode (no tkinter / matplotlib imported):
+    python Smart_Grid.py --batch --demand demand.csv --out results.csv
+    python Smart_Grid.py --help
 """
 
-import tkinter as tk
-from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.patches as mpatches
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import grid_cache
+import grid_exact
+import grid_merit
+import grid_stream
+import grid_worker
+from grid_profile import PROFILER
+
+# tkinter / matplotlib (GUI) and the NumPy engines (grid_batch,
+# grid_storage, grid_montecarlo, grid_store) are imported on first use,
+# so headless runs and worker processes start without them.
+tk = ttk = messagebox = filedialog = simpledialog = plt = FigureCanvasTkAgg = None
+
+
+def _load_gui():
+    """Import the GUI libraries (only needed by EnergyGridApp)."""
+    global tk, ttk, messagebox, filedialog, simpledialog, plt, FigureCanvasTkAgg
+    import tkinter as tk
+    from tkinter import ttk, messagebox, filedialog, simpledialog
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 #  DATA
 
@@ -39,7 +64,15 @@ DEMAND_DATA = {
 SOURCES = [
     {"id": "S1", "type": "Solar",  "max_cap": 50, "start":  6, "end": 18, "cost": 1.0, "color": "#F4C430"},
     {"id": "S2", "type": "Hydro",  "max_cap": 40, "start":  0, "end": 24, "cost": 1.5, "color": "#4FC3F7"},
-    {"id": "S3", "type": "Diesel", "max_cap": 60, "start": 17, "end": 23, "cost": 3.0, "color": "#EF5350"},
+    {"id": "S3", "type": "Diesel", "max_cap": 60, "start": 17, "end": 23, "cost": 3.0, "color": "#EF5350",
+    # Unit commitment limits (grid_unit.py); the greedy engines ignore them
+    "min_output": 15, "ramp_up": 20, "ramp_down": 20, "startup_cost": 40, "min_up": 3, "min_down": 2},
+]
+
+# Storage (charged from spare generation, discharged later in the day)
+STORAGE = [
+    {"id": "B1", "type": "Battery", "capacity": 60, "charge_rate": 20,
+    "discharge_rate": 20, "efficiency": 0.9, "color": "#AB47BC"},
 ]
 
 COLORS = {
@@ -60,8 +93,71 @@ COLORS = {
 
 
 
+RENEWABLE_TYPES = ("Solar", "Hydro")
+
+
+def source_types():
+    """Distinct source types in SOURCES order (allocation / table / chart keys)."""
+    return list(dict.fromkeys(s["type"] for s in SOURCES))
+
+
+def type_colors():
+    """{type: color} from the first source of each type."""
+    colors = {}
+    for s in SOURCES:
+        if "color" in s:
+            colors.setdefault(s["type"], s["color"])
+    return colors
+
+
+def district_names(demand_data=None):
+    """Districts of the demand profile, in the order of its first hour."""
+    data = demand_data if demand_data else DEMAND_DATA
+    return list(data[min(data)].keys()) if data else []
+
+
+
 #  ALGORITHM  (Greedy + ±10% tolerance)
 
+_MERIT_INDEX = None
+
+# Optional grid_network.Connectivity (sparse source -> district lines with
+# capacities). None means every source can reach every district without
+# line limits, so hourly demand is pooled.
+NETWORK = None
+
+
+def merit_index():
+    """
+    Merit-order index for SOURCES, built on first use and rebuilt as soon
+    as SOURCES no longer matches the list it was built from.
+    """
+    global _MERIT_INDEX
+    if _MERIT_INDEX is None or _MERIT_INDEX.key != grid_merit.sources_key(SOURCES):
+        _MERIT_INDEX = grid_merit.MeritOrderIndex(SOURCES)
+    return _MERIT_INDEX
+
+
+def invalidate_merit_index():
+    """Drop the index now (merit_index() also notices SOURCES edits itself)."""
+    global _MERIT_INDEX
+    _MERIT_INDEX = None
+
+
+def set_network(network):
+    """
+    Dispatch over a grid_network.Connectivity (None = pooled, no lines).
+    Cached what-if results are dropped, since they depend on the wiring.
+    """
+    global NETWORK
+    NETWORK = network
+    DISPATCH_CACHE.invalidate()
+
+
+def _exact_dispatcher():
+    return grid_exact.ExactDispatcher(SOURCES, RENEWABLE_TYPES, network=NETWORK)
+
+
 def allocate_hour(hour_str, demand_override=None):
     """
     For a given hour, greedily allocate the cheapest available
@@ -71,33 +167,36 @@ def allocate_hour(hour_str, demand_override=None):
     hour = int(hour_str)
     districts = demand_override if demand_override else DEMAND_DATA[hour_str]
     total_demand = sum(districts.values())
-
-    # Available sources sorted by cost (greedy: cheapest first)
-    avail = [s for s in SOURCES if s["start"] <= hour < s["end"]]
-    avail.sort(key=lambda x: x["cost"])
-
-    remaining = total_demand
-    allocations = {"Solar": 0, "Hydro": 0, "Diesel": 0}
-    cost = 0.0
-
-    for source in avail:
-        if remaining <= 0:
-            break
-        use = min(source["max_cap"], remaining)
-        allocations[source["type"]] += use
-        cost += use * source["cost"]
-        remaining -= use
+    allocations = dict.fromkeys(source_types(), 0)
+    served = None
+
+    if NETWORK is None:
+        # Greedy cheapest-first fill, via the precomputed merit order
+        # (binary search for the marginal source, see grid_merit.py)
+        used, cost, remaining = merit_index().dispatch(hour, total_demand)
+        allocations.update(used)
+        fulfilled = total_demand - max(remaining, 0)
+    else:
+        # Same merit order, but each source only feeds its linked
+        # districts up to the line capacities (see grid_network.py);
+        # districts the network does not know are left unserved
+        order = merit_index().merit_order(hour)
+        demand = [districts.get(d, 0) for d in NETWORK.districts]
+        used, served_vec, cost = NETWORK.dispatch(order, demand)
+        for s in order:
+            allocations[s["type"]] += used.get(s["id"], 0)
+        served = dict(zip(NETWORK.districts, served_vec))
+        fulfilled = sum(served_vec)
 
     # ±10% tolerance check
     tolerance = total_demand * 0.10
-    fulfilled = total_demand - max(remaining, 0)
     pct_met = round(fulfilled / total_demand * 100, 1) if total_demand > 0 else 0
     within_tolerance = abs(fulfilled - total_demand) <= tolerance
 
-    renewable = allocations["Solar"] + allocations["Hydro"]
+    renewable = sum(v for t, v in allocations.items() if t in RENEWABLE_TYPES)
     renewable_pct = round(renewable / fulfilled * 100, 1) if fulfilled > 0 else 0
 
-    return {
+    result = {
         "hour": hour_str,
         "districts": districts,
         "total_demand": total_demand,
@@ -107,28 +206,334 @@ def allocate_hour(hour_str, demand_override=None):
         "pct_met": pct_met,
         "within_tolerance": within_tolerance,
         "renewable_pct": renewable_pct,
-        "diesel_used": allocations["Diesel"] > 0,
+        "diesel_used": allocations.get("Diesel", 0) > 0,
     }
+    if served is not None:
+        result["served"] = served
+    return result
+
 
+ENGINES = ("greedy", "exact")
 
-def run_full_day(demand_data=None):
+
+def run_full_day(demand_data=None, engine="greedy"):
+    """
+    Dispatch every hour of the day.
+    engine="greedy" uses allocate_hour; engine="exact" solves each hour
+    as a min-cost flow that respects per-district routing (grid_exact.py).
+    """
     data = demand_data if demand_data else DEMAND_DATA
+    if engine == "exact":
+        return _exact_dispatcher().run(data)
+    if engine != "greedy":
+        raise ValueError(f"Unknown engine: {engine!r} (expected one of {ENGINES})")
     results = []
     for hour_str in sorted(data.keys()):
         results.append(allocate_hour(hour_str, data.get(hour_str)))
     return results
 
 
+def run_full_day_store(demand_data=None, engine="greedy"):
+    """
+    run_full_day packed into a columnar grid_store.ResultStore. The greedy
+    engine goes straight from the batch arrays, with no per-hour dicts.
+    """
+    import grid_store
+    if engine == "greedy":
+        return grid_store.ResultStore.from_batch(run_full_day_batch(demand_data), source_types())
+    return grid_store.ResultStore.from_results(run_full_day(demand_data, engine),
+                                            types=source_types())
+
+
+def run_days_store(days=1, engine="greedy", demand_data=None, progress=None):
+    """
+    Dispatch the demand profile repeated over `days` days into a
+    ResultStore. progress(fraction, text) is called as the run advances;
+    it may raise to abort (the GUI worker uses this for cancellation).
+    """
+    import numpy as np
+    import grid_batch
+    import grid_store
+    data = demand_data if demand_data else DEMAND_DATA
+    labels, hours, districts, demand = grid_batch.demand_matrix(data)
+
+    def day_labels(d):
+        return labels if days == 1 else [f"D{d + 1:03d} {h}" for h in labels]
+
+    types = source_types()
+    parts = []
+    chunk = 30
+    exact = _exact_dispatcher() if engine == "exact" else None
+    for first in range(0, days, chunk):
+        last = min(first + chunk, days)
+        if exact is None:
+            n = last - first
+            batch = grid_batch.allocate_batch(
+                np.tile(demand, (n, 1)), np.tile(hours, n), SOURCES,
+                labels=[lbl for d in range(first, last) for lbl in day_labels(d)],
+                districts=districts, network=NETWORK)
+            parts.append(grid_store.ResultStore.from_batch(batch, types).data)
+        else:
+            results = []
+            for d in range(first, last):
+                for lbl, h in zip(day_labels(d), labels):
+                    r = exact.allocate_hour(h, data[h])
+                    r["hour"] = lbl
+                    results.append(r)
+            parts.append(grid_store.ResultStore.from_results(results, districts, types).data)
+        if progress:
+            progress(last / days, f"{last}/{days} days dispatched")
+
+    return grid_store.ResultStore(np.concatenate(parts), districts, types)
+
+
+ARCHIVE_CHUNK_HOURS = 24 * 30
+
+
+def run_archive_store(path, start=None, end=None, engine="greedy", progress=None):
+    """
+    Dispatch a date range of a binary demand archive (grid_archive.py)
+    into a ResultStore. The greedy engine reads the memory-mapped rows
+    chunk by chunk with no per-hour dicts; gap rows are skipped.
+    """
+    import numpy as np
+    import grid_archive
+    import grid_batch
+    import grid_store
+    types = source_types()
+    with grid_archive.DemandArchive(path) as archive:
+        part = archive.slice(start, end)
+        districts = part.districts
+        exact = _exact_dispatcher() if engine == "exact" else None
+        parts = []
+        total = len(part)
+        for lo in range(0, total, ARCHIVE_CHUNK_HOURS):
+            chunk = grid_archive.ArchiveSlice(archive, part.lo + lo,
+                                            min(part.lo + lo + ARCHIVE_CHUNK_HOURS, part.hi))
+            if exact is None:
+                keep = chunk.present()
+                labels = [lbl for lbl, k in zip(chunk.labels(), keep) if k]
+                demand = chunk.demand if keep.all() else chunk.demand[keep]
+                # float32 -> float64 happens here anyway; rounding drops the
+                # float32 tails (25.3 -> 25.299999) from the table and labels
+                demand = np.round(demand.astype(float), 4)
+                batch = grid_batch.allocate_batch(demand, chunk.hours[keep], SOURCES, labels=labels,
+                                                districts=districts, network=NETWORK)
+                parts.append(grid_store.ResultStore.from_batch(batch, types).data)
+                del demand
+            else:
+                results = list(grid_stream.dispatch(chunk.readings(), exact.allocate_hour))
+                parts.append(grid_store.ResultStore.from_results(results, districts, types).data)
+            del chunk
+            if progress:
+                done = min(lo + ARCHIVE_CHUNK_HOURS, total)
+                progress(done / total, f"{done}/{total} hours dispatched")
+        del part
+    if not parts:
+        return grid_store.ResultStore.empty(districts, types)
+    return grid_store.ResultStore(np.concatenate(parts), districts, types)
+
+
+def compare_engines(demand_data=None):
+    """Run greedy and exact on the same data and report the cost gap."""
+    return grid_exact.cost_gap(run_full_day(demand_data, "greedy"),
+                            run_full_day(demand_data, "exact"))
+
+
+def run_full_day_batch(demand_data=None):
+    """
+    Same as run_full_day, but dispatches every hour in one vectorized
+    pass (see grid_batch.py). Returns an array-backed BatchResult;
+    call .to_results() for the list-of-dicts format.
+    """
+    import grid_batch
+    data = demand_data if demand_data else DEMAND_DATA
+    return grid_batch.allocate_demand_data(data, SOURCES, network=NETWORK)
+
+
+def run_full_day_with_storage(demand_data=None, battery=None, days=1, steps=20):
+    """
+    Greedy dispatch plus a battery scheduled by the SoC DP in
+    grid_storage.py. `days` repeats the demand profile to plan a
+    multi-day horizon (the DP cost grows linearly with it).
+    Returns the StoragePlan; .to_results() gives run_full_day style dicts.
+    """
+    import numpy as np
+    import grid_batch
+    import grid_storage
+    data = demand_data if demand_data else DEMAND_DATA
+    battery = battery if battery else STORAGE[0]
+    labels, hours, _, demand = grid_batch.demand_matrix(data)
+    if days > 1:
+        labels = [f"D{d + 1} {h}" for d in range(days) for h in labels]
+        hours = np.tile(hours, days)
+        demand = np.tile(demand, (days, 1))
+    return grid_storage.plan_storage(demand.sum(axis=1), hours, SOURCES, battery,
+                                    steps=steps, labels=labels)
+
+
+def run_full_day_commitment(demand_data=None, days=1, steps=10):
+    """
+    Unit commitment (grid_unit.py) for the demand profile repeated over
+    `days` days: ramp rates, start-up costs and minimum up / down times
+    are respected. Returns the CommitmentPlan; .to_results() gives
+    run_full_day style dicts.
+    """
+    import numpy as np
+    import grid_batch
+    import grid_unit
+    data = demand_data if demand_data else DEMAND_DATA
+    labels, hours, _, demand = grid_batch.demand_matrix(data)
+    if days > 1:
+        labels = [f"D{d + 1} {h}" for d in range(days) for h in labels]
+        hours = np.tile(hours, days)
+        demand = np.tile(demand, (days, 1))
+    return grid_unit.commit_units(demand.sum(axis=1), hours, SOURCES, steps=steps, labels=labels)
+
+
+def commitment_report(demand_data=None, days=1):
+    """
+    Commitment summary next to the greedy plan re-checked against the same
+    rules. Both sides report "objective" (cost plus the unserved penalty),
+    the figure the commitment bounds apply to.
+    """
+    import numpy as np
+    import grid_batch
+    import grid_unit
+    plan = run_full_day_commitment(demand_data, days)
+    data = demand_data if demand_data else DEMAND_DATA
+    _, hours, _, demand = grid_batch.demand_matrix(data)
+    hours, demand = np.tile(hours, days), np.tile(demand, (days, 1))
+    greedy = grid_batch.allocate_batch(demand, hours, SOURCES)
+    audit = grid_unit.audit(greedy.use, hours, SOURCES)
+    audit["total_cost"] = round(float(greedy.cost.sum()) + audit["startup_cost"], 2)
+    audit["unserved_kwh"] = round(float((demand.sum(axis=1) - greedy.fulfilled).sum()), 2)
+    audit["objective"] = round(audit["total_cost"] + plan.penalty * audit["unserved_kwh"], 2)
+    report = {"commitment": plan.summary(), "greedy": audit}
+    extra = report["commitment"]["unserved_kwh"] - audit["unserved_kwh"]
+    if extra > 0:
+        broken = sum(v for k, v in audit.items() if k.endswith("_violations"))
+        # Greedy ignores ramps and minimum times, so it can serve demand a
+        # feasible plan cannot; a cheaper total_cost here is not a saving
+        report["note"] = (f"commitment leaves {extra:g} kWh more unserved than greedy, "
+                        f"which breaks {broken} commitment rules to serve it")
+    return report
+
+
+# Shared what-if cache for single-hour runs (GUI clicks and scripted sweeps)
+DISPATCH_CACHE = grid_cache.DispatchCache(maxsize=256, on_sources_change=invalidate_merit_index)
+
+
+def allocate_hour_cached(hour_str, demand, engine="greedy"):
+    """
+    allocate_hour through DISPATCH_CACHE. Repeated (hour, demand, engine)
+    lookups skip the dispatch; the cache clears itself when SOURCES change.
+    """
+    def compute():
+        if engine == "exact":
+            return _exact_dispatcher().allocate_hour(hour_str, demand)
+        return allocate_hour(hour_str, demand)
+    return DISPATCH_CACHE.get(hour_str, demand, SOURCES, compute, engine)
+
+
+def simulate_risk(n_scenarios=10000, demand_noise=None, capacity_noise=None,
+                seed=0, workers=None):
+    """
+    Monte Carlo risk summary for DEMAND_DATA / SOURCES (see
+    grid_montecarlo.py): P50/P95/P99 daily cost, probability of missing
+    the ±10% tolerance and expected diesel hours.
+    """
+    import grid_montecarlo
+    return grid_montecarlo.run_monte_carlo(n_scenarios, DEMAND_DATA, SOURCES,
+                                        demand_noise=demand_noise,
+                                        capacity_noise=capacity_noise,
+                                        seed=seed, workers=workers)
+
+
+SWEEP_STEPS = 21
+
+
+def run_sweep(cost_type="Diesel", cap_type="Solar", cost_range=(0.5, 2.0),
+            cap_range=(0.5, 2.0), steps=SWEEP_STEPS, days=1, demand_path=None,
+            start=None, end=None, progress=None):
+    """
+    Sensitivity grid: `cost_type` cost x `cap_type` capacity multipliers
+    (steps x steps points) over DEMAND_DATA repeated `days` times, or over
+    a demand file (start / end: archive date range). Pooled greedy
+    dispatch; see grid_sweep.py. progress(fraction, text) is called while
+    the demand file is read and after every block of sweep points.
+    """
+    import numpy as np
+    import grid_batch
+    import grid_sweep
+    if demand_path:
+        hours, totals = [], []
+        for _, hour_str, districts in grid_stream.read_demand(demand_path, start, end):
+            hours.append(int(hour_str))
+            totals.append(sum(districts.values()))
+            if progress and len(hours) % 8760 == 0:
+                progress(0.0, f"{len(hours):,} hours read")
+        hours, totals = np.array(hours), np.array(totals, dtype=float)
+    else:
+        _, hours, _, demand = grid_batch.demand_matrix(DEMAND_DATA)
+        hours, totals = np.tile(hours, days), np.tile(demand.sum(axis=1), days)
+    return grid_sweep.sweep(totals, hours, SOURCES, cost_type, np.linspace(*cost_range, steps),
+                            cap_type, np.linspace(*cap_range, steps), RENEWABLE_TYPES,
+                            progress=progress)
+
+
+STREAM_PROGRESS_HOURS = 500
+
+
+def _count_lines(path):
+    """Newlines in a file, read in binary blocks (a cheap upper bound on its hours)."""
+    with open(path, "rb") as f:
+        return sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+
+
+def _with_progress(readings, total, progress):
+    """Pass readings through, reporting every STREAM_PROGRESS_HOURS of them."""
+    for n, reading in enumerate(readings, 1):
+        yield reading
+        if n % STREAM_PROGRESS_HOURS == 0:
+            progress(min(n / max(total, 1), 1.0), f"{n} hours dispatched")
+
+
+def stream_dispatch(path, sink, engine="greedy", progress=None):
+    """
+    Stream hourly demand from a CSV / JSON lines file through the allocator
+    into `sink` (see grid_stream.py). Memory use does not grow with the
+    file length. progress(fraction, text), if given, is called every
+    STREAM_PROGRESS_HOURS hours (the fraction is estimated from the line
+    count). Returns the number of hours dispatched.
+    """
+    if engine == "exact":
+        allocate = _exact_dispatcher().allocate_hour
+    else:
+        allocate = allocate_hour
+    readings = grid_stream.read_demand(path)
+    if progress:
+        readings = _with_progress(readings, _count_lines(path), progress)
+    return grid_stream.run_pipeline(readings, allocate, sink)
+
+
 #  GUI
 
 class EnergyGridApp:
+    DISTRICTS_PER_ROW = 2
+    LIVE_TICK_MS = 250              # GUI refresh period in live mode
+    LIVE_READINGS_PER_TICK = 6      # simulated hours arriving per tick
+
     def __init__(self, root):
+        _load_gui()
         self.root = root
         self.root.title(" Smart Energy Grid — Nepal Load Distribution Optimizer")
         self.root.geometry("1280x820")
         self.root.configure(bg=COLORS["bg"])
         self.root.resizable(True, True)
 
+        self.worker = grid_worker.SimulationWorker(self.root)
+        self.live = None
         self._build_ui()
         self._run_simulation()
 
@@ -173,33 +578,43 @@ class EnergyGridApp:
         # Hour selector
         tk.Label(frame, text="Select Hour:", font=("Consolas", 10),
                 bg=COLORS["card"], fg=COLORS["text"]).grid(row=1, column=0, sticky="w")
-        self.hour_var = tk.StringVar(value="06")
+        self.hour_var = tk.StringVar(value=min(DEMAND_DATA))
         hour_cb = ttk.Combobox(frame, textvariable=self.hour_var,
                             values=sorted(DEMAND_DATA.keys()), width=6, state="readonly")
         hour_cb.grid(row=1, column=1, padx=6)
 
-        # Demand override entries
-        tk.Label(frame, text="District A:", font=("Consolas", 10),
-                bg=COLORS["card"], fg=COLORS["text"]).grid(row=2, column=0, sticky="w", pady=4)
-        self.da_var = tk.StringVar(value="20")
-        tk.Entry(frame, textvariable=self.da_var, width=6,
-                bg=COLORS["border"], fg=COLORS["text"], insertbackground=COLORS["text"]).grid(row=2, column=1, padx=6)
-
-        tk.Label(frame, text="District B:", font=("Consolas", 10),
-                bg=COLORS["card"], fg=COLORS["text"]).grid(row=2, column=2, sticky="w")
-        self.db_var = tk.StringVar(value="15")
-        tk.Entry(frame, textvariable=self.db_var, width=6,
-                bg=COLORS["border"], fg=COLORS["text"], insertbackground=COLORS["text"]).grid(row=2, column=3, padx=6)
-
-        tk.Label(frame, text="District C:", font=("Consolas", 10),
-                bg=COLORS["card"], fg=COLORS["text"]).grid(row=3, column=0, sticky="w")
-        self.dc_var = tk.StringVar(value="25")
-        tk.Entry(frame, textvariable=self.dc_var, width=6,
-                bg=COLORS["border"], fg=COLORS["text"], insertbackground=COLORS["text"]).grid(row=3, column=1, padx=6)
+        # Dispatch engine selector
+        tk.Label(frame, text="Engine:", font=("Consolas", 10),
+                bg=COLORS["card"], fg=COLORS["text"]).grid(row=1, column=2, sticky="w")
+        self.engine_var = tk.StringVar(value="greedy")
+        ttk.Combobox(frame, textvariable=self.engine_var,
+                    values=ENGINES, width=8, state="readonly").grid(row=1, column=3, padx=6)
+
+        # Demand override entries, one per district of the profile
+        # (DISTRICTS_PER_ROW label / entry pairs per row)
+        self.demand_vars = {}
+        first_hour = DEMAND_DATA[min(DEMAND_DATA)]
+        for i, d in enumerate(district_names()):
+            row, col = 2 + i // self.DISTRICTS_PER_ROW, 2 * (i % self.DISTRICTS_PER_ROW)
+            tk.Label(frame, text=f"District {d}:", font=("Consolas", 10),
+                    bg=COLORS["card"], fg=COLORS["text"]).grid(row=row, column=col, sticky="w", pady=2)
+            var = tk.StringVar(value=str(first_hour[d]))
+            tk.Entry(frame, textvariable=var, width=6,
+                    bg=COLORS["border"], fg=COLORS["text"], insertbackground=COLORS["text"]).grid(row=row, column=col + 1, padx=6)
+            self.demand_vars[d] = var
+
+        # Simulation horizon (days of the demand profile), in the next free slot
+        n = len(self.demand_vars)
+        row, col = 2 + n // self.DISTRICTS_PER_ROW, 2 * (n % self.DISTRICTS_PER_ROW)
+        tk.Label(frame, text="Days:", font=("Consolas", 10),
+                bg=COLORS["card"], fg=COLORS["text"]).grid(row=row, column=col, sticky="w")
+        self.days_var = tk.StringVar(value="1")
+        tk.Entry(frame, textvariable=self.days_var, width=6,
+                bg=COLORS["border"], fg=COLORS["text"], insertbackground=COLORS["text"]).grid(row=row, column=col + 1, padx=6)
 
         # Buttons
         btn_frame = tk.Frame(frame, bg=COLORS["card"])
-        btn_frame.grid(row=4, column=0, columnspan=4, pady=(10, 0), sticky="w")
+        btn_frame.grid(row=row + 1, column=0, columnspan=4, pady=(10, 0), sticky="w")
 
         tk.Button(btn_frame, text=" Run Hour",
                 font=("Consolas", 10, "bold"),
@@ -213,12 +628,58 @@ class EnergyGridApp:
                 relief="flat", padx=12, pady=4,
                 command=self._run_simulation).pack(side="left", padx=(0, 8))
 
+        tk.Button(btn_frame, text=" Cancel",
+                font=("Consolas", 10),
+                bg=COLORS["card"], fg=COLORS["red"],
+                relief="flat", padx=8, pady=4,
+                command=self.worker.cancel).pack(side="left", padx=(0, 8))
+
         tk.Button(btn_frame, text=" Reset",
                 font=("Consolas", 10),
                 bg=COLORS["card"], fg=COLORS["subtext"],
                 relief="flat", padx=12, pady=4,
                 command=self._reset).pack(side="left")
 
+        # Second row: file / live / what-if tools
+        tool_frame = tk.Frame(frame, bg=COLORS["card"])
+        tool_frame.grid(row=row + 2, column=0, columnspan=4, pady=(6, 0), sticky="w")
+
+        tk.Button(tool_frame, text=" Stream File",
+                font=("Consolas", 10, "bold"),
+                bg=COLORS["yellow"], fg=COLORS["bg"],
+                relief="flat", padx=12, pady=4,
+                command=self._stream_file).pack(side="left", padx=(0, 8))
+
+        self.live_btn = tk.Button(tool_frame, text=" Live",
+                                font=("Consolas", 10, "bold"),
+                                bg=COLORS["red"], fg=COLORS["bg"],
+                                relief="flat", padx=12, pady=4,
+                                command=self._toggle_live)
+        self.live_btn.pack(side="left", padx=(0, 8))
+
+        tk.Button(tool_frame, text=" Sweep",
+                font=("Consolas", 10, "bold"),
+                bg=COLORS["accent"], fg=COLORS["bg"],
+                relief="flat", padx=12, pady=4,
+                command=self._run_sweep).pack(side="left", padx=(0, 8))
+
+        tk.Button(tool_frame, text=" Profile",
+                font=("Consolas", 10),
+                bg=COLORS["card"], fg=COLORS["subtext"],
+                relief="flat", padx=8, pady=4,
+                command=self._toggle_profiler).pack(side="left")
+
+        # What-if cache stats
+        self.cache_var = tk.StringVar(value="")
+        tk.Label(frame, textvariable=self.cache_var, font=("Consolas", 8),
+                bg=COLORS["card"], fg=COLORS["subtext"]).grid(row=row + 3, column=0, columnspan=4,
+                                                            sticky="w", pady=(6, 0))
+
+        # Background run progress
+        self.progress_var = tk.StringVar(value="")
+        tk.Label(frame, textvariable=self.progress_var, font=("Consolas", 8),
+                bg=COLORS["card"], fg=COLORS["accent"]).grid(row=row + 4, column=0, columnspan=4, sticky="w")
+
         # Hook hour selection to auto-fill demand
         hour_cb.bind("<<ComboboxSelected>>", self._on_hour_change)
 
@@ -269,10 +730,20 @@ class EnergyGridApp:
                 background=[("selected", COLORS["accent"])],
                 foreground=[("selected", COLORS["bg"])])
 
-        cols = ("Hour", "Solar", "Hydro", "Diesel", "Total", "Demand", "% Met", "Cost (Rs.)")
+        # Filter on the backing data (not the widgets)
+        import grid_table
+        self.filter_var = tk.StringVar(value="All hours")
+        filter_cb = ttk.Combobox(table_frame, textvariable=self.filter_var,
+                                values=list(grid_table.FILTERS), width=16, state="readonly")
+        filter_cb.pack(anchor="w", padx=8, pady=(0, 2))
+        filter_cb.bind("<<ComboboxSelected>>",
+                    lambda e: self.table.set_filter(self.filter_var.get()))
+
+        types = source_types()
+        cols = grid_table.table_columns(types)
         self.tree = ttk.Treeview(table_frame, columns=cols,
                                 show="headings", style="Grid.Treeview")
-        widths = [45, 55, 55, 55, 55, 60, 55, 75]
+        widths = [45] + [max(165 // max(len(types), 1), 40)] * len(types) + [55, 60, 55, 75]
         for col, w in zip(cols, widths):
             self.tree.heading(col, text=col)
             self.tree.column(col, width=w, anchor="center")
@@ -282,10 +753,13 @@ class EnergyGridApp:
         self.tree.tag_configure("ok",      background=COLORS["panel"])
         self.tree.tag_configure("warn",    background="#2B3020", foreground=COLORS["yellow"])
 
-        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        # Virtualized: only the visible rows exist as Treeview items; the
+        # scrollbar and heading clicks are driven by grid_table.VirtualTable
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical")
         self.tree.pack(side="left", fill="both", expand=True, padx=(8, 0), pady=4)
         scrollbar.pack(side="right", fill="y", pady=4)
+        self.table = grid_table.VirtualTable(self.tree, scrollbar, types, rowheight=22)
+        self.table.render = PROFILER.wrap("table_render", self.table.render)
 
     def _build_charts(self, parent):
         tk.Label(parent, text="ANALYTICS DASHBOARD",
@@ -302,230 +776,470 @@ class EnergyGridApp:
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=parent)
         self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=4, pady=4)
+        # draw_idle() ends in canvas.draw(), so this times the real repaint
+        self.canvas.draw = PROFILER.wrap("redraw", self.canvas.draw)
+
+        import grid_charts
+        self.charts = grid_charts.DashboardCharts(self.fig, self.axes, self.canvas, COLORS,
+                                                source_types(), type_colors())
 
     # Logic 
     def _on_hour_change(self, event=None):
         h = self.hour_var.get()
         if h in DEMAND_DATA:
-            d = DEMAND_DATA[h]
-            self.da_var.set(str(d["A"]))
-            self.db_var.set(str(d["B"]))
-            self.dc_var.set(str(d["C"]))
+            self._fill_demand(DEMAND_DATA[h])
+            self._run_single_hour()
+
+    def _fill_demand(self, demand):
+        for d, var in self.demand_vars.items():
+            var.set(str(demand.get(d, 0)))
 
     def _run_single_hour(self):
+        self._stop_live()
+        self.worker.cancel()
         hour = self.hour_var.get()
         try:
-            demand = {
-                "A": int(self.da_var.get()),
-                "B": int(self.db_var.get()),
-                "C": int(self.dc_var.get()),
-            }
+            demand = {d: int(var.get()) for d, var in self.demand_vars.items()}
         except ValueError:
             messagebox.showerror("Input Error", "Please enter valid integer demand values.")
             return
 
-        result = allocate_hour(hour, demand)
+        with PROFILER.stage("dispatch"):
+            result = allocate_hour_cached(hour, demand, self.engine_var.get())
         self._show_single_result(result)
+        self._update_cache_stats()
 
-    def _show_single_result(self, r):
-        # Clear table and show just this hour
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+    def _update_cache_stats(self):
+        st = DISPATCH_CACHE.stats()
+        self.cache_var.set(f"Cache: {st['size']}/{st['maxsize']} entries | "
+                        f"{st['hits']} hits, {st['misses']} misses ({st['hit_rate']}%)")
 
-        tag = "diesel" if r["diesel_used"] else ("warn" if not r["within_tolerance"] else "ok")
-        alloc = r["allocations"]
-        self.tree.insert("", "end", values=(
-            r["hour"],
-            alloc["Solar"], alloc["Hydro"], alloc["Diesel"],
-            int(r["fulfilled"]), r["total_demand"],
-            f"{r['pct_met']}%", f"{r['cost']}"
-        ), tags=(tag,))
+    def _show_single_result(self, r):
+        # Show just this hour in the table
+        import grid_store
+        self._populate_table(grid_store.ResultStore.from_results([r], types=self.table.types))
 
         # KPI for single hour
-        self.kpi_labels["total_cost"].config(text=f"Rs. {r['cost']}")
-        self.kpi_labels["renewable_pct"].config(text=f"{r['renewable_pct']}%")
-        self.kpi_labels["diesel_hours"].config(text="Yes" if r["diesel_used"] else "No")
-        self.kpi_labels["avg_met"].config(text=f"{r['pct_met']}%")
+        with PROFILER.stage("update_kpis"):
+            self.kpi_labels["total_cost"].config(text=f"Rs. {r['cost']}")
+            self.kpi_labels["renewable_pct"].config(text=f"{r['renewable_pct']}%")
+            self.kpi_labels["diesel_hours"].config(text="Yes" if r["diesel_used"] else "No")
+            self.kpi_labels["avg_met"].config(text=f"{r['pct_met']}%")
 
         self._update_single_charts(r)
 
     def _update_single_charts(self, r):
-        for ax in self.axes.flat:
-            ax.clear()
-            ax.set_facecolor(COLORS["panel"])
-            ax.tick_params(colors=COLORS["subtext"], labelsize=7)
-            for spine in ax.spines.values():
-                spine.set_edgecolor(COLORS["border"])
-
         alloc = r["allocations"]
-
-        # Chart 1: Source breakdown pie
-        ax = self.axes[0][0]
-        vals = [alloc["Solar"], alloc["Hydro"], alloc["Diesel"]]
-        labels = ["Solar", "Hydro", "Diesel"]
-        colors = [COLORS["solar"], COLORS["hydro"], COLORS["diesel"]]
-        non_zero = [(v, l, c) for v, l, c in zip(vals, labels, colors) if v > 0]
-        if non_zero:
-            ax.pie([x[0] for x in non_zero], labels=[x[1] for x in non_zero],
-                colors=[x[2] for x in non_zero], autopct="%1.0f%%",
-                textprops={"color": COLORS["text"], "fontsize": 8},
-                startangle=90)
-        ax.set_title(f"Hour {r['hour']} — Source Mix", color=COLORS["accent"], fontsize=9, pad=6)
-
-        # Chart 2: District demand bar
-        ax2 = self.axes[0][1]
-        dists = list(r["districts"].keys())
-        vals2 = list(r["districts"].values())
-        bars = ax2.bar(dists, vals2, color=[COLORS["accent"], COLORS["green"], COLORS["yellow"]], width=0.5)
-        ax2.set_title("District Demand (kWh)", color=COLORS["accent"], fontsize=9, pad=6)
-        ax2.set_ylabel("kWh", color=COLORS["subtext"], fontsize=7)
-        for bar, val in zip(bars, vals2):
-            ax2.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.3,
-                    str(val), ha="center", va="bottom", color=COLORS["text"], fontsize=8)
-
-        # Chart 3: Cost breakdown
-        ax3 = self.axes[1][0]
-        sources_used = [(k, v * (1.0 if k == "Solar" else 1.5 if k == "Hydro" else 3.0))
-                        for k, v in alloc.items() if v > 0]
-        if sources_used:
-            ax3.bar([s[0] for s in sources_used], [s[1] for s in sources_used],
-                    color=[COLORS["solar"] if s[0] == "Solar" else COLORS["hydro"] if s[0] == "Hydro" else COLORS["diesel"]
-                        for s in sources_used], width=0.4)
-        ax3.set_title("Cost per Source (Rs.)", color=COLORS["accent"], fontsize=9, pad=6)
-        ax3.set_ylabel("Rs.", color=COLORS["subtext"], fontsize=7)
-
-        # Chart 4: Fulfillment gauge
-        ax4 = self.axes[1][1]
-        pct = r["pct_met"]
-        color = COLORS["green"] if pct >= 90 else COLORS["yellow"] if pct >= 70 else COLORS["red"]
-        ax4.barh(["Fulfilled"], [pct], color=color, height=0.4)
-        ax4.barh(["Fulfilled"], [100], color=COLORS["border"], height=0.4)
-        ax4.barh(["Fulfilled"], [pct], color=color, height=0.4)
-        ax4.set_xlim(0, 100)
-        ax4.set_title(f"Demand Fulfilled: {pct}%", color=COLORS["accent"], fontsize=9, pad=6)
-        ax4.text(pct / 2, 0, f"{pct}%", ha="center", va="center",
-                color=COLORS["bg"], fontsize=12, fontweight="bold")
-
-        self.fig.tight_layout(pad=1.5)
-        self.canvas.draw()
+        unit_cost = {}
+        for src in SOURCES:
+            unit_cost.setdefault(src["type"], src["cost"])
+        cost_by_type = {k: v * unit_cost.get(k, 0) for k, v in alloc.items() if v > 0}
+        with PROFILER.stage("charts"):
+            self.charts.show_single(r["hour"], alloc, r["districts"], cost_by_type, r["pct_met"])
 
     def _run_simulation(self):
-        results = run_full_day()
-        self._populate_table(results)
-        self._update_kpis(results)
-        self._update_full_day_charts(results)
-
-    def _populate_table(self, results):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        for r in results:
-            tag = "diesel" if r["diesel_used"] else ("warn" if not r["within_tolerance"] else "ok")
-            alloc = r["allocations"]
-            self.tree.insert("", "end", values=(
-                r["hour"],
-                alloc["Solar"], alloc["Hydro"], alloc["Diesel"],
-                int(r["fulfilled"]), r["total_demand"],
-                f"{r['pct_met']}%", f"{r['cost']}"
-            ), tags=(tag,))
-
-    def _update_kpis(self, results):
-        total_cost = sum(r["cost"] for r in results)
-        avg_renewable = sum(r["renewable_pct"] for r in results) / len(results)
-        diesel_hours = sum(1 for r in results if r["diesel_used"])
-        avg_met = sum(r["pct_met"] for r in results) / len(results)
-
-        self.kpi_labels["total_cost"].config(text=f"Rs. {total_cost:,.1f}")
-        self.kpi_labels["renewable_pct"].config(text=f"{avg_renewable:.1f}%")
-        self.kpi_labels["diesel_hours"].config(text=f"{diesel_hours} hrs")
-        self.kpi_labels["avg_met"].config(text=f"{avg_met:.1f}%")
-
-    def _update_full_day_charts(self, results):
-        for ax in self.axes.flat:
-            ax.clear()
-            ax.set_facecolor(COLORS["panel"])
-            ax.tick_params(colors=COLORS["subtext"], labelsize=7)
-            for spine in ax.spines.values():
-                spine.set_edgecolor(COLORS["border"])
+        try:
+            days = int(self.days_var.get())
+        except ValueError:
+            messagebox.showerror("Input Error", "Please enter a whole number of days.")
+            return
+        days = max(days, 1)
+        engine = self.engine_var.get()
+        self._stop_live()
+
+        # Dispatch runs on a worker thread; a newer run cancels this one
+        self.progress_var.set(f"Running {days} day(s)...")
+        def job(ctx):
+            with PROFILER.stage("dispatch"):
+                return run_days_store(days, engine, progress=ctx.progress)
+
+        self.worker.submit(
+            job,
+            on_done=self._show_simulation,
+            on_progress=lambda frac, text: self.progress_var.set(f"{frac * 100:.0f}% — {text}"),
+            on_error=lambda e: (self.progress_var.set(""),
+                                messagebox.showerror("Simulation Error", str(e))),
+            on_cancel=lambda: self.progress_var.set("Cancelled"),
+        )
+
+    def _show_simulation(self, store):
+        self.progress_var.set(f"Done — {len(store)} hours")
+        self._populate_table(store)
+        self._update_kpis(store)
+        self._update_full_day_charts(store)
+
+    def _populate_table(self, store):
+        with PROFILER.stage("populate_table"):
+            self.table.set_store(store)
+
+    def _stream_file(self):
+        path = filedialog.askopenfilename(
+            title="Open hourly demand",
+            filetypes=[("Demand data", "*.csv *.jsonl *.ndjson *.gridarc"), ("All files", "*.*")])
+        if not path:
+            return
+        self._stop_live()
+        self.worker.cancel()
+        if path.lower().endswith(".gridarc"):
+            self._open_archive(path)
+            return
+        engine = self.engine_var.get()
+
+        def job(ctx):
+            import grid_store
+            kpis = grid_stream.KpiAggregator()
+            rows = grid_store.StoreBuilder(types=source_types())
+            with PROFILER.stage("dispatch"):
+                stream_dispatch(path, grid_stream.TeeSink(rows, kpis), engine, progress=ctx.progress)
+            return rows.build(), kpis.summary()
+
+        self.progress_var.set(f"Dispatching {os.path.basename(path)}...")
+        self.worker.submit(
+            job,
+            on_done=self._show_stream,
+            on_progress=lambda frac, text: self.progress_var.set(f"{frac * 100:.0f}% — {text}"),
+            on_error=lambda e: (self.progress_var.set(""),
+                                messagebox.showerror("Input Error", f"Could not read demand file:\n{e}")),
+            on_cancel=lambda: self.progress_var.set("Cancelled"),
+        )
+
+    def _show_stream(self, result):
+        store, summary = result
+        self.progress_var.set(f"Done — {len(store)} hours")
+        self._populate_table(store)
+        self.kpi_labels["total_cost"].config(text=f"Rs. {summary['total_cost']:,.1f}")
+        self.kpi_labels["renewable_pct"].config(text=f"{summary['avg_renewable_pct']:.1f}%")
+        self.kpi_labels["diesel_hours"].config(text=f"{summary['diesel_hours']} hrs")
+        self.kpi_labels["avg_met"].config(text=f"{summary['avg_met_pct']:.1f}%")
+
+    def _open_archive(self, path):
+        """Dispatch a date range of a binary archive on the worker thread."""
+        span = simpledialog.askstring(
+            "Date range", "Start and end, e.g. 2024-01-01 2024-02-01\n(leave blank for everything)",
+            parent=self.root)
+        if span is None:
+            return
+        bounds = span.split()
+        if len(bounds) not in (0, 2):
+            messagebox.showerror("Input Error", "Enter two dates, or leave blank.")
+            return
+        start, end = bounds if bounds else (None, None)
+        engine = self.engine_var.get()
+        self.progress_var.set(f"Dispatching {os.path.basename(path)}...")
+        self.worker.submit(
+            lambda ctx: run_archive_store(path, start, end, engine, progress=ctx.progress),
+            on_done=self._show_simulation,
+            on_progress=lambda frac, text: self.progress_var.set(f"{frac * 100:.0f}% — {text}"),
+            on_error=lambda e: (self.progress_var.set(""),
+                                messagebox.showerror("Input Error", f"Could not read archive:\n{e}")),
+            on_cancel=lambda: self.progress_var.set("Cancelled"),
+        )
+
+    # Live mode: a simulated feed dispatched on after() ticks, KPIs from
+    # running / sliding-window sums (see grid_realtime.py)
+    def _toggle_live(self):
+        if self.live is not None:
+            self._stop_live()
+            return
+        import grid_realtime
+        self.worker.cancel()
+        self.live = grid_realtime.LiveDispatcher(allocate_hour, history=24)
+        self.live_feed = grid_realtime.SimulatedFeed(DEMAND_DATA)
+        self.live_btn.config(text=" Stop Live")
+        self._live_tick()
+
+    def _stop_live(self):
+        if self.live is None:
+            return
+        self.root.after_cancel(self._live_job)
+        self.live = None
+        self.live_btn.config(text=" Live")
+
+    def _live_tick(self):
+        self.live.submit(self.live_feed.poll(self.LIVE_READINGS_PER_TICK))
+        with PROFILER.stage("dispatch"):
+            done = self.live.tick()
+        if done:
+            self._show_live()
+        self._live_job = self.root.after(self.LIVE_TICK_MS, self._live_tick)
+
+    def _show_live(self):
+        import grid_store
+        live = self.live
+        store = grid_store.ResultStore.from_results(live.recent, types=self.table.types)
+        self._populate_table(store)
+        self._update_full_day_charts(store)
+
+        kpis = live.kpis()
+        day = kpis["day"]
+        self.kpi_labels["total_cost"].config(text=f"Rs. {day['total_cost']:,.1f}")
+        self.kpi_labels["renewable_pct"].config(text=f"{day['avg_renewable_pct']:.1f}%")
+        self.kpi_labels["diesel_hours"].config(text=f"{day['diesel_hours']} hrs")
+        self.kpi_labels["avg_met"].config(text=f"{day['avg_met_pct']:.1f}%")
+
+        st = live.stats()
+        self.progress_var.set(
+            f"Live {store[-1]['hour']} | cost hour/day/week: "
+            + " / ".join(f"{kpis[w]['total_cost']:,.0f}" for w in ("hour", "day", "week"))
+            + f" | tick {st['last_tick_ms']:.1f}/{st['budget_ms']} ms, backlog {st['backlog']}")
+
+    def _run_sweep(self):
+        """Diesel cost x solar capacity sweep over the Days horizon, in a new window."""
+        try:
+            days = max(int(self.days_var.get()), 1)
+        except ValueError:
+            messagebox.showerror("Input Error", "Please enter a whole number of days.")
+            return
+        self._stop_live()
+        self.progress_var.set(f"Sweeping {SWEEP_STEPS}x{SWEEP_STEPS} scenarios over {days} day(s)...")
+        self.worker.submit(
+            lambda ctx: run_sweep(days=days, progress=ctx.progress),
+            on_done=self._show_sweep,
+            on_progress=lambda frac, text: self.progress_var.set(f"{frac * 100:.0f}% — {text}"),
+            on_error=lambda e: (self.progress_var.set(""),
+                                messagebox.showerror("Sweep Error", str(e))),
+            on_cancel=lambda: self.progress_var.set("Cancelled"),
+        )
+
+    def _show_sweep(self, result):
+        import grid_sweep
+        self.progress_var.set(f"Sweep done — {result.points} scenarios, "
+                            f"{result.merit_orders} merit orders")
+        win = tk.Toplevel(self.root)
+        win.title("Cost / Capacity Sensitivity")
+        win.configure(bg=COLORS["bg"])
+        fig = plt.Figure(figsize=(10, 4.5))
+        grid_sweep.plot_heatmaps(fig, result, COLORS)
+        FigureCanvasTkAgg(fig, master=win).get_tk_widget().pack(fill="both", expand=True)
+
+    # Stage timings (grid_profile.py); profiling is on while the panel is open
+    PROFILE_REFRESH_MS = 500
+
+    def _toggle_profiler(self):
+        if getattr(self, "profile_win", None) is not None:
+            self._close_profiler()
+            return
+        PROFILER.enabled = True
+        win = self.profile_win = tk.Toplevel(self.root)
+        win.title("Stage Timings (ms)")
+        win.configure(bg=COLORS["bg"])
+        win.protocol("WM_DELETE_WINDOW", self._close_profiler)
+        self.profile_text = tk.Label(win, text="", justify="left", anchor="nw",
+                                    font=("Consolas", 9), bg=COLORS["panel"], fg=COLORS["text"],
+                                    padx=10, pady=8)
+        self.profile_text.pack(fill="both", expand=True, padx=6, pady=6)
+        bar = tk.Frame(win, bg=COLORS["bg"])
+        bar.pack(fill="x", padx=6, pady=(0, 6))
+        tk.Button(bar, text=" Export JSONL", font=("Consolas", 9), relief="flat",
+                bg=COLORS["accent"], fg=COLORS["bg"],
+                command=self._export_profile).pack(side="left", padx=(0, 6))
+        tk.Button(bar, text=" Reset", font=("Consolas", 9), relief="flat",
+                bg=COLORS["card"], fg=COLORS["subtext"],
+                command=PROFILER.reset).pack(side="left")
+        self._refresh_profiler()
 
-        hours = [r["hour"] for r in results]
-        solar  = [r["allocations"]["Solar"]  for r in results]
-        hydro  = [r["allocations"]["Hydro"]  for r in results]
-        diesel = [r["allocations"]["Diesel"] for r in results]
-        demand = [r["total_demand"] for r in results]
-        costs  = [r["cost"] for r in results]
-
-        x = range(len(hours))
-
-        # Chart 1: Stacked area — energy mix over the day
-        ax1 = self.axes[0][0]
-        ax1.stackplot(x, solar, hydro, diesel,
-                    labels=["Solar", "Hydro", "Diesel"],
-                    colors=[COLORS["solar"], COLORS["hydro"], COLORS["diesel"]],
-                    alpha=0.85)
-        ax1.plot(x, demand, color="white", linewidth=1.5, linestyle="--", label="Demand")
-        ax1.set_xticks(x[::2])
-        ax1.set_xticklabels(hours[::2], rotation=45, fontsize=6)
-        ax1.set_title("Energy Mix vs Demand (24h)", color=COLORS["accent"], fontsize=9, pad=6)
-        ax1.set_ylabel("kWh", color=COLORS["subtext"], fontsize=7)
-        ax1.legend(loc="upper left", fontsize=6,
-                facecolor=COLORS["card"], edgecolor=COLORS["border"],
-                labelcolor=COLORS["text"])
-
-        # Chart 2: Hourly cost
-        ax2 = self.axes[0][1]
-        bar_colors = [COLORS["red"] if r["diesel_used"] else COLORS["green"] for r in results]
-        ax2.bar(x, costs, color=bar_colors, width=0.7)
-        ax2.set_xticks(x[::2])
-        ax2.set_xticklabels(hours[::2], rotation=45, fontsize=6)
-        ax2.set_title("Hourly Cost (Rs.) — Red = Diesel Used", color=COLORS["accent"], fontsize=9, pad=6)
-        ax2.set_ylabel("Rs.", color=COLORS["subtext"], fontsize=7)
-
-        # Chart 3: Renewable % per hour
-        ax3 = self.axes[1][0]
-        ren_pct = [r["renewable_pct"] for r in results]
-        ax3.fill_between(x, ren_pct, alpha=0.4, color=COLORS["green"])
-        ax3.plot(x, ren_pct, color=COLORS["green"], linewidth=1.5)
-        ax3.axhline(y=80, color=COLORS["yellow"], linestyle="--", linewidth=0.8, label="80% target")
-        ax3.set_xticks(x[::2])
-        ax3.set_xticklabels(hours[::2], rotation=45, fontsize=6)
-        ax3.set_ylim(0, 110)
-        ax3.set_title("Renewable Energy % per Hour", color=COLORS["accent"], fontsize=9, pad=6)
-        ax3.set_ylabel("%", color=COLORS["subtext"], fontsize=7)
-        ax3.legend(fontsize=6, facecolor=COLORS["card"],
-                edgecolor=COLORS["border"], labelcolor=COLORS["text"])
-
-        # Chart 4: Source totals pie
-        ax4 = self.axes[1][1]
-        total_solar  = sum(solar)
-        total_hydro  = sum(hydro)
-        total_diesel = sum(diesel)
-        vals   = [total_solar, total_hydro, total_diesel]
-        labels = [f"Solar\n{total_solar} kWh", f"Hydro\n{total_hydro} kWh", f"Diesel\n{total_diesel} kWh"]
-        colors = [COLORS["solar"], COLORS["hydro"], COLORS["diesel"]]
-        explode = [0.03, 0.03, 0.08]
-        non_zero = [(v, l, c, e) for v, l, c, e in zip(vals, labels, colors, explode) if v > 0]
-        if non_zero:
-            ax4.pie([n[0] for n in non_zero], labels=[n[1] for n in non_zero],
-                    colors=[n[2] for n in non_zero], explode=[n[3] for n in non_zero],
-                    autopct="%1.0f%%",
-                    textprops={"color": COLORS["text"], "fontsize": 7},
-                    startangle=140)
-        ax4.set_title("Full Day — Source Totals", color=COLORS["accent"], fontsize=9, pad=6)
-
-        self.fig.tight_layout(pad=1.5)
-        self.canvas.draw()
+    def _refresh_profiler(self):
+        if getattr(self, "profile_win", None) is None:
+            return
+        self.profile_text.config(text=PROFILER.format_table())
+        self.profile_job = self.root.after(self.PROFILE_REFRESH_MS, self._refresh_profiler)
+
+    def _close_profiler(self):
+        PROFILER.enabled = False
+        self.root.after_cancel(self.profile_job)
+        self.profile_win.destroy()
+        self.profile_win = None
+
+    def _export_profile(self):
+        path = filedialog.asksaveasfilename(
+            parent=self.profile_win, title="Export stage timings", defaultextension=".jsonl",
+            filetypes=[("JSON lines", "*.jsonl"), ("All files", "*.*")])
+        if path:
+            n = PROFILER.export_jsonl(path)
+            self.progress_var.set(f"Exported {n} timing samples to {os.path.basename(path)}")
+
+    def _update_kpis(self, store):
+        with PROFILER.stage("update_kpis"):
+            kpis = store.kpis()
+            total_cost = kpis["total_cost"]
+            avg_renewable = kpis["avg_renewable_pct"]
+            diesel_hours = kpis["diesel_hours"]
+            avg_met = kpis["avg_met_pct"]
+
+            self.kpi_labels["total_cost"].config(text=f"Rs. {total_cost:,.1f}")
+            self.kpi_labels["renewable_pct"].config(text=f"{avg_renewable:.1f}%")
+            self.kpi_labels["diesel_hours"].config(text=f"{diesel_hours} hrs")
+            self.kpi_labels["avg_met"].config(text=f"{avg_met:.1f}%")
+
+    def _update_full_day_charts(self, store):
+        # Column views straight from the store (no copies); the chart
+        # layer updates its existing artists in place
+        with PROFILER.stage("charts"):
+            self.charts.show_full_day(
+                hours=store.column("hour"),
+                by_type={t: store.column(t) for t in self.charts.types},
+                demand=store.column("total_demand"),
+                costs=store.column("cost"),
+                diesel_used=store.column("diesel_used"),
+                renewable_pct=store.column("renewable_pct"),
+                totals=store.totals_by_type(),
+            )
 
     def _reset(self):
-        self.hour_var.set("06")
-        self.da_var.set("20")
-        self.db_var.set("15")
-        self.dc_var.set("25")
+        self._stop_live()
+        self.hour_var.set(min(DEMAND_DATA))
+        self.engine_var.set("greedy")
+        self.filter_var.set("All hours")
+        self.table.set_filter("All hours")
+        self._fill_demand(DEMAND_DATA[min(DEMAND_DATA)])
+        self.days_var.set("1")
         self._run_simulation()
 
 
-#  ENTRY POINT
+#  HEADLESS BATCH MODE
 
-if __name__ == "__main__":
+GUI_MODULES = ("tkinter", "matplotlib")
+IMPORT_BUDGET_MS = 100
+
+
+def load_sources(path):
+    """
+    Replace SOURCES with a JSON list of source dicts (same keys). Sources
+    may add a "districts" list and / or a "line_caps" {district: kWh}
+    dict; if any do, dispatch switches to that sparse network.
+    """
+    with open(path) as f:
+        SOURCES[:] = json.load(f)
+    invalidate_merit_index()
+    if any("districts" in s or "line_caps" in s for s in SOURCES):
+        import grid_network
+        districts = district_names()
+        for s in SOURCES:
+            districts += [d for d in s.get("districts", s.get("line_caps", ())) if d not in districts]
+        set_network(grid_network.Connectivity.from_sources(SOURCES, districts))
+    else:
+        set_network(None)
+
+
+def run_batch(demand_path=None, out_path=None, kpi_path=None, engine="greedy",
+            start=None, end=None):
+    """
+    Dispatch a demand file (or DEMAND_DATA) and write per-hour results
+    (CSV, or JSON lines for .jsonl) plus a KPI summary. Streams, so the
+    input can be any length; start / end pick a range of a .gridarc
+    archive. Returns the KPI dict.
+    """
+    if engine == "exact":
+        allocate = _exact_dispatcher().allocate_hour
+    else:
+        allocate = allocate_hour
+    readings = grid_stream.read_demand(demand_path, start, end) if demand_path \
+        else grid_stream.iter_demand_data(DEMAND_DATA)
+
+    kpis = grid_stream.KpiAggregator()
+    sinks = [kpis]
+    if out_path:
+        if out_path.lower().endswith((".jsonl", ".ndjson")):
+            sinks.append(grid_stream.JsonlSink(out_path))
+        else:
+            sinks.append(grid_stream.CsvSink(out_path))
+    grid_stream.run_pipeline(readings, allocate, grid_stream.TeeSink(*sinks))
+
+    summary = kpis.summary()
+    summary["engine"] = engine
+    if kpi_path:
+        with open(kpi_path, "w") as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+def check_import_budget(budget_ms=IMPORT_BUDGET_MS):
+    """
+    Import this module in a fresh interpreter with -X importtime.
+    Returns (ok, import_ms, gui_modules_loaded).
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import Smart_Grid"],
+                        cwd=here, capture_output=True, text=True, check=True)
+    import_ms = 0.0
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if name.split(".")[0] in GUI_MODULES:
+            loaded.add(name.split(".")[0])
+        if name == "Smart_Grid":
+            import_ms = int(cumulative) / 1000
+    return import_ms <= budget_ms and not loaded, import_ms, sorted(loaded)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Smart Energy Grid load distribution optimizer")
+    parser.add_argument("--batch", action="store_true",
+                        help="run headless (no GUI) and write results / KPIs")
+    parser.add_argument("--demand", help="hourly demand file (.csv, .jsonl or .gridarc); default DEMAND_DATA")
+    parser.add_argument("--start", help="first timestamp to use from a .gridarc archive")
+    parser.add_argument("--end", help="stop before this timestamp (.gridarc archive)")
+    parser.add_argument("--sources", help="JSON file with the SOURCES list")
+    parser.add_argument("--engine", choices=ENGINES, default="greedy")
+    parser.add_argument("--out", help="per-hour results (.csv or .jsonl)")
+    parser.add_argument("--kpis", help="write the KPI summary to this JSON file")
+    parser.add_argument("--sweep", metavar="PNG",
+                        help="run a cost / capacity sensitivity sweep and save its heatmaps")
+    parser.add_argument("--sweep-cost", default="Diesel", help="source type whose cost is varied")
+    parser.add_argument("--sweep-cap", default="Solar", help="source type whose capacity is varied")
+    parser.add_argument("--sweep-steps", type=int, default=SWEEP_STEPS)
+    parser.add_argument("--commit", action="store_true",
+                        help="unit commitment for the demand profile; prints it next to greedy")
+    parser.add_argument("--days", type=int, default=1, help="days to plan with --commit")
+    parser.add_argument("--check-imports", action="store_true",
+                        help="fail if importing this module loads GUI libraries or exceeds the budget")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    if args.check_imports:
+        ok, import_ms, loaded = check_import_budget(args.budget_ms)
+        print(f"import Smart_Grid: {import_ms:.1f} ms (budget {args.budget_ms:.0f} ms)"
+            + (f", GUI modules loaded: {', '.join(loaded)}" if loaded else ""))
+        return 0 if ok else 1
+
+    if args.sweep:
+        import grid_sweep
+        if args.sources:
+            load_sources(args.sources)
+        result = run_sweep(args.sweep_cost, args.sweep_cap, steps=args.sweep_steps,
+                        demand_path=args.demand, start=args.start, end=args.end)
+        grid_sweep.save_heatmaps(result, args.sweep)
+        cost_mult, cap_mult, cost = result.best()
+        print(f"{result.points} scenarios ({result.merit_orders} merit orders) -> {args.sweep}")
+        print(f"Cheapest: {args.sweep_cost} cost x{cost_mult:.2f}, "
+            f"{args.sweep_cap} capacity x{cap_mult:.2f}: Rs. {cost:,.2f}")
+        return 0
+
+    if args.commit:
+        if args.sources:
+            load_sources(args.sources)
+        print(json.dumps(commitment_report(days=args.days), indent=2))
+        return 0
+
+    if args.batch:
+        if args.sources:
+            load_sources(args.sources)
+        summary = run_batch(args.demand, args.out, args.kpis, args.engine, args.start, args.end)
+        if not args.kpis:
+            print(json.dumps(summary, indent=2))
+        return 0
+
+    _load_gui()
     root = tk.Tk()
     app = EnergyGridApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    return 0
+
+
+#  ENTRY POINT
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -1,15 +1,20 @@
 """
 Question 5(a) — Tourist Spot Optimizer
-GUI-based Itinerary Planner with Heuristic (Greedy) + Brute Force Comparison
+GUI-based Itinerary Planner with Heuristic (Greedy) + Exact Solver Comparison
+(Held-Karp subset DP over the whole catalog, or the original brute force)
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import math
 import itertools
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+from tour_distance import MATRIX_MAX_SPOTS, distance_matrix, haversine_km
+from tour_spatial import spot_index
+from tour_tags import decode, encode, tag_bits, tag_masks
+
 # ─────────────────────────────────────────────
 #  DATASET
 # ─────────────────────────────────────────────
@@ -40,83 +45,146 @@ COLORS = {
 }
 
 ALL_TAGS = sorted(set(tag for s in SPOTS for tag in s["tags"]))
+TAG_BITS = tag_bits(ALL_TAGS)   # interests and spot tags as bitmasks
+
+TRAVEL_HOURS = 0.3   # between consecutive spots
+START_POS = {"lat": 27.7104, "lon": 85.3488}   # near city centre
 
 # ─────────────────────────────────────────────
 #  ALGORITHMS
 # ─────────────────────────────────────────────
 
-def euclidean_distance(a, b):
-    """Distance in km (approximate using coordinate difference)."""
-    return math.sqrt((a["lat"] - b["lat"])**2 + (a["lon"] - b["lon"])**2) * 111
+def count_matches(spots, interests):
+    """Total interest matches over a few spots: popcount(tags & interests)."""
+    mask = encode(interests, TAG_BITS)
+    return sum((encode(s["tags"], TAG_BITS) & mask).bit_count() for s in spots)
 
 
-def score_spot(spot, current_pos, interests, budget_left, current_hour):
-    """Score a spot for greedy selection."""
-    interest_match = len(set(spot["tags"]) & set(interests))
-    dist = euclidean_distance(current_pos, spot)
+def score_spot(spot, current_pos, interests, budget_left, current_hour, dist=None, match=None):
+    """
+    Score a spot for greedy selection (dist: km from current_pos, match:
+    interest matches, if known).
+    """
+    interest_match = count_matches([spot], interests) if match is None else match
+    if dist is None:
+        dist = haversine_km(current_pos, spot)
     fee_penalty = spot["fee"] / 100
     score = interest_match * 20 - dist * 3 - fee_penalty
     return score
 
 
+def route_km(route, start=START_POS):
+    """Length of an itinerary from `start` in km, read from the cached matrix."""
+    if len(SPOTS) > MATRIX_MAX_SPOTS:
+        legs = zip([start] + route[:-1], route)
+        return sum(haversine_km(a, b) for a, b in legs)
+    dm = distance_matrix(SPOTS, start)
+    index = {id(s): i for i, s in enumerate(SPOTS)}
+    return dm.route_km([index[id(s)] for s in route])
+
+
+def nearest_spots():
+    """
+    A function (pos, at) -> (catalog index, km) pairs from `pos`, nearest
+    first, ties in catalog order; `at` is pos's own catalog index (None
+    for START_POS). Small catalogs read a sorted row of the distance
+    matrix, large ones walk the spatial index, so callers can stop as
+    soon as distance rules out the rest.
+    """
+    if len(SPOTS) > MATRIX_MAX_SPOTS:
+        index = spot_index(SPOTS)
+        return lambda pos, at: index.nearest(pos["lat"], pos["lon"])
+    dm = distance_matrix(SPOTS, START_POS)
+
+    def from_matrix(pos, at):
+        row = dm.km[dm.start if at is None else at, :dm.n_spots]
+        order = np.argsort(row, kind="stable")
+        return zip(order.tolist(), row[order].tolist())
+    return from_matrix
+
+
 def greedy_itinerary(budget, total_hours, interests, start_hour=9):
-    """Greedy heuristic: always pick the highest-scoring unvisited affordable spot."""
+    """
+    Greedy heuristic: always pick the highest-scoring unvisited affordable
+    spot (lowest catalog index on ties). Candidates come nearest first and
+    the scan stops once even a full interest match that far away could not
+    beat the best score, so each step only looks at a neighbourhood.
+    Feasibility is checked per candidate during that walk; the day ends
+    early once no spot in the catalog could still fit.
+    """
     current_hour = start_hour
     remaining_budget = budget
-    visited = []
+    route = []
     reasons = []
-    current_pos = {"lat": 27.7104, "lon": 85.3488}  # Start near city centre
+    current_pos = START_POS
+    at = None
+    nearest = nearest_spots()
+    tags = tag_masks(SPOTS, ALL_TAGS)
+    wanted = tags.interest_mask(interests)
+    matches = tags.matches(interests).tolist()
+    max_match = max(matches, default=0)
+    cheapest = min((s["fee"] for s in SPOTS), default=0)
+    shortest = min((s["duration"] for s in SPOTS), default=0)
+    latest   = max((s["close"] for s in SPOTS), default=0)
+    visited = set()
 
     while True:
-        best_spot = None
+        best_i = None
         best_score = -999
-        best_reason = ""
+        best_dist = 0.0
 
-        for spot in SPOTS:
-            if spot in visited:
-                continue
-            if spot["fee"] > remaining_budget:
+        # Nothing fits any more: stop without walking the whole catalog
+        if cheapest > remaining_budget or current_hour + shortest > latest \
+                or (current_hour - start_hour) + shortest > total_hours:
+            break
+
+        for i, dist in nearest(current_pos, at):
+            # Fees only lower a score, so nothing further away can win
+            if max_match * 20 - dist * 3 < best_score:
+                break
+            spot = SPOTS[i]
+            if i in visited or spot["fee"] > remaining_budget:
                 continue
             if current_hour < spot["open"] or current_hour + spot["duration"] > spot["close"]:
                 continue
             if (current_hour - start_hour) + spot["duration"] > total_hours:
                 continue
+            s = score_spot(spot, current_pos, interests, remaining_budget, current_hour, dist, matches[i])
+            if s > best_score or (s == best_score and best_i is not None and i < best_i):
+                best_i, best_score, best_dist = i, s, dist
 
-            s = score_spot(spot, current_pos, interests, remaining_budget, current_hour)
-            tag_hits = set(spot["tags"]) & set(interests)
-            dist = euclidean_distance(current_pos, spot)
-
-            reason = f"Interest match ({', '.join(tag_hits) if tag_hits else 'none'}), " \
-                    f"dist={dist:.2f}km, fee=Rs.{spot['fee']}, score={s:.1f}"
-
-            if s > best_score:
-                best_score = s
-                best_spot = spot
-                best_reason = reason
-
-        if best_spot is None:
+        if best_i is None:
             break
 
-        visited.append(best_spot)
-        reasons.append(best_reason)
+        best_spot = SPOTS[best_i]
+        tag_hits = decode(int(tags.masks[best_i]) & wanted, ALL_TAGS)
+        reasons.append(f"Interest match ({', '.join(tag_hits) if tag_hits else 'none'}), "
+                    f"dist={best_dist:.2f}km, fee=Rs.{best_spot['fee']}, score={best_score:.1f}")
+        visited.add(best_i)
+        route.append(best_spot)
         remaining_budget -= best_spot["fee"]
-        current_hour += best_spot["duration"] + 0.3   # 0.3h travel
+        current_hour += best_spot["duration"] + TRAVEL_HOURS
         current_pos = best_spot
+        at = best_i
 
-    return visited, reasons
+    return route, reasons
 
 
-def brute_force_itinerary(budget, total_hours, interests, start_hour=9):
+def brute_force_itinerary(budget, total_hours, interests, start_hour=9, stats=None):
     """Brute force: try all permutations of spots (small dataset only)."""
     small_spots = SPOTS[:6]   # limit to 6 for performance
     best = []
     best_score = -1
+    checked = rejected = 0
+    match = dict(zip(map(id, small_spots), tag_masks(small_spots, ALL_TAGS).matches(interests).tolist()))
 
     for r in range(1, len(small_spots) + 1):
         for perm in itertools.permutations(small_spots, r):
+            checked += 1
             total_fee = sum(s["fee"] for s in perm)
-            total_time = sum(s["duration"] + 0.3 for s in perm)
+            total_time = sum(s["duration"] + TRAVEL_HOURS for s in perm)
             if total_fee > budget or total_time > total_hours:
+                rejected += 1
                 continue
             # Check open hours sequentially
             valid = True
@@ -125,18 +193,309 @@ def brute_force_itinerary(budget, total_hours, interests, start_hour=9):
                 if hour < spot["open"] or hour + spot["duration"] > spot["close"]:
                     valid = False
                     break
-                hour += spot["duration"] + 0.3
+                hour += spot["duration"] + TRAVEL_HOURS
             if not valid:
+                rejected += 1
                 continue
 
-            interest_score = sum(len(set(s["tags"]) & set(interests)) for s in perm)
+            interest_score = sum(match[id(s)] for s in perm)
             if interest_score > best_score or (interest_score == best_score and len(perm) > len(best)):
                 best_score = interest_score
                 best = list(perm)
 
+    if stats is not None:
+        stats.update(expanded=checked, pruned=rejected)
     return best
 
 
+def _complete_itinerary(spots, match, budget, total_hours, start_hour, prefix=()):
+    """
+    Quick feasible route for held_karp_itinerary to beat: from the spots
+    in `prefix` (indices, in visiting order), keep adding the spot that
+    still fits with the most interest per hour (shortest first on ties),
+    and also try the most interest outright. Returns the better
+    (interest score, length).
+    """
+    hours = [s["duration"] + TRAVEL_HOURS for s in spots]
+
+    def walk(rank):
+        route = list(prefix)
+        clock = start_hour + sum(hours[i] for i in route)
+        spend = sum(spots[i]["fee"] for i in route)
+        left = set(range(len(spots))) - set(route)
+        while True:
+            fits = [i for i in left
+                    if spend + spots[i]["fee"] <= budget
+                    and clock - start_hour + hours[i] <= total_hours
+                    and spots[i]["open"] <= clock and clock + spots[i]["duration"] <= spots[i]["close"]]
+            if not fits:
+                return sum(int(match[i]) for i in route), len(route)
+            i = min(fits, key=rank)
+            left.discard(i)
+            route.append(i)
+            clock += hours[i]
+            spend += spots[i]["fee"]
+
+    return max(walk(lambda i: (-match[i] / hours[i], hours[i], i)),
+               walk(lambda i: (-match[i], hours[i], i)))
+
+
+def _knapsack_bound(alive, value, weight, capacity):
+    """
+    Fractional knapsack value per state (rows of `alive`) over its alive
+    spots; `value` / `weight` are already in best-ratio-first order.
+    """
+    w = np.where(alive, weight, 0.0)
+    before = np.cumsum(w, axis=1) - w
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac = np.where(weight > 0, (capacity[:, None] - before) / weight, 1.0)
+    return (np.clip(frac, 0.0, 1.0) * alive * value).sum(axis=1)
+
+
+def _fit_count(alive, weight, capacity):
+    """Most alive spots per state that fit `capacity`; `weight` is sorted ascending."""
+    used = np.cumsum(np.where(alive, weight, 0.0), axis=1)
+    return (alive & (used <= capacity[:, None] + 1e-9)).sum(axis=1)
+
+
+def held_karp_itinerary(budget, total_hours, interests, start_hour=9, spots=None, stats=None):
+    """
+    Exact solver: subset DP over (visited mask, last spot) states, same
+    rules and objective as brute_force_itinerary but over the whole
+    catalog. Each state carries its clock (earliest arrival at the next
+    spot), elapsed time and spend; states are grown one spot per layer
+    with NumPy. Only feasible extensions are kept, and a state is dropped
+    once it cannot beat the best route known so far (greedy completions,
+    from scratch and of each layer's most promising state, set that bar
+    long before the DP reaches full-length routes). Its bound counts only
+    the spots it can still use (unvisited, affordable, not yet closed) and
+    is the least of the top interests that fit the slots left and
+    fractional knapsacks over the budget and the hours left.
+    stats (optional dict) receives states built / dropped by the bound.
+    """
+    spots = SPOTS if spots is None else spots
+    n = len(spots)
+    built = dropped = 0
+    if stats is not None:
+        stats.update(expanded=0, pruned=0)
+    if n == 0:
+        return []
+    fee  = np.array([s["fee"] for s in spots], dtype=float)
+    dur  = np.array([s["duration"] for s in spots], dtype=float)
+    open_ = np.array([s["open"] for s in spots], dtype=float)
+    close = np.array([s["close"] for s in spots], dtype=float)
+    match = tag_masks(spots, ALL_TAGS).matches(interests)
+    step = dur + TRAVEL_HOURS
+    # Visited sets are multi-word masks: spot i is bit i % 64 of word i // 64
+    idx = np.arange(n)
+    word = idx // 64
+    bits = np.left_shift(np.uint64(1), (idx % 64).astype(np.uint64))
+    # Spot orders for the bound: by interest, by interest per rupee / per hour
+    by_match = np.argsort(-match, kind="stable")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        by_fee = np.argsort(-np.where(fee > 0, match / fee, np.inf), kind="stable")
+    by_step = np.argsort(-match / step, kind="stable")
+    shortest, cheapest = np.argsort(step, kind="stable"), np.argsort(fee, kind="stable")
+
+    # Layer 1: every spot on its own (parent -1)
+    mask = np.zeros((n, (n + 63) // 64), dtype=np.uint64)
+    mask[idx, word] = bits
+    layer = {
+        "mask": mask, "last": idx,
+        "clock": start_hour + step, "elapsed": 0 + step,
+        "spend": fee.copy(), "score": match.copy(), "parent": np.full(n, -1),
+    }
+    ok = (fee <= budget) & (step <= total_hours) & (start_hour >= open_) & (start_hour + dur <= close)
+    layer = {k: v[ok] for k, v in layer.items()}
+
+    layers = []
+    best_score, best_len, best_at = -1, 0, None
+    # A route of the seed's score and length is known to exist, so only
+    # states that can match it (or beat the best so far) are worth keeping
+    seed_score, seed_len = _complete_itinerary(spots, match, budget, total_hours, start_hour)
+    while len(layer["mask"]):
+        layers.append(layer)
+        built += len(layer["mask"])
+        k = len(layers)
+        i = int(layer["score"].argmax())
+        if layer["score"][i] > best_score or (layer["score"][i] == best_score and k > best_len):
+            best_score, best_len, best_at = int(layer["score"][i]), k, i
+
+        # Spots each state could still add later (the clock only moves on)
+        clock = layer["clock"][:, None]
+        alive = ((layer["mask"][:, word] & bits) == 0) \
+            & (layer["spend"][:, None] + fee <= budget) \
+            & (layer["elapsed"][:, None] + step <= total_hours) \
+            & (clock + dur <= close)
+        hours_left = total_hours - layer["elapsed"]
+        room = ((hours_left + 1e-9) // step.min()).astype(int)
+        ranked = alive[:, by_match]
+        top = (np.where(np.cumsum(ranked, axis=1) <= room[:, None], ranked, False)
+               * match[by_match]).sum(axis=1)
+        extra = np.minimum.reduce([
+            top,
+            _knapsack_bound(alive[:, by_fee], match[by_fee], fee[by_fee], budget - layer["spend"]),
+            _knapsack_bound(alive[:, by_step], match[by_step], step[by_step], hours_left),
+        ])
+        bound = layer["score"] + np.floor(extra + 1e-9).astype(int)
+        longest = k + np.minimum(_fit_count(alive[:, shortest], step[shortest], hours_left),
+                                 _fit_count(alive[:, cheapest], fee[cheapest], budget - layer["spend"]))
+        # Finish the most promising state greedily: a better seed prunes more
+        j = int(np.lexsort((layer["score"], bound))[-1])
+        prefix = []
+        for back in reversed(layers):
+            prefix.append(int(back["last"][j]))
+            j = int(back["parent"][j])
+        seed_score, seed_len = max((seed_score, seed_len), _complete_itinerary(
+            spots, match, budget, total_hours, start_hour, prefix[::-1]))
+
+        # Keep a state only if its best case (score, then length) beats the bar
+        bar_score, bar_len = max((best_score, best_len), (seed_score, seed_len - 1))
+        hopeful = (bound > bar_score) | ((bound == bar_score) & (longest > bar_len))
+        dropped += int((~hopeful).sum())
+        kept = np.flatnonzero(hopeful)
+
+        # Extend every kept state by every spot it can reach in time
+        ok = alive[kept] & (layer["clock"][kept, None] >= open_)
+        rows, cols = np.nonzero(ok)
+        rows = kept[rows]
+        mask = layer["mask"][rows]
+        mask[np.arange(len(rows)), word[cols]] |= bits[cols]
+        nxt = {
+            "mask": mask, "last": cols,
+            "clock": layer["clock"][rows] + step[cols],
+            "elapsed": layer["elapsed"][rows] + step[cols],
+            "spend": layer["spend"][rows] + fee[cols],
+            "score": layer["score"][rows] + match[cols], "parent": rows,
+        }
+        # Travel time is fixed, so every order of the same spots ends at the
+        # same clock with the same spend and score: keep one state per mask
+        key = nxt["mask"]
+        order = np.lexsort((nxt["clock"],) + tuple(key.T))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (key[order][1:] != key[order][:-1]).any(axis=1)
+        layer = {k: v[order[first]] for k, v in nxt.items()}
+
+    if stats is not None:
+        stats.update(expanded=built, pruned=dropped)
+    if best_at is None:
+        return []
+    route = []
+    i = best_at
+    for layer in reversed(layers[:best_len]):
+        route.append(spots[int(layer["last"][i])])
+        i = int(layer["parent"][i])
+    return route[::-1]
+
+
+def branch_and_bound_itinerary(budget, total_hours, interests, start_hour=9, spots=None, stats=None):
+    """
+    Exact solver: depth-first branch and bound with the same rules and
+    objective as brute_force_itinerary. Fee, clock, elapsed time and
+    interest score are carried down the tree, so a prefix is checked once
+    and never extended when it breaks the budget or an opening window.
+    Travel time is fixed, so every order of the same spots reaches the
+    same clock, spend and score: like held_karp_itinerary's one state per
+    mask, a visited set is expanded only the first time it is reached.
+    A node is also cut when even its best case cannot beat the best
+    itinerary found so far; that bound is the least of the top remaining
+    interests that fit the time slots, a fractional knapsack over the
+    budget left and one over the hours left.
+    stats (optional dict) receives nodes expanded and pruned, by reason.
+    """
+    spots = SPOTS if spots is None else spots
+    n = len(spots)
+    matches = tag_masks(spots, ALL_TAGS).matches(interests).tolist()
+    steps = [s["duration"] + TRAVEL_HOURS for s in spots]
+    min_step = min(steps, default=1.0)
+    fees = [s["fee"] for s in spots]
+    by_match = sorted(range(n), key=lambda i: -matches[i])   # best-first children
+    # Interest per rupee / per hour, best first, for the knapsack bounds
+    by_fee = sorted(range(n), key=lambda i: -matches[i] / fees[i] if fees[i] else -float("inf"))
+    by_step = sorted(range(n), key=lambda i: -matches[i] / steps[i])
+    counts = dict.fromkeys(("expanded", "pruned_budget", "pruned_time",
+                            "pruned_bound", "pruned_dominated"), 0)
+    used = [False] * n
+    seen = set()
+    path = []
+    best = {"score": -1, "route": []}
+
+    def knapsack(order, weight, capacity, fits):
+        """Fractional knapsack value of the spots in `fits` (integer floor)."""
+        value = 0.0
+        for i in order:
+            if not fits[i] or not matches[i]:
+                continue
+            if weight[i] <= capacity:
+                value += matches[i]
+                capacity -= weight[i]
+            else:
+                value += matches[i] * capacity / weight[i]
+                break
+        return int(value + 1e-9)
+
+    def optimistic(score, hour, elapsed, spend):
+        """Upper bound on (score, length) of any extension of this prefix."""
+        fits = [not used[i] and spend + fees[i] <= budget and elapsed + steps[i] <= total_hours
+                and hour + spots[i]["duration"] <= spots[i]["close"] for i in range(n)]
+        room = int((total_hours - elapsed + 1e-9) // min_step)
+        extra = added = 0
+        for i in by_match:
+            if added == room:
+                break
+            if fits[i]:
+                extra += matches[i]
+                added += 1
+        extra = min(extra,
+                    knapsack(by_fee, fees, budget - spend, fits),
+                    knapsack(by_step, steps, total_hours - elapsed, fits))
+        return score + extra, len(path) + added
+
+    def visit(score, hour, elapsed, spend, visited):
+        if visited in seen:
+            counts["pruned_dominated"] += 1
+            return
+        seen.add(visited)
+        if path and (score > best["score"] or
+                     (score == best["score"] and len(path) > len(best["route"]))):
+            best["score"], best["route"] = score, list(path)
+        top, longest = optimistic(score, hour, elapsed, spend)
+        if top < best["score"] or (top == best["score"] and longest <= len(best["route"])):
+            counts["pruned_bound"] += 1
+            return
+        counts["expanded"] += 1
+        for i in by_match:
+            if used[i]:
+                continue
+            s = spots[i]
+            if spend + s["fee"] > budget:
+                counts["pruned_budget"] += 1
+                continue
+            if elapsed + steps[i] > total_hours or hour < s["open"] or hour + s["duration"] > s["close"]:
+                counts["pruned_time"] += 1
+                continue
+            used[i] = True
+            path.append(s)
+            visit(score + matches[i], hour + steps[i], elapsed + steps[i], spend + s["fee"],
+                  visited | 1 << i)
+            path.pop()
+            used[i] = False
+
+    visit(0, start_hour, 0, 0, 0)
+    if stats is not None:
+        stats.update(counts)
+        stats["pruned"] = sum(v for k, v in counts.items() if k.startswith("pruned_"))
+    return best["route"]
+
+
+# Exact solvers offered next to the greedy heuristic (GUI choice)
+SOLVERS = {
+    "Held-Karp DP":          held_karp_itinerary,
+    "Branch & Bound":        branch_and_bound_itinerary,
+    "Brute Force (6 spots)": brute_force_itinerary,
+}
+
+
 # ─────────────────────────────────────────────
 #  GUI APPLICATION
 # ─────────────────────────────────────────────
@@ -249,6 +608,11 @@ class TouristApp:
         tag_frame = tk.Frame(frame, bg=COLORS["card"])
         tag_frame.grid(row=4, column=1, sticky="w", pady=(8, 0))
 
+        label(5, "🧮 Exact Solver:")
+        self.solver_var = tk.StringVar(value=next(iter(SOLVERS)))
+        ttk.Combobox(frame, textvariable=self.solver_var, values=list(SOLVERS),
+                    state="readonly", width=20).grid(row=5, column=1, sticky="w", padx=8, pady=4)
+
         self.tag_vars = {}
         for i, tag in enumerate(ALL_TAGS):
             var = tk.BooleanVar(value=tag in ["culture", "nature"])
@@ -312,9 +676,9 @@ class TouristApp:
         nb.add(tab1, text=" 🤖 Greedy Result ")
         self._build_itinerary_tree(tab1, "greedy")
 
-        # Tab 2 — Brute Force
+        # Tab 2 — Exact solver
         tab2 = tk.Frame(nb, bg=COLORS["card"])
-        nb.add(tab2, text=" 🔢 Brute Force ")
+        nb.add(tab2, text=" 🔢 Exact Solver ")
         self._build_itinerary_tree(tab2, "brute")
 
         # Tab 3 — Comparison
@@ -408,21 +772,24 @@ class TouristApp:
 
         greedy_spots, reasons = greedy_itinerary(budget, hours, interests, start_hour)
 
-        self.status_var.set("⏳ Running brute force (first 6 spots)...")
+        solver = self.solver_var.get()
+        self.status_var.set(f"⏳ Running {solver}...")
         self.root.update()
 
-        brute_spots = brute_force_itinerary(budget, hours, interests, start_hour)
+        stats = {}
+        brute_spots = SOLVERS[solver](budget, hours, interests, start_hour, stats=stats)
 
         self._populate_tree(self.greedy_tree, greedy_spots, start_hour)
         self._populate_tree(self.brute_tree,  brute_spots,  start_hour)
         self._update_kpis(greedy_spots, interests, start_hour)
         self._update_reasons(reasons, greedy_spots)
-        self._update_comparison(greedy_spots, brute_spots, interests)
-        self._draw_charts(greedy_spots, brute_spots)
+        self._update_comparison(greedy_spots, brute_spots, interests, solver, stats)
+        self._draw_charts(greedy_spots, brute_spots, solver)
 
         self.status_var.set(
             f"✅ Done! Greedy found {len(greedy_spots)} spots | "
-            f"Brute force found {len(brute_spots)} spots (from first 6)"
+            f"{solver} found {len(brute_spots)} spots "
+            f"({stats['expanded']:,} expanded, {stats['pruned']:,} pruned)"
         )
 
     def _populate_tree(self, tree, spots, start_hour):
@@ -439,12 +806,12 @@ class TouristApp:
                 ", ".join(s["tags"]),
                 f"{int(hour):02d}:00"
             ), tags=(tag,))
-            hour += s["duration"] + 0.3
+            hour += s["duration"] + TRAVEL_HOURS
 
     def _update_kpis(self, spots, interests, start_hour):
         total_cost  = sum(s["fee"] for s in spots)
-        total_time  = sum(s["duration"] + 0.3 for s in spots)
-        total_match = sum(len(set(s["tags"]) & set(interests)) for s in spots)
+        total_time  = sum(s["duration"] + TRAVEL_HOURS for s in spots)
+        total_match = count_matches(spots, interests)
 
         self.kpis["kpi_spots"].config(text=str(len(spots)))
         self.kpis["kpi_cost"].config(text=f"{total_cost:,}")
@@ -460,33 +827,35 @@ class TouristApp:
             self.reason_text.insert("end", f"     → {reason}\n\n")
         self.reason_text.config(state="disabled")
 
-    def _update_comparison(self, greedy, brute, interests):
+    def _update_comparison(self, greedy, brute, interests, solver, stats):
         self.cmp_text.config(state="normal")
         self.cmp_text.delete(1.0, "end")
 
         def write(text, tag=None):
             self.cmp_text.insert("end", text, tag)
 
-        write("GREEDY vs BRUTE FORCE COMPARISON\n\n", "heading")
+        write(f"GREEDY vs {solver.upper()} COMPARISON\n\n", "heading")
 
         g_cost  = sum(s["fee"] for s in greedy)
         b_cost  = sum(s["fee"] for s in brute)
-        g_time  = sum(s["duration"] + 0.3 for s in greedy)
-        b_time  = sum(s["duration"] + 0.3 for s in brute)
-        g_match = sum(len(set(s["tags"]) & set(interests)) for s in greedy)
-        b_match = sum(len(set(s["tags"]) & set(interests)) for s in brute)
+        g_time  = sum(s["duration"] + TRAVEL_HOURS for s in greedy)
+        b_time  = sum(s["duration"] + TRAVEL_HOURS for s in brute)
+        g_match = count_matches(greedy, interests)
+        b_match = count_matches(brute, interests)
 
         rows = [
-            ("Metric",         "Greedy",           "Brute Force (6 spots)"),
+            ("Metric",         "Greedy",           solver),
             ("Spots Visited",  str(len(greedy)),    str(len(brute))),
             ("Total Cost",     f"Rs. {g_cost}",     f"Rs. {b_cost}"),
             ("Time Used",      f"{g_time:.1f} hrs", f"{b_time:.1f} hrs"),
+            ("Route Distance", f"{route_km(greedy):.1f} km", f"{route_km(brute):.1f} km"),
             ("Interest Match", f"{g_match} tags",   f"{b_match} tags"),
+            ("Search Nodes",   "—",                 f"{stats['expanded']:,} expanded / {stats['pruned']:,} pruned"),
         ]
 
         for i, row in enumerate(rows):
             if i == 0:
-                write(f"  {'Metric':<18} {'Greedy':<20} {'Brute Force'}\n", "heading")
+                write(f"  {'Metric':<18} {'Greedy':<20} {solver}\n", "heading")
                 write("  " + "─" * 55 + "\n", "sub")
             else:
                 line = f"  {row[0]:<18} {row[1]:<20} {row[2]}\n"
@@ -494,12 +863,22 @@ class TouristApp:
 
         write("\n\n📌 ANALYSIS\n\n", "heading")
         write("  Greedy Algorithm:\n", "good")
-        write("  • Fast: O(n²) — works for large datasets\n")
+        write("  • Fast: each step scans only nearby spots — works for large datasets\n")
         write("  • Makes locally optimal choices at each step\n")
         write("  • May miss the globally optimal combination\n\n")
 
+        write("  Held-Karp DP:\n", "warn")
+        write("  • Guaranteed optimal over the whole catalog\n")
+        write("  • One state per visited subset, grown one spot at a time\n")
+        write("  • Only budget/time-feasible subsets are ever built\n\n")
+
+        write("  Branch & Bound:\n", "warn")
+        write("  • Guaranteed optimal — depth-first over partial itineraries\n")
+        write("  • Fee, time and interest carried down the tree\n")
+        write("  • Each visited set expanded once; cuts hopeless branches\n\n")
+
         write("  Brute Force:\n", "warn")
-        write("  • Guaranteed optimal — checks ALL combinations\n")
+        write("  • Guaranteed optimal — checks ALL orderings\n")
         write("  • Slow: O(n!) — only feasible for ≤6 spots\n")
         write("  • For n=8 spots: 40,320 permutations checked!\n\n")
 
@@ -510,7 +889,7 @@ class TouristApp:
         self.cmp_text.config(state="disabled")
 
     # ── Charts ──────────────────────────────
-    def _draw_charts(self, greedy, brute):
+    def _draw_charts(self, greedy, brute, solver):
         for ax in self.axes:
             ax.clear()
             ax.set_facecolor(COLORS["panel"])
@@ -536,12 +915,13 @@ class TouristApp:
             ax1.plot(lons[-1], lats[-1], "o", color=COLORS["red"],    markersize=10, zorder=4, label="End")
 
         # Also plot all available spots faintly
-        for s in SPOTS:
-            if s not in greedy:
-                ax1.plot(s["lon"], s["lat"], "o", color=COLORS["border"],
-                        markersize=5, zorder=2, alpha=0.5)
+        on_route = {id(s) for s in greedy}
+        others = [s for s in SPOTS if id(s) not in on_route]
+        ax1.plot([s["lon"] for s in others], [s["lat"] for s in others], "o",
+                color=COLORS["border"], markersize=5, zorder=2, alpha=0.5)
 
-        ax1.set_title("Greedy Route Map", color=COLORS["accent"], fontsize=9, pad=6)
+        ax1.set_title(f"Greedy Route Map ({route_km(greedy):.1f} km)",
+                    color=COLORS["accent"], fontsize=9, pad=6)
         ax1.set_xlabel("Longitude", color=COLORS["sub"], fontsize=7)
         ax1.set_ylabel("Latitude",  color=COLORS["sub"], fontsize=7)
         ax1.legend(fontsize=7, facecolor=COLORS["card"],
@@ -553,12 +933,12 @@ class TouristApp:
         g_vals = [
             len(greedy),
             sum(s["fee"] for s in greedy) / 100,
-            sum(s["duration"] + 0.3 for s in greedy),
+            sum(s["duration"] + TRAVEL_HOURS for s in greedy),
         ]
         b_vals = [
             len(brute),
             sum(s["fee"] for s in brute) / 100,
-            sum(s["duration"] + 0.3 for s in brute),
+            sum(s["duration"] + TRAVEL_HOURS for s in brute),
         ]
 
         x = range(len(metrics))
@@ -566,7 +946,7 @@ class TouristApp:
         bars1 = ax2.bar([i - w/2 for i in x], g_vals, w,
                         label="Greedy",      color=COLORS["accent"], alpha=0.85)
         bars2 = ax2.bar([i + w/2 for i in x], b_vals, w,
-                        label="Brute Force", color=COLORS["yellow"], alpha=0.85)
+                        label=solver, color=COLORS["yellow"], alpha=0.85)
 
         for bar in bars1:
             ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.05,
@@ -579,7 +959,7 @@ class TouristApp:
 
         ax2.set_xticks(list(x))
         ax2.set_xticklabels(metrics, fontsize=8)
-        ax2.set_title("Greedy vs Brute Force", color=COLORS["accent"], fontsize=9, pad=6)
+        ax2.set_title(f"Greedy vs {solver}", color=COLORS["accent"], fontsize=9, pad=6)
         ax2.legend(fontsize=7, facecolor=COLORS["card"],
                 edgecolor=COLORS["border"], labelcolor=COLORS["text"])
 
@@ -591,6 +971,7 @@ class TouristApp:
         self.budget_var.set("1500")
         self.hours_var.set("8")
         self.start_var.set("9")
+        self.solver_var.set(next(iter(SOLVERS)))
         for tag, var in self.tag_vars.items():
             var.set(tag in ["culture", "nature"])
         for tree in [self.greedy_tree, self.brute_tree]:
@@ -0,0 +1,293 @@
+"""
+Memory-mapped binary demand archive for the Smart Energy Grid optimizer.
+Years of hourly, multi-district demand in one file that opens instantly:
+
+    header      64 bytes  magic, version, districts, hours, start, step,
+                          UTC offset (seconds)
+    names       districts x 32 bytes, UTF-8, NUL padded
+    (padding up to a 64 byte boundary)
+    demand      hours x districts float32, row per time step (C order)
+
+Row i is the reading at start + i * step seconds, so a date range maps to
+a row range by arithmetic and slices are NumPy views into the mmap (no
+parsing, no copies). Hours missing from the source file are stored as
+NaN.
+
+Timestamps may carry a UTC offset (2024-01-01T06:00:00+05:45); the file
+keeps it, so labels and the hour of day used for source availability
+are the same local wall-clock times grid_stream reads from the source
+file. One offset per file: readings whose offset differs from the first
+one (a DST change) are rejected at convert time. Naive timestamps are
+stored with offset 0, and naive start / end dates are read in the
+archive's offset.
+
+    python grid_archive.py convert demand.csv demand.gridarc
+    python grid_archive.py info demand.gridarc
+Required libraries: numpy (installed together with matplotlib)
+"""
+
+import argparse
+import calendar
+import mmap
+import struct
+import sys
+from datetime import datetime
+
+import numpy as np
+
+import grid_stream
+
+EXTENSION = ".gridarc"
+MAGIC = b"GRIDARC1"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIQqIi28x")     # 64 bytes (files without an offset read as 0)
+NAME_WIDTH = 32
+ALIGN = 64
+
+
+def _offset(label):
+    """UTC offset of an ISO timestamp label in seconds (0 when naive)."""
+    offset = datetime.fromisoformat(label).utcoffset()
+    return int(offset.total_seconds()) if offset is not None else 0
+
+
+def _epoch(label, offset=0):
+    """ISO timestamp label -> UTC seconds (naive times are at `offset`)."""
+    when = datetime.fromisoformat(label)
+    epoch = calendar.timegm(when.utctimetuple())
+    return epoch - offset if when.utcoffset() is None else epoch
+
+
+def _suffix(offset):
+    """+05:45 style suffix for a UTC offset in seconds ('' for 0)."""
+    if not offset:
+        return ""
+    sign = "+" if offset > 0 else "-"
+    minutes = abs(offset) // 60
+    return f"{sign}{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _number(v):
+    """float32 cell -> the short number it was written from."""
+    v = round(float(v), 4)
+    return int(v) if v.is_integer() else v
+
+
+def _data_offset(n_districts):
+    end = HEADER.size + n_districts * NAME_WIDTH
+    return -(-end // ALIGN) * ALIGN
+
+
+#  WRITING
+
+def write_archive(path, readings, step=3600):
+    """
+    Write (label, hour_str, districts) readings with ISO timestamp labels,
+    in time order, to an archive. Rows are streamed to disk; gaps in the
+    timeline are filled with NaN. Returns the number of rows written.
+    """
+    readings = iter(readings)
+    try:
+        label, _, first = next(readings)
+    except StopIteration:
+        raise ValueError("no readings to archive")
+    try:
+        start = _epoch(label)
+        offset = _offset(label)
+    except ValueError:
+        raise ValueError(f"archive needs timestamp labels, got {label!r}")
+    districts = list(first.keys())
+    for d in districts:
+        if len(d.encode()) > NAME_WIDTH:
+            raise ValueError(f"district name longer than {NAME_WIDTH} bytes: {d!r}")
+
+    gap = np.full(len(districts), np.nan, dtype="<f4")
+    n = 0
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(districts), 0, start, step, offset))
+        for d in districts:
+            f.write(d.encode().ljust(NAME_WIDTH, b"\0"))
+        f.write(b"\0" * (_data_offset(len(districts)) - f.tell()))
+
+        row = np.array([first[d] for d in districts], dtype="<f4")
+        while True:
+            f.write(row.tobytes())
+            n += 1
+            try:
+                label, _, values = next(readings)
+            except StopIteration:
+                break
+            if _offset(label) != offset:
+                raise ValueError(f"reading {label!r} has a different UTC offset than "
+                                f"the first reading ({_suffix(offset) or 'none'})")
+            i, rem = divmod(_epoch(label) - start, step)
+            if rem or i < n:
+                raise ValueError(f"reading {label!r} is out of order or off the {step}s grid")
+            for _ in range(i - n):
+                f.write(gap.tobytes())
+                n += 1
+            row = np.array([values.get(d, np.nan) for d in districts], dtype="<f4")
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(districts), n, start, step, offset))
+    return n
+
+
+def convert(demand_path, out_path, step=3600):
+    """CSV / JSON lines demand file (see grid_stream) -> archive."""
+    return write_archive(out_path, grid_stream.read_demand(demand_path), step)
+
+
+#  READING
+
+class ArchiveSlice:
+    """A row range of an archive; `demand` is a view into the mmap."""
+
+    def __init__(self, archive, lo, hi):
+        self.archive = archive
+        self.lo, self.hi = lo, hi
+        self.districts = archive.districts
+        self.demand = archive.demand[lo:hi]
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    @property
+    def epochs(self):
+        a = self.archive
+        return a.start + np.arange(self.lo, self.hi, dtype=np.int64) * a.step
+
+    @property
+    def hours(self):
+        """Local hour of day per row (source availability)."""
+        return ((self.epochs + self.archive.utc_offset) // 3600) % 24
+
+    def labels(self):
+        """Local ISO timestamps, with the archive's offset when it has one."""
+        local = (self.epochs + self.archive.utc_offset).astype("datetime64[s]")
+        suffix = _suffix(self.archive.utc_offset)
+        return [t + suffix for t in np.datetime_as_string(local, unit="s").tolist()]
+
+    def present(self):
+        """Rows that hold data (gaps are NaN)."""
+        return ~np.isnan(self.demand).any(axis=1)
+
+    def readings(self):
+        """(label, hour_str, districts) per stored row, skipping gaps."""
+        for label, hour, row in zip(self.labels(), self.hours.tolist(), self.demand):
+            if np.isnan(row).any():
+                continue
+            yield label, f"{hour:02d}", {d: _number(v) for d, v in zip(self.districts, row)}
+
+
+class DemandArchive:
+    """Read-only, memory-mapped view of an archive file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:                      # empty file
+            self._file.close()
+            raise ValueError(f"{path}: not a demand archive")
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path}: not a demand archive (shorter than its header)")
+        magic, version, _, n_dist, n_hours, start, step, offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a demand archive (or unsupported version)")
+        names = self._map[HEADER.size:HEADER.size + n_dist * NAME_WIDTH]
+        self.districts = [names[i:i + NAME_WIDTH].rstrip(b"\0").decode()
+                        for i in range(0, len(names), NAME_WIDTH)]
+        self.start, self.step, self.utc_offset = start, step, offset
+        self.demand = np.frombuffer(self._map, dtype="<f4", count=n_hours * n_dist,
+                                    offset=_data_offset(n_dist)).reshape(n_hours, n_dist)
+
+    def __len__(self):
+        return len(self.demand)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            self.close()
+        except BufferError:
+            # Leaving on an error with slices still alive: let that error
+            # through; the map is released once those views are collected
+            if exc_type is None:
+                raise
+
+    def close(self):
+        """
+        Unmap the file. Raises BufferError while slice views (or arrays
+        derived from them without a copy) are still alive.
+        """
+        self.demand = None
+        self._file.close()
+        if getattr(self, "_map", None) is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                raise BufferError(f"{self.path}: archive slices are still in use; "
+                                "drop them before closing") from None
+            self._map = None
+
+    def index(self, when):
+        """First row at or after `when` (ISO date / timestamp), clipped."""
+        i = -(-(_epoch(when, self.utc_offset) - self.start) // self.step)
+        return min(max(i, 0), len(self))
+
+    def slice(self, start=None, end=None):
+        """Rows with start <= time < end; None means the archive edge."""
+        lo = self.index(start) if start else 0
+        hi = self.index(end) if end else len(self)
+        return ArchiveSlice(self, lo, max(lo, hi))
+
+    def iter_readings(self, start=None, end=None):
+        return self.slice(start, end).readings()
+
+    def info(self):
+        last = self.start + (len(self) - 1) * self.step
+        fmt = lambda t: str(np.datetime64(int(t + self.utc_offset), "s")) + _suffix(self.utc_offset)
+        return {
+            "districts": len(self.districts),
+            "rows": len(self),
+            "first": fmt(self.start) if len(self) else None,
+            "last": fmt(last) if len(self) else None,
+            "step_seconds": self.step,
+            "gap_rows": int(np.isnan(self.demand).any(axis=1).sum()),
+        }
+
+
+def iter_readings(path, start=None, end=None):
+    """grid_stream style reader over an archive file."""
+    with DemandArchive(path) as archive:
+        yield from archive.iter_readings(start, end)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Binary demand archive tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    conv = sub.add_parser("convert", help="CSV / JSON lines -> archive")
+    conv.add_argument("source")
+    conv.add_argument("archive")
+    conv.add_argument("--step", type=int, default=3600, help="seconds between rows")
+    info = sub.add_parser("info", help="print archive summary")
+    info.add_argument("archive")
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        rows = convert(args.source, args.archive, args.step)
+        print(f"{rows} rows written to {args.archive}")
+    else:
+        with DemandArchive(args.archive) as archive:
+            for key, value in archive.info().items():
+                print(f"{key:>13}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+Benchmark suite for Smart Energy Grid dispatch.
+Generates synthetic fleets and demand (3 to 1,000 districts, 3 to 500
+sources, one day to ten years), times every dispatch engine and reports
+throughput (hours dispatched per second) and peak memory.
+
+    python grid_bench.py                          # quick matrix
+    python grid_bench.py --full                   # up to 1,000 x 500 x 10 years
+    python grid_bench.py --save-baseline base.json
+    python grid_bench.py --compare base.json      # exit 1 on regressions
+    python grid_bench.py --compare                # against bench_baseline.json
+
+Absolute hours per second swing by tens of percent between runs on a
+shared machine, so they are only reported. Every case is also timed
+against REFERENCE_CASE right before it, and --compare checks those
+ratios, averaged per engine: a slower or busier machine moves the case
+and the reference together. bench_baseline.json (next to this file) is
+the committed quick-matrix baseline of those ratios, written with
+`python grid_bench.py --save-baseline bench_baseline.json`; regenerate
+and commit it with any intended speed-up.
+
+Engines that cost more per hour are timed on a capped number of hours
+(see HOUR_LIMITS); throughput is still hours per second.
+Required libraries: numpy (installed together with matplotlib)
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+import Smart_Grid
+import grid_batch
+import grid_exact
+import grid_network
+
+TYPES = ("Solar", "Hydro", "Diesel")
+HOURS_PER_DAY = 24
+
+QUICK = {"districts": [3, 100], "sources": [3, 50], "days": [1, 30]}
+FULL = {"districts": [3, 100, 1000], "sources": [3, 50, 500], "days": [1, 365, 3650]}
+
+# Most hours each engine is timed on, per case
+HOUR_LIMITS = {"scalar": 24 * 365, "batch": None, "network": None, "exact": 24 * 7}
+# Exact solver builds a sources x districts flow graph per hour
+EXACT_MAX_LINKS = 500
+# Districts each source is wired to in the sparse "network" engine
+NETWORK_DEGREE = 8
+# Each timing sample repeats a case until it has run at least this long,
+# so sub-millisecond cases are not dominated by timer and scheduler noise
+MIN_RUN_SECONDS = 0.2
+# Throughput is also stored relative to this case, timed in the same run;
+# baselines compare those ratios, which do not depend on the machine speed
+REFERENCE_CASE = ("scalar", 3, 3, 30)       # engine, districts, sources, days
+
+
+#  SYNTHETIC DATA
+
+def synthetic_fleet(n_sources, seed=0):
+    rng = np.random.default_rng(seed)
+    fleet = []
+    for i in range(n_sources):
+        typ = TYPES[i % len(TYPES)]
+        if typ == "Solar":
+            start, end, cost = int(rng.integers(5, 8)), int(rng.integers(17, 20)), rng.uniform(0.8, 1.2)
+        elif typ == "Hydro":
+            start, end, cost = 0, 24, rng.uniform(1.3, 1.8)
+        else:
+            start, end, cost = int(rng.integers(0, 18)), 24, rng.uniform(2.5, 3.5)
+        fleet.append({"id": f"S{i + 1}", "type": typ, "max_cap": int(rng.integers(20, 80)),
+                    "start": start, "end": end, "cost": round(float(cost), 2)})
+    return fleet
+
+
+def synthetic_demand(n_districts, n_hours, n_sources, seed=0):
+    """(hours, districts) demand with a daily shape, scaled to the fleet."""
+    rng = np.random.default_rng(seed + 1)
+    hours = np.arange(n_hours) % HOURS_PER_DAY
+    shape = 1.0 + 0.4 * np.sin((hours - 6) / 24 * 2 * np.pi)
+    # Roughly fleet-sized total so every engine does real work
+    per_district = 40.0 * n_sources / n_districts
+    base = rng.uniform(0.5, 1.5, n_districts) * per_district
+    noise = rng.normal(1.0, 0.05, (n_hours, n_districts))
+    return np.round(shape[:, None] * base[None, :] * noise, 2), hours
+
+
+def synthetic_network(fleet, districts, degree=NETWORK_DEGREE, seed=0):
+    """Each source linked to `degree` random districts, some lines capped."""
+    rng = np.random.default_rng(seed + 2)
+    links = []
+    for s in fleet:
+        picks = rng.choice(len(districts), size=min(degree, len(districts)), replace=False)
+        for d in picks:
+            cap = None if rng.random() < 0.5 else round(float(rng.uniform(5, 30)), 1)
+            links.append((s["id"], districts[d], cap))
+    return grid_network.Connectivity(districts, [s["id"] for s in fleet], links)
+
+
+@contextmanager
+def using_sources(fleet):
+    """Temporarily point Smart_Grid.SOURCES at a synthetic fleet."""
+    saved = list(Smart_Grid.SOURCES)
+    Smart_Grid.SOURCES[:] = fleet
+    Smart_Grid.invalidate_merit_index()
+    try:
+        yield
+    finally:
+        Smart_Grid.SOURCES[:] = saved
+        Smart_Grid.invalidate_merit_index()
+
+
+#  ENGINES
+
+def _run_scalar(demand, hours, districts, fleet):
+    with using_sources(fleet):
+        for row, h in zip(demand, hours):
+            Smart_Grid.allocate_hour(f"{h:02d}", dict(zip(districts, row.tolist())))
+
+
+def _run_batch(demand, hours, districts, fleet):
+    grid_batch.allocate_batch(demand, hours, fleet, districts=districts)
+
+
+def _run_network(demand, hours, districts, fleet):
+    network = synthetic_network(fleet, districts)
+    grid_batch.allocate_batch(demand, hours, fleet, districts=districts, network=network)
+
+
+def _run_exact(demand, hours, districts, fleet):
+    dispatcher = grid_exact.ExactDispatcher(fleet)
+    for row, h in zip(demand, hours):
+        dispatcher.allocate_hour(f"{h:02d}", dict(zip(districts, row.tolist())))
+
+
+ENGINES = {"scalar": _run_scalar, "batch": _run_batch, "network": _run_network,
+        "exact": _run_exact}
+
+
+def measure(engine, demand, hours, districts, fleet, repeat=3):
+    """
+    Median of `repeat` samples of the wall time per run (each sample runs
+    for at least MIN_RUN_SECONDS; the median, unlike the best, ignores
+    short bursts of CPU boost), then one traced run for peak memory.
+    """
+    fn = ENGINES[engine]
+    samples = []
+    for _ in range(repeat):
+        runs = 0
+        t0 = time.perf_counter()
+        while True:
+            fn(demand, hours, districts, fleet)
+            runs += 1
+            elapsed = time.perf_counter() - t0
+            if elapsed >= MIN_RUN_SECONDS:
+                break
+        samples.append(elapsed / runs)
+        if elapsed / runs > 2.0:
+            break
+    best = float(np.median(samples))
+    tracemalloc.start()
+    fn(demand, hours, districts, fleet)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def _time_case(engine, demand, hours, districts, fleet, repeat):
+    """(hours timed, seconds, peak bytes), within the engine's HOUR_LIMITS."""
+    timed = min(len(hours), HOUR_LIMITS.get(engine) or len(hours))
+    seconds, peak = measure(engine, demand[:timed], hours[:timed], districts, fleet, repeat)
+    return timed, seconds, peak
+
+
+def reference_speed(repeat=3, seed=0):
+    """Hours per second of REFERENCE_CASE on this machine, right now."""
+    engine, n_dist, n_src, days = REFERENCE_CASE
+    demand, hours = synthetic_demand(n_dist, days * HOURS_PER_DAY, n_src, seed)
+    districts = [f"D{i + 1:04d}" for i in range(n_dist)]
+    timed, seconds, _ = _time_case(engine, demand, hours, districts,
+                                synthetic_fleet(n_src, seed), repeat)
+    return timed / seconds
+
+
+def run_suite(matrix, engines, repeat=3, seed=0, log=print):
+    results = {}
+    for n_src in matrix["sources"]:
+        fleet = synthetic_fleet(n_src, seed)
+        for n_dist in matrix["districts"]:
+            districts = [f"D{i + 1:04d}" for i in range(n_dist)]
+            for days in matrix["days"]:
+                n_hours = days * HOURS_PER_DAY
+                demand, hours = synthetic_demand(n_dist, n_hours, n_src, seed)
+                for engine in engines:
+                    if engine == "exact" and n_src * n_dist > EXACT_MAX_LINKS:
+                        continue
+                    # Timed right before the case, so both see the same machine state
+                    reference = reference_speed(repeat, seed)
+                    timed, seconds, peak = _time_case(engine, demand, hours, districts,
+                                                    fleet, repeat)
+                    key = f"{engine}/d{n_dist}/s{n_src}/days{days}"
+                    results[key] = {
+                        "engine": engine, "districts": n_dist, "sources": n_src,
+                        "days": days, "hours_timed": timed,
+                        "seconds": round(seconds, 6),
+                        "hours_per_sec": round(timed / seconds, 1) if seconds > 0 else float("inf"),
+                        "peak_mb": round(peak / 2 ** 20, 3),
+                    }
+                    results[key]["relative"] = round(results[key]["hours_per_sec"] / reference, 4)
+                    r = results[key]
+                    log(f"{key:<32} {r['hours_per_sec']:>14,.0f} h/s {r['peak_mb']:>10.2f} MB")
+    return results
+
+
+#  BASELINES
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+
+def save_baseline(path, results):
+    payload = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Engines whose throughput fell more than `tolerance` (0.2 = 20%).
+    Each case is judged on its throughput relative to REFERENCE_CASE, so a
+    slower or busier machine does not count, and the per-case ratios are
+    averaged (geometric mean) over all of an engine's cases, so one noisy
+    timing cannot fail the check on its own.
+    Returns [(engine, ratio, cases compared)].
+    """
+    ratios = {}
+    for key, base in baseline["results"].items():
+        now = results.get(key)
+        if now is None or not base.get("relative"):
+            continue
+        ratios.setdefault(base["engine"], []).append(now["relative"] / base["relative"])
+    regressions = []
+    for engine, values in ratios.items():
+        ratio = float(np.exp(np.mean(np.log(values))))
+        if ratio < 1.0 - tolerance:
+            regressions.append((engine, ratio, len(values)))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark grid dispatch engines")
+    parser.add_argument("--full", action="store_true", help="run the full size matrix")
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help="comma separated subset of: " + ", ".join(ENGINES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH", nargs="?", const=BASELINE_PATH,
+                        help="baseline JSON to check against (default: bench_baseline.json)")
+    parser.add_argument("--tolerance", type=float, default=0.20,
+                        help="allowed throughput drop before flagging a regression")
+    args = parser.parse_args(argv)
+
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    unknown = set(engines) - set(ENGINES)
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(sorted(unknown))}")
+
+    results = run_suite(FULL if args.full else QUICK, engines, args.repeat, args.seed)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for engine, ratio, cases in regressions:
+            print(f"REGRESSION {engine}: {ratio:.0%} of baseline throughput over {cases} cases")
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Memoized what-if cache for single-hour dispatch runs.
+An LRU map keyed on (hour, demand, engine). Entries also depend on the
+SOURCES configuration: the cache keeps a fingerprint of it and empties
+itself as soon as the sources change.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+
+
+def sources_fingerprint(sources):
+    """Stable short hash of a SOURCES list (order and every field count)."""
+    blob = json.dumps(sources, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+
+class DispatchCache:
+    """Least-recently-used cache of allocate_hour style results."""
+
+    def __init__(self, maxsize=128, on_sources_change=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        # Called when the fingerprint changes, so state derived from the
+        # old SOURCES (e.g. the merit-order index) is dropped with the entries
+        self.on_sources_change = on_sources_change
+        self._entries = OrderedDict()
+        self._fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(hour_str, demand, engine="greedy"):
+        return (hour_str, tuple(sorted(demand.items())), engine)
+
+    def get(self, hour_str, demand, sources, compute, engine="greedy"):
+        """
+        Return the cached result for this hour/demand/engine, or call
+        compute() and store it. Results are shared, not copied, so treat
+        them as read-only.
+        """
+        self.check_sources(sources)
+        key = self.make_key(hour_str, demand, engine)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        result = compute()
+        self._entries[key] = result
+        self._evict()
+        return result
+
+    def check_sources(self, sources):
+        """Drop every entry if the sources changed since the last lookup."""
+        fingerprint = sources_fingerprint(sources)
+        if fingerprint != self._fingerprint:
+            if self._entries:
+                self.invalidate()
+            if self._fingerprint is not None and self.on_sources_change:
+                self.on_sources_change()
+            self._fingerprint = fingerprint
+
+    def invalidate(self):
+        self._entries.clear()
+        self.invalidations += 1
+
+    def resize(self, maxsize):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+        }
@@ -0,0 +1,267 @@
+"""
+Persistent chart layer for the Smart Energy Grid dashboard.
+Artists (stack areas, bars, lines, pie wedges) are created once per view
+and then updated in place with new data; the canvas is refreshed with
+draw_idle(), so repeated clicks coalesce into one repaint and redraw
+cost does not grow with the number of refreshes.
+Required libraries: matplotlib
+"""
+
+import math
+
+import numpy as np
+
+MAX_TICKS = 12
+FALLBACK_COLORS = ("#4FC3F7", "#66BB6A", "#F4C430", "#EF5350", "#AB47BC", "#FF8A65", "#90A4AE")
+
+
+def _band(x, lower, upper):
+    """Polygon vertices for the area between two curves."""
+    return np.concatenate([np.column_stack([x, lower]),
+                        np.column_stack([x[::-1], upper[::-1]])])
+
+
+class _Pie:
+    """
+    Fixed set of wedges whose angles, offsets and labels are updated in
+    place. Zero slices are hidden instead of removed.
+    """
+
+    def __init__(self, ax, colors, startangle, explode, label_color, fontsize):
+        self.startangle = startangle
+        self.explode = explode
+        self.wedges, self.labels, self.pcts = ax.pie(
+            [1] * len(colors), colors=colors, labels=[""] * len(colors),
+            autopct="%1.0f%%", startangle=startangle,
+            textprops={"color": label_color, "fontsize": fontsize})
+        ax.set_xlim(-1.35, 1.35)
+        ax.set_ylim(-1.35, 1.35)
+
+    def update(self, values, labels):
+        total = float(sum(values))
+        angle = self.startangle
+        for i, (v, text) in enumerate(zip(values, labels)):
+            wedge = self.wedges[i]
+            visible = total > 0 and v > 0
+            wedge.set_visible(visible)
+            self.labels[i].set_visible(visible)
+            self.pcts[i].set_visible(visible)
+            if not visible:
+                continue
+            span = 360.0 * v / total
+            mid = math.radians(angle + span / 2)
+            dx, dy = math.cos(mid), math.sin(mid)
+            shift = self.explode[i]
+            wedge.set_center((shift * dx, shift * dy))
+            wedge.set_theta1(angle)
+            wedge.set_theta2(angle + span)
+            self.labels[i].set_text(text)
+            self.labels[i].set_position(((1.1 + shift) * dx, (1.1 + shift) * dy))
+            self.labels[i].set_horizontalalignment("left" if dx > 0 else "right")
+            self.pcts[i].set_text(f"{v / total * 100:.0f}%")
+            self.pcts[i].set_position(((0.6 + shift) * dx, (0.6 + shift) * dy))
+            angle += span
+
+
+class DashboardCharts:
+    """Owns the 2x2 dashboard axes and their artists."""
+
+    def __init__(self, fig, axes, canvas, colors, types, type_colors=None):
+        """
+        types       : source types, in stacking / legend order
+        type_colors : {type: color}; missing types fall back to
+                    colors[type.lower()] and then a fixed palette
+        """
+        self.fig = fig
+        self.axes = axes
+        self.canvas = canvas
+        self.colors = colors
+        self.types = list(types)
+        type_colors = type_colors or {}
+        self.type_colors = [
+            type_colors.get(t) or colors.get(t.lower()) or FALLBACK_COLORS[i % len(FALLBACK_COLORS)]
+            for i, t in enumerate(self.types)]
+        self.mode = None
+        self.artists = {}
+
+    # Shared
+    def _reset_axes(self):
+        c = self.colors
+        for ax in self.axes.flat:
+            ax.clear()
+            ax.set_aspect("auto")       # pies leave an equal aspect behind
+            ax.set_facecolor(c["panel"])
+            ax.tick_params(colors=c["subtext"], labelsize=7)
+            for spine in ax.spines.values():
+                spine.set_edgecolor(c["border"])
+        self.artists = {}
+
+    def _switch(self, mode, build, *args):
+        if self.mode != mode:
+            self._reset_axes()
+            build(*args)
+            self.mode = mode
+            self.fig.tight_layout(pad=1.5)
+
+    def _set_hour_ticks(self, ax, hours):
+        step = max(1, math.ceil(len(hours) / MAX_TICKS))
+        ticks = np.arange(0, len(hours), step)
+        ax.set_xticks(ticks)
+        ax.set_xticklabels([hours[i] for i in ticks], rotation=45, fontsize=6)
+        ax.set_xlim(-0.5, max(len(hours) - 0.5, 0.5))
+
+    def _sync_bars(self, ax, key, x, heights, colors, width):
+        """Reuse the bar patches while the bar count stays the same."""
+        bars = self.artists.get(key)
+        if bars is None or len(bars) != len(heights):
+            if bars is not None:
+                bars.remove()
+            bars = ax.bar(x, heights, color=colors, width=width)
+            self.artists[key] = bars
+            return bars
+        for bar, h, col in zip(bars, heights, colors):
+            bar.set_height(h)
+            bar.set_color(col)
+        return bars
+
+    # Full day view
+    def _build_full_day(self):
+        c = self.colors
+        a = self.artists
+        ax1, ax2 = self.axes[0]
+        ax3, ax4 = self.axes[1]
+
+        empty = np.zeros((0, 2))
+        a["stack"] = [ax1.fill(empty[:, 0], empty[:, 1], color=col, alpha=0.85, label=t)[0]
+                    for t, col in zip(self.types, self.type_colors)]
+        a["demand"], = ax1.plot([], [], color="white", linewidth=1.5, linestyle="--", label="Demand")
+        ax1.set_title("Energy Mix vs Demand (24h)", color=c["accent"], fontsize=9, pad=6)
+        ax1.set_ylabel("kWh", color=c["subtext"], fontsize=7)
+        ax1.legend(loc="upper left", fontsize=6,
+                facecolor=c["card"], edgecolor=c["border"], labelcolor=c["text"])
+
+        ax2.set_title("Hourly Cost (Rs.) — Red = Diesel Used", color=c["accent"], fontsize=9, pad=6)
+        ax2.set_ylabel("Rs.", color=c["subtext"], fontsize=7)
+
+        a["ren_fill"] = ax3.fill(empty[:, 0], empty[:, 1], alpha=0.4, color=c["green"])[0]
+        a["ren_line"], = ax3.plot([], [], color=c["green"], linewidth=1.5)
+        ax3.axhline(y=80, color=c["yellow"], linestyle="--", linewidth=0.8, label="80% target")
+        ax3.set_ylim(0, 110)
+        ax3.set_title("Renewable Energy % per Hour", color=c["accent"], fontsize=9, pad=6)
+        ax3.set_ylabel("%", color=c["subtext"], fontsize=7)
+        ax3.legend(fontsize=6, facecolor=c["card"], edgecolor=c["border"], labelcolor=c["text"])
+
+        a["totals_pie"] = _Pie(ax4, self.type_colors, startangle=140,
+                            explode=[0.08 if t == "Diesel" else 0.03 for t in self.types],
+                            label_color=c["text"], fontsize=7)
+        ax4.set_title("Full Day — Source Totals", color=c["accent"], fontsize=9, pad=6)
+
+    def show_full_day(self, hours, by_type, demand, costs, diesel_used, renewable_pct, totals):
+        """
+        hours: labels; by_type: {type: kWh array}; demand / costs /
+        diesel_used / renewable_pct: per-hour arrays; totals: {type: kWh}.
+        """
+        self._switch("full_day", self._build_full_day)
+        c = self.colors
+        a = self.artists
+        ax1, ax2 = self.axes[0]
+        ax3 = self.axes[1][0]
+        x = np.arange(len(hours), dtype=float)
+
+        lower = np.zeros(len(hours))
+        for poly, t in zip(a["stack"], self.types):
+            upper = lower + np.asarray(by_type[t], dtype=float)
+            poly.set_xy(_band(x, lower, upper))
+            lower = upper
+        demand = np.asarray(demand, dtype=float)
+        a["demand"].set_data(x, demand)
+        top = max(lower.max(initial=0), demand.max(initial=0))
+        ax1.set_ylim(0, top * 1.1 or 1)
+        self._set_hour_ticks(ax1, hours)
+
+        bar_colors = [c["red"] if used else c["green"] for used in diesel_used]
+        self._sync_bars(ax2, "cost_bars", x, costs, bar_colors, 0.7)
+        ax2.set_ylim(0, (max(costs, default=0) * 1.1) or 1)
+        self._set_hour_ticks(ax2, hours)
+
+        ren = np.asarray(renewable_pct, dtype=float)
+        a["ren_fill"].set_xy(_band(x, np.zeros(len(x)), ren))
+        a["ren_line"].set_data(x, ren)
+        self._set_hour_ticks(ax3, hours)
+
+        a["totals_pie"].update([totals.get(t, 0) for t in self.types],
+                            [f"{t}\n{totals.get(t, 0)} kWh" for t in self.types])
+        self.canvas.draw_idle()
+
+    # Single hour view
+    def _build_single(self):
+        c = self.colors
+        a = self.artists
+        ax1, ax2 = self.axes[0]
+        ax3, ax4 = self.axes[1]
+
+        a["mix_pie"] = _Pie(ax1, self.type_colors, startangle=90,
+                            explode=[0] * len(self.types), label_color=c["text"], fontsize=8)
+        a["mix_title"] = ax1.set_title("", color=c["accent"], fontsize=9, pad=6)
+
+        ax2.set_title("District Demand (kWh)", color=c["accent"], fontsize=9, pad=6)
+        ax2.set_ylabel("kWh", color=c["subtext"], fontsize=7)
+        a["demand_labels"] = []
+
+        a["cost_bars"] = ax3.bar(self.types, [0] * len(self.types),
+                                color=self.type_colors, width=0.4)
+        ax3.set_title("Cost per Source (Rs.)", color=c["accent"], fontsize=9, pad=6)
+        ax3.set_ylabel("Rs.", color=c["subtext"], fontsize=7)
+
+        ax4.barh(["Fulfilled"], [100], color=c["border"], height=0.4)
+        a["gauge"] = ax4.barh(["Fulfilled"], [0], color=c["green"], height=0.4)[0]
+        ax4.set_xlim(0, 100)
+        a["gauge_title"] = ax4.set_title("", color=c["accent"], fontsize=9, pad=6)
+        a["gauge_text"] = ax4.text(0, 0, "", ha="center", va="center",
+                                color=c["bg"], fontsize=12, fontweight="bold")
+
+    def show_single(self, hour, alloc, districts, cost_by_type, pct):
+        self._switch("single", self._build_single)
+        c = self.colors
+        a = self.artists
+        ax2 = self.axes[0][1]
+        ax3 = self.axes[1][0]
+
+        a["mix_pie"].update([alloc.get(t, 0) for t in self.types], self.types)
+        a["mix_title"].set_text(f"Hour {hour} — Source Mix")
+
+        names = list(districts.keys())
+        vals = list(districts.values())
+        palette = [c["accent"], c["green"], c["yellow"]]
+        x = np.arange(len(names))
+        bars = self._sync_bars(ax2, "district_bars", x, vals,
+                            [palette[i % len(palette)] for i in range(len(vals))], 0.5)
+        if len(names) <= MAX_TICKS:
+            ax2.set_xticks(x)
+            ax2.set_xticklabels(names)
+            ax2.set_xlim(-0.5, max(len(names) - 0.5, 0.5))
+        else:
+            self._set_hour_ticks(ax2, names)
+        # Value labels only while they still fit above the bars
+        n_labels = len(vals) if len(vals) <= MAX_TICKS else 0
+        if len(a["demand_labels"]) != n_labels:
+            for t in a["demand_labels"]:
+                t.remove()
+            a["demand_labels"] = [ax2.text(0, 0, "", ha="center", va="bottom",
+                                        color=c["text"], fontsize=8) for _ in range(n_labels)]
+        for t, bar, val in zip(a["demand_labels"], bars, vals):
+            t.set_position((bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.3))
+            t.set_text(str(val))
+        ax2.set_ylim(0, (max(vals, default=0) * 1.15) or 1)
+
+        for bar, t in zip(a["cost_bars"], self.types):
+            bar.set_height(cost_by_type.get(t, 0))
+        ax3.set_ylim(0, (max(cost_by_type.values(), default=0) * 1.1) or 1)
+
+        color = c["green"] if pct >= 90 else c["yellow"] if pct >= 70 else c["red"]
+        a["gauge"].set_width(pct)
+        a["gauge"].set_color(color)
+        a["gauge_title"].set_text(f"Demand Fulfilled: {pct}%")
+        a["gauge_text"].set_position((pct / 2, 0))
+        a["gauge_text"].set_text(f"{pct}%")
+        self.canvas.draw_idle()
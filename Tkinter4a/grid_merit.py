@@ -0,0 +1,82 @@
+"""
+Precomputed hour -> merit-order index for energy sources.
+Source availability only changes at the distinct start/end hours, so the
+day splits into a few windows. For each window the available sources are
+sorted by cost once and stored with cumulative capacity / cost arrays.
+Dispatching a demand is then a binary search for the marginal source.
+Each index remembers sources_key() of the list it was built from, so
+callers can tell when SOURCES has been edited and rebuild it.
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+def sources_key(sources):
+    """Everything the index depends on, per source and in order."""
+    return tuple((s["id"], s["type"], s["cost"], s["max_cap"], s["start"], s["end"])
+                for s in sources)
+
+
+class _Window:
+    """Merit order for one availability window."""
+
+    def __init__(self, units):
+        units = sorted(units, key=lambda x: x["cost"])   # stable, like allocate_hour
+        self.units = units
+        self.types = list(dict.fromkeys(u["type"] for u in units))
+        self.cum_cap = [0]
+        self.cum_cost = [0.0]
+        # type_prefix[i][t] = capacity of type t among the first i units
+        self.type_prefix = [dict.fromkeys(self.types, 0)]
+        for u in units:
+            self.cum_cap.append(self.cum_cap[-1] + u["max_cap"])
+            self.cum_cost.append(self.cum_cost[-1] + u["max_cap"] * u["cost"])
+            prefix = dict(self.type_prefix[-1])
+            prefix[u["type"]] += u["max_cap"]
+            self.type_prefix.append(prefix)
+
+    def dispatch(self, total):
+        """
+        Greedy fill of `total` kWh.
+        Returns (allocations by type, cost, remaining unmet kWh).
+        """
+        if total <= 0 or not self.units:
+            return dict.fromkeys(self.types, 0), 0.0, total
+        n = len(self.units)
+        if total >= self.cum_cap[n]:
+            return dict(self.type_prefix[n]), self.cum_cost[n], total - self.cum_cap[n]
+
+        # Marginal unit: first i with cum_cap[i] >= total, unit i-1 is partial
+        i = bisect_left(self.cum_cap, total)
+        marginal = self.units[i - 1]
+        partial = total - self.cum_cap[i - 1]
+        allocations = dict(self.type_prefix[i - 1])
+        allocations[marginal["type"]] += partial
+        cost = self.cum_cost[i - 1] + partial * marginal["cost"]
+        return allocations, cost, 0
+
+
+class MeritOrderIndex:
+    """Interval index over source start/end hours."""
+
+    def __init__(self, sources):
+        self.key = sources_key(sources)
+        bounds = sorted({s["start"] for s in sources} | {s["end"] for s in sources})
+        self.bounds = bounds
+        self.windows = []
+        for lo in bounds[:-1]:
+            self.windows.append(_Window([s for s in sources if s["start"] <= lo < s["end"]]))
+        self._empty = _Window([])
+
+    def window(self, hour):
+        i = bisect_right(self.bounds, hour) - 1
+        if 0 <= i < len(self.windows):
+            return self.windows[i]
+        return self._empty
+
+    def merit_order(self, hour):
+        """Sources available at `hour`, cheapest first."""
+        return list(self.window(hour).units)
+
+    def dispatch(self, hour, total):
+        return self.window(hour).dispatch(total)
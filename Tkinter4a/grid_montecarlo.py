@@ -0,0 +1,186 @@
+"""
+Monte Carlo demand-uncertainty engine for the Smart Energy Grid optimizer.
+Perturbs district demand and source capacities, dispatches each scenario
+day with the vectorized greedy (grid_batch.py) and reports risk numbers:
+percentile daily cost, probability of missing the ±10% tolerance and
+expected diesel hours.
+
+Scenarios are split into fixed-size chunks. Each chunk gets its own
+child seed from one SeedSequence and runs in a process pool. Only
+mergeable summaries come back (sums and histograms), so memory does not
+grow with the number of scenarios. The same seed gives the same answer
+for any number of workers.
+Required libraries: numpy (installed together with matplotlib)
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from grid_batch import demand_matrix, greedy_fill, source_arrays
+
+# Distribution specs are plain dicts, e.g.
+#   {"dist": "normal", "sigma": 0.1}           factor = 1 + N(0, sigma)
+#   {"dist": "lognormal", "sigma": 0.1}        factor = exp(N(0, sigma))
+#   {"dist": "uniform", "low": 0.6, "high": 1}
+#   {"dist": "fixed"}                          factor = 1
+DEFAULT_DEMAND_NOISE = {"dist": "normal", "sigma": 0.10}
+DEFAULT_CAPACITY_NOISE = {
+    "Solar":  {"dist": "uniform", "low": 0.6, "high": 1.0},   # cloud cover
+    "Hydro":  {"dist": "normal", "sigma": 0.05},              # river flow
+    "Diesel": {"dist": "fixed"},
+}
+
+# Capacity factors are clipped to this, which also bounds the daily cost
+# and fixes the cost histogram range up front.
+MAX_CAPACITY_FACTOR = 2.0
+COST_BINS = 4096
+
+
+def draw_factors(rng, spec, size):
+    """Multiplicative factors (>= 0) for one distribution spec."""
+    kind = spec.get("dist", "fixed")
+    if kind == "fixed":
+        factors = np.ones(size)
+    elif kind == "normal":
+        factors = 1.0 + rng.normal(0.0, spec["sigma"], size)
+    elif kind == "lognormal":
+        factors = np.exp(rng.normal(0.0, spec["sigma"], size))
+    elif kind == "uniform":
+        factors = rng.uniform(spec["low"], spec["high"], size)
+    else:
+        raise ValueError(f"Unknown distribution: {kind!r}")
+    return np.maximum(factors, 0.0)
+
+
+#  ONE CHUNK (runs in a worker process)
+
+def _run_chunk(task):
+    (seed, n, demand, hours, src, demand_noise, capacity_noise, upper) = task
+    rng = np.random.default_rng(seed)
+    n_hours, _ = demand.shape
+    n_src = len(src["cap"])
+
+    # Scenario demand (n, H, D) -> hourly totals (n, H)
+    factors = draw_factors(rng, demand_noise, (n,) + demand.shape)
+    totals = (demand[None, :, :] * factors).sum(axis=2)
+
+    # Scenario capacity factor per source (one per day)
+    cap_factors = np.empty((n, n_src))
+    for j, typ in enumerate(src["types"]):
+        spec = capacity_noise.get(typ, {"dist": "fixed"})
+        cap_factors[:, j] = draw_factors(rng, spec, n)
+    np.minimum(cap_factors, MAX_CAPACITY_FACTOR, out=cap_factors)
+
+    avail = (src["start"][None, :] <= hours[:, None]) & (hours[:, None] < src["end"][None, :])
+    caps = avail[None, :, :] * src["cap"][None, None, :] * cap_factors[:, None, :]
+    use = greedy_fill(totals.reshape(-1), caps.reshape(-1, n_src)).reshape(n, n_hours, n_src)
+
+    daily_cost = (use @ src["cost"]).sum(axis=1)
+    fulfilled = use.sum(axis=2)
+    missed = (np.abs(fulfilled - totals) > totals * 0.10).any(axis=1)
+    is_diesel = np.array([t == "Diesel" for t in src["types"]])
+    diesel_hours = (use[:, :, is_diesel].sum(axis=2) > 0).sum(axis=1)
+
+    cost_hist, _ = np.histogram(daily_cost, bins=COST_BINS, range=(0.0, upper))
+    return {
+        "n": n,
+        "cost_sum": float(daily_cost.sum()),
+        "cost_sq_sum": float((daily_cost ** 2).sum()),
+        "cost_min": float(daily_cost.min()),
+        "cost_max": float(daily_cost.max()),
+        "cost_hist": cost_hist,
+        "missed": int(missed.sum()),
+        "diesel_hist": np.bincount(diesel_hours, minlength=n_hours + 1),
+    }
+
+
+#  SUMMARY
+
+class MonteCarloSummary:
+    """Merged chunk results; percentiles come from the cost histogram."""
+
+    def __init__(self, upper, n_hours):
+        self.upper = upper
+        self.n = 0
+        self.cost_sum = 0.0
+        self.cost_sq_sum = 0.0
+        self.cost_min = np.inf
+        self.cost_max = -np.inf
+        self.cost_hist = np.zeros(COST_BINS, dtype=np.int64)
+        self.missed = 0
+        self.diesel_hist = np.zeros(n_hours + 1, dtype=np.int64)
+
+    def merge(self, part):
+        self.n += part["n"]
+        self.cost_sum += part["cost_sum"]
+        self.cost_sq_sum += part["cost_sq_sum"]
+        self.cost_min = min(self.cost_min, part["cost_min"])
+        self.cost_max = max(self.cost_max, part["cost_max"])
+        self.cost_hist += part["cost_hist"]
+        self.missed += part["missed"]
+        self.diesel_hist += part["diesel_hist"]
+
+    def cost_percentile(self, q):
+        """q in [0, 100]; accurate to one histogram bin (upper / COST_BINS)."""
+        target = q / 100 * self.n
+        cum = np.cumsum(self.cost_hist)
+        i = int(np.searchsorted(cum, target))
+        i = min(i, COST_BINS - 1)
+        width = self.upper / COST_BINS
+        below = cum[i - 1] if i > 0 else 0
+        inside = self.cost_hist[i]
+        frac = (target - below) / inside if inside else 0.0
+        value = (i + frac) * width
+        return float(np.clip(value, self.cost_min, self.cost_max))
+
+    def as_dict(self):
+        mean = self.cost_sum / self.n
+        var = max(self.cost_sq_sum / self.n - mean ** 2, 0.0)
+        hours = np.arange(len(self.diesel_hist))
+        return {
+            "scenarios": self.n,
+            "mean_cost": round(mean, 2),
+            "std_cost": round(var ** 0.5, 2),
+            "p50_cost": round(self.cost_percentile(50), 2),
+            "p95_cost": round(self.cost_percentile(95), 2),
+            "p99_cost": round(self.cost_percentile(99), 2),
+            "prob_tolerance_miss": round(self.missed / self.n, 4),
+            "expected_diesel_hours": round(float((hours * self.diesel_hist).sum()) / self.n, 3),
+            "diesel_hours_distribution": {int(h): int(c) for h, c in zip(hours, self.diesel_hist) if c},
+        }
+
+
+def run_monte_carlo(n_scenarios, demand_data, sources, demand_noise=None,
+                    capacity_noise=None, seed=0, chunk_size=2000, workers=None):
+    """
+    Run `n_scenarios` perturbed days and return a summary dict.
+    workers=None uses every core; workers=1 runs in this process.
+    """
+    if n_scenarios < 1:
+        raise ValueError(f"n_scenarios must be at least 1, got {n_scenarios}")
+    demand_noise = demand_noise or DEFAULT_DEMAND_NOISE
+    capacity_noise = DEFAULT_CAPACITY_NOISE if capacity_noise is None else capacity_noise
+    _, hours, _, demand = demand_matrix(demand_data)
+    src = source_arrays(sources)
+
+    # Largest possible daily cost: every available source flat out
+    avail = (src["start"][None, :] <= hours[:, None]) & (hours[:, None] < src["end"][None, :])
+    upper = float((avail * src["cap"] * src["cost"]).sum() * MAX_CAPACITY_FACTOR) or 1.0
+
+    sizes = [chunk_size] * (n_scenarios // chunk_size)
+    if n_scenarios % chunk_size:
+        sizes.append(n_scenarios % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, n, demand, hours, src, demand_noise, capacity_noise, upper)
+            for s, n in zip(seeds, sizes)]
+
+    summary = MonteCarloSummary(upper, len(hours))
+    if workers == 1:
+        for task in tasks:
+            summary.merge(_run_chunk(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(_run_chunk, tasks):
+                summary.merge(part)
+    return summary.as_dict()
@@ -0,0 +1,133 @@
+"""
+Sparse district-source connectivity for the Smart Energy Grid optimizer.
+Each source is wired to a subset of districts through lines with their
+own capacity. Links are stored source-major in CSR form (indptr /
+district index / line capacity), so dispatch walks only the existing
+connections: cost grows with the number of links, not districts x sources.
+
+Greedy rule (same merit order as allocate_hour): take sources cheapest
+first; each source serves its connected districts in link order, up to
+the district's remaining demand, the line capacity and its own capacity.
+"""
+
+import numpy as np
+
+INF = float("inf")
+
+
+class Connectivity:
+    """CSR district-source link matrix with per-line capacities."""
+
+    def __init__(self, districts, source_ids, links):
+        """
+        districts  : district names (demand vector order)
+        source_ids : source ids (SOURCES order)
+        links      : iterable of (source_id, district, line_cap or None)
+        """
+        self.districts = list(districts)
+        self.source_ids = list(source_ids)
+        self.d_index = {d: i for i, d in enumerate(self.districts)}
+        self.s_index = {s: i for i, s in enumerate(self.source_ids)}
+
+        per_source = [[] for _ in self.source_ids]
+        for sid, district, cap in links:
+            per_source[self.s_index[sid]].append(
+                (self.d_index[district], INF if cap is None else float(cap)))
+
+        self.indptr = np.zeros(len(self.source_ids) + 1, dtype=np.int64)
+        self.indptr[1:] = np.cumsum([len(p) for p in per_source])
+        flat = [link for p in per_source for link in p]
+        self.district_idx = np.array([d for d, _ in flat], dtype=np.int64)
+        self.line_cap = np.array([c for _, c in flat], dtype=float)
+        # Plain lists for the per-hour Python path
+        self._rows = [[(d, c) for d, c in p] for p in per_source]
+
+    @property
+    def n_links(self):
+        return len(self.district_idx)
+
+    # Construction helpers
+    @classmethod
+    def full(cls, sources, districts):
+        """Every source reaches every district, no line limits."""
+        return cls(districts, [s["id"] for s in sources],
+                ((s["id"], d, None) for s in sources for d in districts))
+
+    @classmethod
+    def from_sources(cls, sources, districts):
+        """
+        Links from each source's optional "districts" list (all districts
+        when absent) and optional "line_caps" dict {district: kWh}.
+        """
+        links = []
+        for s in sources:
+            caps = s.get("line_caps", {})
+            for d in s.get("districts", districts):
+                links.append((s["id"], d, caps.get(d)))
+        return cls(districts, [s["id"] for s in sources], links)
+
+    def links_of(self, source_id):
+        """{district: line_cap} for one source (used by the exact engine)."""
+        return {self.districts[d]: c for d, c in self._rows[self.s_index[source_id]]}
+
+    # Dispatch
+    def dispatch(self, merit_order, demand):
+        """
+        Greedy dispatch for one hour.
+        merit_order : available source dicts, cheapest first
+        demand      : demand per district (list, self.districts order)
+        Returns (use per source id, served per district, cost).
+        """
+        remaining = list(demand)
+        served = [0] * len(remaining)
+        use = {}
+        cost = 0.0
+        for source in merit_order:
+            left = source["max_cap"]
+            used = 0
+            for d, line in self._rows[self.s_index[source["id"]]]:
+                if left <= 0:
+                    break
+                give = min(remaining[d], line, left)
+                if give <= 0:
+                    continue
+                remaining[d] -= give
+                served[d] += give
+                left -= give
+                used += give
+            if used:
+                use[source["id"]] = used
+                cost += used * source["cost"]
+        return use, served, cost
+
+    def dispatch_batch(self, demand, hours, ordered_sources):
+        """
+        Vectorized greedy over many hours.
+        demand          : (H, D) array
+        hours           : (H,) hour-of-day ints
+        ordered_sources : source dicts, cheapest first (availability is
+                        checked per hour)
+        Returns (use (H, S) in ordered_sources order, served (H, D)).
+        """
+        demand = np.asarray(demand, dtype=float)
+        hours = np.asarray(hours)
+        remaining = demand.copy()
+        served = np.zeros_like(demand)
+        use = np.zeros((len(hours), len(ordered_sources)))
+        for j, source in enumerate(ordered_sources):
+            row = self.s_index[source["id"]]
+            lo, hi = self.indptr[row], self.indptr[row + 1]
+            if lo == hi:
+                continue
+            avail = (source["start"] <= hours) & (hours < source["end"])
+            left = np.where(avail, float(source["max_cap"]), 0.0)
+            # One link at a time (vectorized over hours), subtracting and
+            # adding in the same order as dispatch, so the kWh and costs
+            # come out bit-for-bit equal rather than off in the last place
+            for d, line in zip(self.district_idx[lo:hi].tolist(), self.line_cap[lo:hi].tolist()):
+                give = np.minimum(np.minimum(remaining[:, d], line), left)
+                remaining[:, d] -= give
+                served[:, d] += give
+                left -= give
+                use[:, j] += give
+        return use, served
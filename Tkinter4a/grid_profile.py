@@ -0,0 +1,137 @@
+"""
+Per-stage timing for the Smart Energy Grid dashboard.
+Wrap a hot path in `with PROFILER.stage("name"):`. While the profiler is
+disabled, stage() hands back one shared do-nothing context manager, so the
+cost is a method call and an attribute check. When enabled, every stage
+keeps a call counter and a fixed-size ring buffer of recent latencies,
+from which the panel shows percentiles; samples can be exported as JSON
+lines.
+"""
+
+import json
+import threading
+import time
+from contextlib import nullcontext
+
+RING_SIZE = 512
+_NULL = nullcontext()
+
+
+class _StageStats:
+    """Counter + ring buffer of (wall time, milliseconds) samples."""
+
+    __slots__ = ("count", "total_ms", "ring", "pos")
+
+    def __init__(self, size):
+        self.count = 0
+        self.total_ms = 0.0
+        self.ring = [None] * size
+        self.pos = 0
+
+    def add(self, wall, ms):
+        self.ring[self.pos] = (wall, ms)
+        self.pos = (self.pos + 1) % len(self.ring)
+        self.count += 1
+        self.total_ms += ms
+
+    def samples(self):
+        """Ring contents, oldest first."""
+        ring = self.ring[self.pos:] + self.ring[:self.pos]
+        return [s for s in ring if s is not None]
+
+
+class _Timer:
+    __slots__ = ("profiler", "name", "t0")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, (time.perf_counter() - self.t0) * 1000)
+        return False
+
+
+def _percentile(sorted_ms, q):
+    if not sorted_ms:
+        return 0.0
+    k = min(len(sorted_ms) - 1, max(0, round(q / 100 * (len(sorted_ms) - 1))))
+    return sorted_ms[k]
+
+
+class Profiler:
+    def __init__(self, enabled=False, ring_size=RING_SIZE):
+        self.enabled = enabled
+        self.ring_size = ring_size
+        self._stages = {}
+        self._lock = threading.Lock()     # the worker thread records too
+
+    def stage(self, name):
+        """Context manager timing one pass through `name`."""
+        if not self.enabled:
+            return _NULL
+        return _Timer(self, name)
+
+    def wrap(self, name, fn):
+        """fn wrapped in stage(name), e.g. a canvas' draw method."""
+        def timed(*args, **kwargs):
+            with self.stage(name):
+                return fn(*args, **kwargs)
+        return timed
+
+    def record(self, name, ms):
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = _StageStats(self.ring_size)
+            stats.add(time.time(), ms)
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+    def summary(self):
+        """{stage: {calls, last_ms, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}."""
+        with self._lock:
+            stages = {name: (s.count, s.total_ms, s.samples()) for name, s in self._stages.items()}
+        out = {}
+        for name, (count, total, samples) in stages.items():
+            recent = sorted(ms for _, ms in samples)
+            out[name] = {
+                "calls": count,
+                "last_ms": round(samples[-1][1], 3) if samples else 0.0,
+                "mean_ms": round(total / count, 3) if count else 0.0,
+                "p50_ms": round(_percentile(recent, 50), 3),
+                "p95_ms": round(_percentile(recent, 95), 3),
+                "p99_ms": round(_percentile(recent, 99), 3),
+                "max_ms": round(recent[-1], 3) if recent else 0.0,
+            }
+        return out
+
+    def export_jsonl(self, path):
+        """One line per buffered sample: {"stage", "time", "ms"}. Returns the count."""
+        with self._lock:
+            rows = [(name, wall, ms) for name, s in self._stages.items() for wall, ms in s.samples()]
+        rows.sort(key=lambda r: r[1])
+        with open(path, "w") as f:
+            for name, wall, ms in rows:
+                f.write(json.dumps({"stage": name, "time": round(wall, 6), "ms": round(ms, 4)}) + "\n")
+        return len(rows)
+
+    def format_table(self):
+        """Fixed-width text table of summary(), for the GUI panel."""
+        lines = [f"{'stage':<16}{'calls':>7}{'last':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"]
+        for name, s in sorted(self.summary().items()):
+            lines.append(f"{name:<16}{s['calls']:>7}{s['last_ms']:>9.2f}{s['p50_ms']:>9.2f}"
+                        f"{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}{s['max_ms']:>9.2f}")
+        return "\n".join(lines)
+
+
+# Shared instance. Smart_Grid times dispatch, KPIs, table renders and the
+# chart updates / canvas redraws around grid_charts calls; grid_charts
+# itself does not import it
+PROFILER = Profiler()
@@ -0,0 +1,173 @@
+"""
+Battery storage for the Smart Energy Grid optimizer.
+Plans when to charge and discharge a battery across hours with a dynamic
+program over discretized state of charge (SoC), so surplus cheap energy
+(e.g. spare hydro in the morning) can replace diesel in the evening.
+Required libraries: numpy (installed together with matplotlib)
+"""
+
+import numpy as np
+
+from grid_batch import greedy_fill, source_arrays
+
+RENEWABLE_TYPES = ("Solar", "Hydro")
+
+# Penalty (Rs./kWh) for demand that cannot be served at all. Keeps the DP
+# from "saving money" by leaving districts dark.
+UNSERVED_PENALTY = 10.0
+
+
+#  COST CURVES
+
+class CostCurve:
+    """
+    Piecewise-linear cost of serving a net load with the greedy merit
+    order available in one hour. Load above total capacity is unserved.
+    """
+
+    def __init__(self, caps, costs):
+        self.cum_cap = np.concatenate(([0.0], np.cumsum(caps)))
+        self.cum_cost = np.concatenate(([0.0], np.cumsum(caps * costs)))
+        self.total_cap = self.cum_cap[-1]
+
+    def generation_cost(self, load):
+        return np.interp(np.minimum(load, self.total_cap), self.cum_cap, self.cum_cost)
+
+    def unserved(self, load):
+        return np.maximum(load - self.total_cap, 0.0)
+
+
+def hourly_curves(hours, sources):
+    """One CostCurve per distinct hour-of-day, shared by every day."""
+    src = source_arrays(sources)
+    curves = {}
+    for h in np.unique(hours):
+        avail = (src["start"] <= h) & (h < src["end"])
+        curves[int(h)] = CostCurve(src["cap"][avail], src["cost"][avail])
+    return curves
+
+
+#  TRANSITION TABLE
+
+class TransitionTable:
+    """
+    Precomputed SoC transitions for one battery.
+    grid_delta[i, j] is the extra grid energy (kWh) needed to move from
+    level i to level j in one hour: positive when charging (losses paid
+    on the way in), negative when discharging, NaN when the move breaks
+    the charge/discharge rate. Built once, reused for every hour.
+    """
+
+    def __init__(self, battery, steps=20):
+        self.battery = battery
+        self.levels = np.linspace(0.0, float(battery["capacity"]), steps + 1)
+        delta = self.levels[None, :] - self.levels[:, None]
+        feasible = (delta <= battery["charge_rate"] + 1e-9) & \
+                (-delta <= battery["discharge_rate"] + 1e-9)
+        grid = np.where(delta > 0, delta / battery["efficiency"], delta)
+        self.grid_delta = np.where(feasible, grid, np.nan)
+
+    def nearest_level(self, soc):
+        return int(np.abs(self.levels - soc).argmin())
+
+
+#  SOC DYNAMIC PROGRAM
+
+class StoragePlan:
+    """Battery schedule plus the resulting per-hour dispatch."""
+
+    def __init__(self, labels, hours, totals, soc, grid_delta, sources,
+                curves, renewable_types=RENEWABLE_TYPES):
+        self.labels = labels
+        self.hours = hours
+        self.totals = totals
+        self.soc = soc                                # (H + 1,) kWh stored
+        self.charge = np.maximum(grid_delta, 0.0)     # grid kWh into battery
+        self.discharge = np.maximum(-grid_delta, 0.0)  # kWh delivered by battery
+        self.net_load = totals + grid_delta
+
+        src = source_arrays(sources)
+        avail = (src["start"][None, :] <= hours[:, None]) & (hours[:, None] < src["end"][None, :])
+        caps = np.where(avail, src["cap"][None, :], 0.0)
+        self.types = src["types"]
+        self.use = greedy_fill(self.net_load, caps)
+        self.cost = self.use @ src["cost"]
+        self.unserved = np.array([curves[int(h)].unserved(l) for h, l in zip(hours, self.net_load)])
+        self.fulfilled = totals - self.unserved
+        self.renewable_types = renewable_types
+
+    @property
+    def total_cost(self):
+        return round(float(self.cost.sum()), 2)
+
+    def to_results(self):
+        """run_full_day style dicts with an extra "battery" entry per hour."""
+        results = []
+        for i, label in enumerate(self.labels):
+            allocations = dict.fromkeys(self.types, 0)
+            for typ, v in zip(self.types, self.use[i]):
+                allocations[typ] = round(allocations[typ] + float(v), 2)
+            generated = sum(allocations.values())
+            renewable = sum(v for k, v in allocations.items() if k in self.renewable_types)
+            total = float(self.totals[i])
+            fulfilled = round(float(self.fulfilled[i]), 2)
+            results.append({
+                "hour": label,
+                "total_demand": total,
+                "allocations": allocations,
+                "cost": round(float(self.cost[i]), 2),
+                "fulfilled": fulfilled,
+                "pct_met": round(fulfilled / total * 100, 1) if total > 0 else 0,
+                "within_tolerance": abs(fulfilled - total) <= total * 0.10,
+                "renewable_pct": round(renewable / generated * 100, 1) if generated > 0 else 0,
+                "diesel_used": allocations.get("Diesel", 0) > 0,
+                "battery": {
+                    "soc": round(float(self.soc[i + 1]), 2),
+                    "charge": round(float(self.charge[i]), 2),
+                    "discharge": round(float(self.discharge[i]), 2),
+                },
+            })
+        return results
+
+
+def plan_storage(totals, hours, sources, battery, table=None, steps=20,
+                initial_soc=0.0, labels=None, unserved_penalty=UNSERVED_PENALTY):
+    """
+    Minimum-cost battery schedule over any number of hours.
+    totals : (H,) total demand per hour (kWh)
+    hours  : (H,) hour-of-day ints for source availability
+    Each hour is one (levels x levels) array step, so cost grows linearly
+    with the horizon. Pass a prebuilt TransitionTable to reuse it.
+    """
+    totals = np.asarray(totals, dtype=float)
+    hours = np.asarray(hours, dtype=int)
+    if labels is None:
+        labels = [f"{h:02d}" for h in hours]
+    table = table or TransitionTable(battery, steps)
+    curves = hourly_curves(hours, sources)
+    grid_delta = table.grid_delta
+    n_levels = len(table.levels)
+
+    value = np.full(n_levels, np.inf)
+    value[table.nearest_level(initial_soc)] = 0.0
+    choice = np.empty((len(totals), n_levels), dtype=np.int32)
+
+    for t, (h, demand) in enumerate(zip(hours, totals)):
+        curve = curves[int(h)]
+        load = demand + grid_delta
+        step_cost = curve.generation_cost(load) + unserved_penalty * curve.unserved(load)
+        # No dumping energy back into the grid, no rate-breaking moves
+        step_cost = np.where(np.isnan(load) | (load < -1e-9), np.inf, step_cost)
+        total = value[:, None] + step_cost
+        choice[t] = total.argmin(axis=0)
+        value = total[choice[t], np.arange(n_levels)]
+
+    # Walk back from the cheapest final state
+    path = np.empty(len(totals) + 1, dtype=np.int32)
+    path[-1] = int(value.argmin())
+    for t in range(len(totals) - 1, -1, -1):
+        path[t] = choice[t, path[t + 1]]
+
+    soc = table.levels[path]
+    moves = grid_delta[path[:-1], path[1:]]
+    return StoragePlan(labels, hours, totals, soc, moves, sources, curves)
@@ -0,0 +1,227 @@
+"""
+Columnar result store for the Smart Energy Grid optimizer.
+Holds dispatch results as one NumPy structured array (one record per
+hour) instead of a nested dict per hour. Slices are views, columns are
+views, and KPI aggregates are single array reductions. ResultRow gives
+dict-style access to one record, so code written against allocate_hour
+results keeps working.
+Required libraries: numpy (installed together with matplotlib)
+"""
+
+import numpy as np
+
+HOUR_WIDTH = 32          # fits "2024-01-01T06:00:00.000000+05:45"
+
+
+def _as_number(x):
+    x = float(x)
+    return int(x) if x.is_integer() else x
+
+
+def _check_hours(labels):
+    """The hour field is fixed width: refuse labels it would cut short."""
+    too_long = [h for h in labels if len(str(h)) > HOUR_WIDTH]
+    if too_long:
+        raise ValueError(f"hour label {too_long[0]!r} is longer than {HOUR_WIDTH} characters")
+
+
+def _dtype(n_districts, n_types):
+    return np.dtype([
+        ("hour", f"U{HOUR_WIDTH}"),
+        ("demand", "f8", (n_districts,)),
+        ("alloc", "f8", (n_types,)),
+        ("total_demand", "f8"),
+        ("fulfilled", "f8"),
+        ("cost", "f8"),
+        ("pct_met", "f8"),
+        ("renewable_pct", "f8"),
+        ("within_tolerance", "?"),
+        ("diesel_used", "?"),
+    ])
+
+
+class ResultRow:
+    """Read-only dict-style view of one hour in a ResultStore."""
+
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store, i):
+        self._store = store
+        self._i = i
+
+    def __getitem__(self, key):
+        store, rec = self._store, self._store.data[self._i]
+        if key == "hour":
+            return str(rec["hour"])
+        if key == "allocations":
+            return {t: _as_number(v) for t, v in zip(store.types, rec["alloc"])}
+        if key == "districts":
+            return {d: _as_number(v) for d, v in zip(store.districts, rec["demand"])}
+        if key in ("total_demand", "fulfilled"):
+            return _as_number(rec[key])
+        if key in ("within_tolerance", "diesel_used"):
+            return bool(rec[key])
+        if key in ("cost", "pct_met", "renewable_pct"):
+            return float(rec[key])
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def as_dict(self):
+        keys = ("hour", "districts", "total_demand", "allocations", "cost", "fulfilled",
+                "pct_met", "within_tolerance", "renewable_pct", "diesel_used")
+        return {k: self[k] for k in keys}
+
+
+class ResultStore:
+    """Struct-of-arrays container for many hours of dispatch results."""
+
+    def __init__(self, data, districts, types=()):
+        self.data = data
+        self.districts = list(districts)
+        self.types = list(types)
+
+    # Construction
+    @classmethod
+    def empty(cls, districts, types=(), capacity=0):
+        return cls(np.zeros(capacity, dtype=_dtype(len(districts), len(types))), districts, types)
+
+    @classmethod
+    def from_results(cls, results, districts=None, types=None):
+        """
+        Pack a list (or any iterable) of allocate_hour dicts. Districts and
+        source types default to the keys of the first result.
+        """
+        results = list(results)
+        _check_hours(r["hour"] for r in results)
+        if districts is None:
+            districts = list(results[0]["districts"].keys()) if results else []
+        if types is None:
+            types = list(results[0]["allocations"].keys()) if results else []
+        store = cls.empty(districts, types, len(results))
+        data = store.data
+        for i, r in enumerate(results):
+            data[i] = (
+                r["hour"],
+                [r["districts"].get(d, 0) for d in districts] if "districts" in r else 0,
+                [r["allocations"].get(t, 0) for t in types],
+                r["total_demand"], r["fulfilled"], r["cost"],
+                r["pct_met"], r["renewable_pct"],
+                r["within_tolerance"], r["diesel_used"],
+            )
+        return store
+
+    @classmethod
+    def from_batch(cls, batch, types=None):
+        """Copy a grid_batch.BatchResult's arrays in, no per-hour dicts."""
+        types = batch.types if types is None else types
+        _check_hours(batch.labels)
+        store = cls.empty(batch.districts, types, len(batch))
+        data = store.data
+        data["hour"] = batch.labels
+        data["demand"] = batch.demand
+        if len(types):
+            data["alloc"] = np.stack([batch.by_type(t) for t in types], axis=1)
+        data["total_demand"] = batch.total_demand
+        data["fulfilled"] = batch.fulfilled
+        data["cost"] = batch.cost
+        data["pct_met"] = batch.pct_met
+        data["renewable_pct"] = batch.renewable_pct
+        data["within_tolerance"] = batch.within_tolerance
+        data["diesel_used"] = batch.diesel_used
+        return store
+
+    # Access
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        for i in range(len(self.data)):
+            yield ResultRow(self, i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ResultStore(self.data[index], self.districts, self.types)
+        if index < 0:
+            index += len(self.data)
+        return ResultRow(self, index)
+
+    def column(self, name):
+        """Zero-copy column view: a field name, a source type or a district."""
+        if name in self.types:
+            return self.data["alloc"][:, self.types.index(name)]
+        if name in self.data.dtype.names:
+            return self.data[name]
+        if name in self.districts:
+            return self.data["demand"][:, self.districts.index(name)]
+        raise KeyError(name)
+
+    def hour_range(self, start, end):
+        """
+        Rows with start <= hour label < end. Labels sort as text, which
+        matches time order for "06" style hours and ISO timestamps.
+        """
+        labels = self.data["hour"]
+        lo = int(np.searchsorted(labels, start, side="left"))
+        hi = int(np.searchsorted(labels, end, side="left"))
+        return self[lo:hi]
+
+    # Aggregates
+    def kpis(self):
+        """The four dashboard KPIs, as array reductions."""
+        n = len(self.data)
+        if n == 0:
+            return {"total_cost": 0.0, "avg_renewable_pct": 0.0, "diesel_hours": 0, "avg_met_pct": 0.0}
+        return {
+            "total_cost": float(self.data["cost"].sum()),
+            "avg_renewable_pct": float(self.data["renewable_pct"].mean()),
+            "diesel_hours": int(self.data["diesel_used"].sum()),
+            "avg_met_pct": float(self.data["pct_met"].mean()),
+        }
+
+    def totals_by_type(self):
+        return {t: _as_number(v) for t, v in zip(self.types, self.data["alloc"].sum(axis=0))}
+
+
+class StoreBuilder:
+    """
+    Append allocate_hour results one at a time into a growing
+    ResultStore (capacity doubles). Also works as a grid_stream sink.
+    Any ISO timestamp label fits; longer labels raise ValueError.
+    """
+
+    def __init__(self, districts=None, types=None, capacity=1024):
+        self.districts = districts
+        self.types = types
+        self.capacity = capacity
+        self._store = None
+        self._n = 0
+
+    def write(self, r):
+        if self._store is None:
+            districts = self.districts
+            if districts is None:
+                districts = list(r["districts"].keys()) if "districts" in r else []
+            if self.types is None:
+                self.types = list(r["allocations"].keys())
+            self._store = ResultStore.empty(districts, self.types, self.capacity)
+        if self._n == len(self._store.data):
+            grown = np.zeros(max(2 * len(self._store.data), 1), dtype=self._store.data.dtype)
+            grown[:self._n] = self._store.data
+            self._store.data = grown
+        row = ResultStore.from_results([r], self._store.districts, self.types).data[0]
+        self._store.data[self._n] = row
+        self._n += 1
+
+    def close(self):
+        pass
+
+    def build(self):
+        """The rows written so far (a view, not a copy)."""
+        if self._store is None:
+            return ResultStore.empty(self.districts or [], self.types or [])
+        return self._store[:self._n]
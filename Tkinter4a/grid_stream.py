@@ -0,0 +1,219 @@
+"""
+Streaming meter-data pipeline for the Smart Energy Grid optimizer.
+
+    readings (CSV / JSON lines)  ->  dispatch (allocator)  ->  sink
+
+Every stage is a generator, so only one hour is in memory at a time no
+matter how long the input file is.
+
+CSV input is "wide": one row per hour, a "hour" or "timestamp" column
+followed by one column per district, e.g.
+
+    timestamp,A,B,C
+    2024-01-01T06:00,20,15,25
+
+JSON lines input has one object per hour:
+
+    {"timestamp": "2024-01-01T06:00", "districts": {"A": 20, "B": 15, "C": 25}}
+"""
+
+import csv
+import json
+from datetime import datetime
+
+TIME_KEYS = ("timestamp", "hour")
+
+
+#  READERS
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def _hour_of_day(label):
+    """'06' -> '06', '2024-01-01T06:00' -> '06'."""
+    label = str(label).strip()
+    if label.isdigit():
+        return f"{int(label):02d}"
+    return f"{datetime.fromisoformat(label).hour:02d}"
+
+
+def read_csv_demand(path):
+    """Yield (label, hour_str, districts) for every row of a wide CSV file."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        time_col = next((i for i, h in enumerate(header) if h.strip().lower() in TIME_KEYS), 0)
+        district_cols = [(i, h.strip()) for i, h in enumerate(header) if i != time_col]
+        for row in reader:
+            if not row:
+                continue
+            label = row[time_col].strip()
+            districts = {name: _number(row[i]) for i, name in district_cols}
+            yield label, _hour_of_day(label), districts
+
+
+def read_jsonl_demand(path):
+    """Yield (label, hour_str, districts) for every line of a JSON lines file."""
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            label = str(next(record[k] for k in TIME_KEYS if k in record))
+            yield label, _hour_of_day(label), record["districts"]
+
+
+def read_demand(path, start=None, end=None):
+    """
+    Pick a reader by file extension: .csv, .gridarc (binary archive, see
+    grid_archive.py; start / end select a date range), otherwise JSON lines.
+    """
+    name = str(path).lower()
+    if name.endswith(".csv"):
+        return read_csv_demand(path)
+    if name.endswith(".gridarc"):
+        import grid_archive
+        return grid_archive.iter_readings(path, start, end)
+    return read_jsonl_demand(path)
+
+
+def iter_demand_data(demand_data):
+    """Adapter so an in-memory DEMAND_DATA dict can feed the pipeline."""
+    for hour_str in sorted(demand_data.keys()):
+        yield hour_str, hour_str, demand_data[hour_str]
+
+
+#  DISPATCH STAGE
+
+def dispatch(readings, allocate):
+    """
+    Run each reading through `allocate(hour_str, districts)` lazily.
+    The result's "hour" is replaced by the reading label (timestamp).
+    """
+    for label, hour_str, districts in readings:
+        result = allocate(hour_str, districts)
+        result["hour"] = label
+        yield result
+
+
+#  SINKS  (anything with write(result) and close())
+
+class CsvSink:
+    """
+    Write one CSV row per dispatched hour. One column per source type;
+    the types come from `types` or from the first result's allocations.
+    """
+
+    FIELDS = ("fulfilled", "total_demand", "pct_met", "cost", "renewable_pct", "within_tolerance")
+
+    def __init__(self, path, types=None):
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self.types = list(types) if types is not None else None
+        if self.types is not None:
+            self._write_header()
+
+    def _write_header(self):
+        self._writer.writerow(("hour", *self.types, *self.FIELDS))
+
+    def write(self, r):
+        alloc = r["allocations"]
+        if self.types is None:
+            self.types = list(alloc)
+            self._write_header()
+        self._writer.writerow((r["hour"], *(alloc.get(t, 0) for t in self.types),
+                            r["fulfilled"], r["total_demand"], r["pct_met"], r["cost"],
+                            r["renewable_pct"], int(r["within_tolerance"])))
+
+    def close(self):
+        if self.types is None:              # nothing written: header only
+            self.types = []
+            self._write_header()
+        self._file.close()
+
+
+class JsonlSink:
+    """Write each result as one JSON line."""
+
+    def __init__(self, path):
+        self._file = open(path, "w")
+
+    def write(self, r):
+        self._file.write(json.dumps(r) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class KpiAggregator:
+    """Running totals for the dashboard KPIs (no result list kept)."""
+
+    def __init__(self):
+        self.hours = 0
+        self.total_cost = 0.0
+        self.renewable_sum = 0.0
+        self.diesel_hours = 0
+        self.met_sum = 0.0
+
+    def write(self, r):
+        self.hours += 1
+        self.total_cost += r["cost"]
+        self.renewable_sum += r["renewable_pct"]
+        self.diesel_hours += 1 if r["diesel_used"] else 0
+        self.met_sum += r["pct_met"]
+
+    def close(self):
+        pass
+
+    def summary(self):
+        n = self.hours or 1
+        return {
+            "hours": self.hours,
+            "total_cost": round(self.total_cost, 2),
+            "avg_renewable_pct": round(self.renewable_sum / n, 1),
+            "diesel_hours": self.diesel_hours,
+            "avg_met_pct": round(self.met_sum / n, 1),
+        }
+
+
+class CallbackSink:
+    """Call a function per result, e.g. to insert a row into the GUI table."""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, r):
+        self.callback(r)
+
+    def close(self):
+        pass
+
+
+class TeeSink:
+    """Fan one stream out to several sinks."""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def write(self, r):
+        for sink in self.sinks:
+            sink.write(r)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def run_pipeline(readings, allocate, sink):
+    """Drain readings -> allocate -> sink. Returns the number of hours."""
+    count = 0
+    try:
+        for result in dispatch(readings, allocate):
+            sink.write(result)
+            count += 1
+    finally:
+        sink.close()
+    return count
@@ -0,0 +1,162 @@
+"""
+Cost / capacity sensitivity sweep for the Smart Energy Grid optimizer.
+Evaluates a grid of (cost multiplier for one source type) x (capacity
+multiplier for another) over a demand horizon, e.g. "diesel 0.5x-2x
+cost" against "solar 0.5x-2x capacity".
+
+Shared work is done once:
+  * hours with the same (hour of day, total demand) are dispatched once
+    and weighted by how often they occur (a repeated profile collapses
+    to its 18 distinct hours, however many days are swept);
+  * cost multipliers only matter through the merit order they produce,
+    so points are grouped by merit order and each group dispatches all
+    capacity multipliers in one vectorized pass. Costs for every point in
+    the group then come from a single matrix product.
+Required libraries: numpy (installed together with matplotlib)
+"""
+
+import numpy as np
+
+from grid_batch import RENEWABLE_TYPES
+
+MAX_CELLS = 4_000_000       # capacity points x hours x sources per pass
+
+
+class SweepResult:
+    """Metric grids with rows = capacity multipliers, columns = cost multipliers."""
+
+    def __init__(self, cost_type, cost_mults, cap_type, cap_mults, total_cost,
+                renewable_pct, unmet_kwh, diesel_kwh, merit_orders):
+        self.cost_type = cost_type
+        self.cost_mults = cost_mults
+        self.cap_type = cap_type
+        self.cap_mults = cap_mults
+        self.total_cost = total_cost
+        self.renewable_pct = renewable_pct
+        self.unmet_kwh = unmet_kwh
+        self.diesel_kwh = diesel_kwh
+        self.merit_orders = merit_orders    # distinct dispatch groups evaluated
+
+    @property
+    def points(self):
+        return self.total_cost.size
+
+    def best(self):
+        """Cheapest point: (cost multiplier, capacity multiplier, cost)."""
+        i, j = np.unravel_index(np.argmin(self.total_cost), self.total_cost.shape)
+        return float(self.cost_mults[j]), float(self.cap_mults[i]), float(self.total_cost[i, j])
+
+
+def sweep(demand, hours, sources, cost_type, cost_mults, cap_type, cap_mults,
+        renewable_types=RENEWABLE_TYPES, max_cells=MAX_CELLS, progress=None):
+    """
+    demand     : (H, D) district demand, or (H,) hourly totals
+    hours      : (H,) hour-of-day ints (source availability)
+    cost_mults : multipliers applied to the cost of every `cost_type` source
+    cap_mults  : multipliers applied to the max_cap of every `cap_type` source
+    Greedy (pooled) dispatch, the same rule as grid_batch.allocate_batch.
+    progress(fraction, text) is called after every block of points (a
+    worker's ctx.progress, so the sweep stops there once cancelled).
+    """
+    demand = np.asarray(demand, dtype=float)
+    totals = demand.sum(axis=1) if demand.ndim == 2 else demand
+    hours = np.asarray(hours, dtype=int)
+    cost_mults = np.asarray(cost_mults, dtype=float)
+    cap_mults = np.asarray(cap_mults, dtype=float)
+
+    # Distinct (hour of day, total) rows, weighted by how often they occur
+    rows, weight = np.unique(np.column_stack([hours, totals]), axis=0, return_counts=True)
+    u_hours, u_totals = rows[:, 0].astype(int), rows[:, 1]
+    demand_kwh = float(totals.sum())
+
+    # SOURCES order (not cost order): the merit order is decided per point
+    types = np.array([s["type"] for s in sources])
+    cost0 = np.array([s["cost"] for s in sources], dtype=float)
+    cap0 = np.array([s["max_cap"] for s in sources], dtype=float)
+    start = np.array([s["start"] for s in sources], dtype=int)
+    end = np.array([s["end"] for s in sources], dtype=int)
+    avail = (start[None, :] <= u_hours[:, None]) & (u_hours[:, None] < end[None, :])
+    is_cost = types == cost_type
+    cap_scale = np.where(types == cap_type, cap_mults[:, None], 1.0)            # (C, S)
+    renewable = np.isin(types, renewable_types)
+    diesel = types == "Diesel"
+
+    # Group cost multipliers by the merit order they produce
+    groups = {}
+    for j, m in enumerate(cost_mults):
+        order = np.argsort(np.where(is_cost, cost0 * m, cost0), kind="stable")
+        groups.setdefault(tuple(order), []).append(j)
+
+    shape = (len(cap_mults), len(cost_mults))
+    total_cost = np.zeros(shape)
+    renewable_pct = np.zeros(shape)
+    unmet_kwh = np.zeros(shape)
+    diesel_kwh = np.zeros(shape)
+    step = max(1, max_cells // max(avail.size, 1))
+    n_blocks = len(groups) * -(-len(cap_mults) // step)
+    done = 0
+
+    for order, cols in groups.items():
+        order = np.array(order, dtype=int)
+        unit_cost = np.where(is_cost[order][:, None], cost0[order][:, None] * cost_mults[cols][None, :],
+                            cost0[order][:, None])                            # (S, group)
+        for lo in range(0, len(cap_mults), step):
+            # Available capacity for this block of capacity points, (c, U, S)
+            c = np.where(avail[None, :, order], cap0[order] * cap_scale[lo:lo + step, None, order], 0.0)
+            before = np.cumsum(c, axis=2) - c
+            use = np.clip(u_totals[None, :, None] - before, 0.0, c)          # (c, U, S)
+            energy = np.einsum("cus,u->cs", use, weight)                      # kWh per source
+            fulfilled = energy.sum(axis=1)
+            rows_ = slice(lo, lo + len(c))
+            total_cost[rows_, cols] = energy @ unit_cost
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pct = np.where(fulfilled > 0, energy[:, renewable[order]].sum(axis=1) / fulfilled * 100, 0.0)
+            renewable_pct[rows_, cols] = pct[:, None]
+            unmet_kwh[rows_, cols] = (demand_kwh - fulfilled)[:, None]
+            diesel_kwh[rows_, cols] = energy[:, diesel[order]].sum(axis=1)[:, None]
+            done += 1
+            if progress:
+                progress(done / n_blocks, f"{done}/{n_blocks} sweep blocks")
+
+    return SweepResult(cost_type, cost_mults, cap_type, cap_mults, total_cost,
+                    renewable_pct, unmet_kwh, diesel_kwh, len(groups))
+
+
+#  HEATMAPS
+
+def plot_heatmaps(fig, result, colors=None):
+    """Draw total cost and renewable share heatmaps onto a matplotlib Figure."""
+    colors = colors or {}
+    fg = colors.get("text", "black")
+    fig.clear()
+    if "bg" in colors:
+        fig.patch.set_facecolor(colors["bg"])
+    panels = [
+        (result.total_cost, "Total cost (Rs.)", "magma_r"),
+        (result.renewable_pct, "Renewable share (%)", "Greens"),
+    ]
+    extent = (result.cost_mults[0], result.cost_mults[-1], result.cap_mults[0], result.cap_mults[-1])
+    for k, (grid, title, cmap) in enumerate(panels):
+        ax = fig.add_subplot(1, len(panels), k + 1)
+        im = ax.imshow(grid, origin="lower", aspect="auto", cmap=cmap, extent=extent,
+                    interpolation="nearest")
+        ax.set_title(title, color=fg, fontsize=9)
+        ax.set_xlabel(f"{result.cost_type} cost x", color=fg, fontsize=8)
+        ax.set_ylabel(f"{result.cap_type} capacity x", color=fg, fontsize=8)
+        ax.tick_params(colors=fg, labelsize=7)
+        bar = fig.colorbar(im, ax=ax)
+        bar.ax.tick_params(colors=fg, labelsize=7)
+    best_cost, best_cap, cost = result.best()
+    fig.suptitle(f"{result.points} scenarios, {result.merit_orders} merit orders — "
+                f"cheapest: {result.cost_type} x{best_cost:.2f}, {result.cap_type} x{best_cap:.2f} "
+                f"(Rs. {cost:,.0f})", color=fg, fontsize=9)
+    fig.tight_layout(rect=(0, 0, 1, 0.94))
+    return fig
+
+
+def save_heatmaps(result, path):
+    """Write the heatmaps to an image file without any GUI backend."""
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(10, 4.5))
+    plot_heatmaps(fig, result)
+    fig.savefig(path, dpi=120)
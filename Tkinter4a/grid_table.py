@@ -0,0 +1,164 @@
+"""
+Virtualized allocation table for the Smart Energy Grid dashboard.
+The Treeview only ever holds as many items as fit on screen. Scrolling,
+sorting and filtering work on index arrays over a grid_store.ResultStore,
+and the visible items are rewritten in place, so a year of hourly rows
+costs the same to show as one day.
+Required libraries: numpy (installed together with matplotlib)
+"""
+
+import numpy as np
+
+# Fixed headings around the one-column-per-source-type block
+LEAD_COLUMNS = ("Hour",)
+TAIL_COLUMNS = ("Total", "Demand", "% Met", "Cost (Rs.)")
+
+# Heading -> ResultStore column used for sorting (source types map to themselves)
+SORT_KEYS = {
+    "Hour": "hour", "Total": "fulfilled", "Demand": "total_demand",
+    "% Met": "pct_met", "Cost (Rs.)": "cost",
+}
+
+# Filter name -> row mask over a ResultStore
+FILTERS = {
+    "All hours":       None,
+    "Diesel only":     lambda store: store.column("diesel_used"),
+    "No diesel":       lambda store: ~store.column("diesel_used"),
+    "Out of tolerance": lambda store: ~store.column("within_tolerance"),
+    "Shortfall":       lambda store: store.column("pct_met") < 100,
+}
+
+
+def row_tag(r):
+    return "diesel" if r["diesel_used"] else ("warn" if not r["within_tolerance"] else "ok")
+
+
+def table_columns(types):
+    """Treeview headings for a fleet with these source types."""
+    return LEAD_COLUMNS + tuple(types) + TAIL_COLUMNS
+
+
+def row_values(r, types):
+    alloc = r["allocations"]
+    return (
+        r["hour"],
+        *(alloc.get(t, 0) for t in types),
+        int(r["fulfilled"]), r["total_demand"],
+        f"{r['pct_met']}%", f"{r['cost']}"
+    )
+
+
+class VirtualTable:
+    """Drives an existing Treeview + Scrollbar from a ResultStore."""
+
+    def __init__(self, tree, scrollbar, types, rowheight=22, header=24):
+        self.tree = tree
+        self.types = list(types)
+        self.columns = table_columns(self.types)
+        self.scrollbar = scrollbar
+        self.rowheight = rowheight
+        self.header = header
+        self.store = None
+        self.view = np.zeros(0, dtype=np.int64)   # store row index per table row
+        self.offset = 0
+        self.slots = []
+        self.filter_name = "All hours"
+        self.sort_key = None
+        self.sort_desc = False
+
+        scrollbar.configure(command=self.yview)
+        tree.bind("<Configure>", self._on_resize)
+        tree.bind("<MouseWheel>", self._on_wheel)
+        tree.bind("<Button-4>", lambda e: self._scroll(-3))
+        tree.bind("<Button-5>", lambda e: self._scroll(3))
+        for col in self.columns:
+            tree.heading(col, command=lambda c=col: self.sort_by(c))
+
+    # Data
+    def set_store(self, store):
+        self.store = store
+        self.offset = 0
+        self._rebuild_view()
+
+    def set_filter(self, name):
+        self.filter_name = name
+        self.offset = 0
+        self._rebuild_view()
+
+    def sort_by(self, heading):
+        if self.sort_key == heading:
+            self.sort_desc = not self.sort_desc
+        else:
+            self.sort_key, self.sort_desc = heading, False
+        self._rebuild_view()
+
+    def _rebuild_view(self):
+        if self.store is None:
+            self.view = np.zeros(0, dtype=np.int64)
+        else:
+            mask_fn = FILTERS.get(self.filter_name)
+            if mask_fn is None:
+                view = np.arange(len(self.store))
+            else:
+                view = np.flatnonzero(mask_fn(self.store))
+            if self.sort_key is not None:
+                keys = self.store.column(SORT_KEYS.get(self.sort_key, self.sort_key))[view]
+                order = np.argsort(keys, kind="stable")
+                view = view[order[::-1] if self.sort_desc else order]
+            self.view = view
+        for col in self.columns:
+            arrow = ""
+            if col == self.sort_key:
+                arrow = " ▼" if self.sort_desc else " ▲"
+            self.tree.heading(col, text=col + arrow)
+        self.render()
+
+    def __len__(self):
+        return len(self.view)
+
+    # Window
+    def _on_resize(self, event):
+        rows = max(1, (event.height - self.header) // self.rowheight)
+        if rows != len(self.slots):
+            while len(self.slots) < rows:
+                self.slots.append(self.tree.insert("", "end", values=(), tags=("ok",)))
+            while len(self.slots) > rows:
+                self.tree.delete(self.slots.pop())
+            self.render()
+
+    def _max_offset(self):
+        return max(len(self.view) - len(self.slots), 0)
+
+    def _scroll(self, rows):
+        self.offset = min(max(self.offset + rows, 0), self._max_offset())
+        self.render()
+        return "break"
+
+    def _on_wheel(self, event):
+        return self._scroll(-3 if event.delta > 0 else 3)
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, units|pages)."""
+        if args and args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.view))
+            self._scroll(0)
+        elif args and args[0] == "scroll":
+            step = len(self.slots) if args[2] == "pages" else 1
+            self._scroll(int(args[1]) * step)
+
+    def render(self):
+        n = len(self.view)
+        self.offset = min(self.offset, self._max_offset())
+        for k, iid in enumerate(self.slots):
+            i = self.offset + k
+            if i < n:
+                r = self.store[int(self.view[i])]
+                self.tree.item(iid, values=row_values(r, self.types), tags=(row_tag(r),))
+            else:
+                self.tree.item(iid, values=(), tags=("ok",))
+        if n:
+            first = self.offset / n
+            last = min(self.offset + len(self.slots), n) / n
+            self.scrollbar.set(first, last)
+        else:
+            self.scrollbar.set(0, 1)
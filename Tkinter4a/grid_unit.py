@@ -0,0 +1,399 @@
+"""
+Unit commitment for the Smart Energy Grid optimizer.
+Greedy dispatch lets a unit jump from 0 to full output in one hour and
+stop again the next. Sources may carry these optional keys:
+
+    "min_output"    kWh a running unit produces at least (default 0)
+    "ramp_up"       kWh/h a running unit may rise (default max_cap)
+    "ramp_down"     kWh/h a running unit may fall (default max_cap)
+    "startup_cost"  Rs. per start (default 0)
+    "min_up"        hours a unit stays on once started (default 1)
+    "min_down"      hours a unit stays off once stopped (default 1)
+
+A start may go straight to max(min_output, ramp_up) and a stop may come
+from up to max(min_output, ramp_down). Units start the horizon off and
+free to start.
+
+Solved by Lagrangian relaxation: an hourly price (lambda) on demand
+decouples the units, and each unit's schedule is then a DP over
+(on / off, hours in that state, output level) states. All units step
+through one hour together as a (units x states x states) array
+operation, with a transition table built once. Subgradient updates move
+the prices towards the balance; every iteration's on / off plan is
+turned into a ramp-feasible continuous dispatch and the cheapest one is
+kept.
+
+Two bounds are reported. The DP's dual value is only approximate: the DP
+sees a few discrete output levels, which can overstate what the
+continuous problem can reach, so the gap to it can be understated (or
+negative). It steers the prices and the stopping rule. lower_bound is a
+valid bound on the continuous problem, the dual of the relaxation that
+drops ramps, minimum up / down times and start-up costs (each unit runs
+flat out in the hours its price beats its cost). That bound can be
+loose, so gap_pct errs on the side of reporting too large a gap. Both
+bounds are on the objective (cost plus the unserved-demand penalty), not
+on total_cost alone; summary() reports them under objective_* names.
+Required libraries: numpy (installed together with matplotlib)
+"""
+
+import numpy as np
+
+from grid_batch import greedy_fill, source_arrays
+from grid_storage import UNSERVED_PENALTY
+
+RENEWABLE_TYPES = ("Solar", "Hydro")
+EPS = 1e-9
+
+MAX_ITERATIONS = 60
+GAP_TOLERANCE = 0.005       # stop once within 0.5 % of the approximate DP bound
+
+
+#  UNIT DATA
+
+def unit_arrays(sources):
+    """source_arrays plus the commitment fields, in cost order."""
+    ordered = sorted(sources, key=lambda x: x["cost"])
+    src = source_arrays(sources)
+    cap = src["cap"]
+    src["min_output"] = np.array([s.get("min_output", 0) for s in ordered], dtype=float)
+    src["ramp_up"] = np.array([s.get("ramp_up", s["max_cap"]) for s in ordered], dtype=float)
+    src["ramp_down"] = np.array([s.get("ramp_down", s["max_cap"]) for s in ordered], dtype=float)
+    src["startup_cost"] = np.array([s.get("startup_cost", 0) for s in ordered], dtype=float)
+    src["min_up"] = np.array([max(1, s.get("min_up", 1)) for s in ordered], dtype=int)
+    src["min_down"] = np.array([max(1, s.get("min_down", 1)) for s in ordered], dtype=int)
+    src["min_output"] = np.minimum(src["min_output"], cap)
+    # Output allowed in the first hour on / the last hour before stopping
+    src["start_limit"] = np.maximum(src["min_output"], src["ramp_up"])
+    src["stop_limit"] = np.maximum(src["min_output"], src["ramp_down"])
+    return src
+
+
+#  TRANSITION TABLE
+
+class CommitmentTable:
+    """
+    Static state space for every unit, padded to a common size.
+    State k * L + l is "on for k + 1 hours (saturating at min_up), output
+    level l"; state MU * L + k is "off for k + 1 hours (saturating at
+    min_down)". cost[u, i, j] is the cost of moving unit u from state i to
+    state j (its start-up cost, or 0) and inf where the move breaks a ramp
+    or minimum run time. Output levels run from min_output to max_cap.
+    """
+
+    def __init__(self, src, steps=10):
+        cap, pmin = src["cap"], src["min_output"]
+        n_units = len(cap)
+        n_levels = steps + 1
+        self.n_levels = n_levels
+        self.mu = int(src["min_up"].max()) if n_units else 1
+        self.md = int(src["min_down"].max()) if n_units else 1
+        n_states = self.mu * n_levels + self.md
+        self.n_states = n_states
+
+        levels = pmin[:, None] + np.linspace(0.0, 1.0, n_levels)[None, :] * (cap - pmin)[:, None]
+        self.is_on = np.arange(n_states) < self.mu * n_levels
+        self.power = np.zeros((n_units, n_states))
+        self.power[:, self.is_on] = np.tile(levels, self.mu)
+
+        cost = np.full((n_units, n_states, n_states), np.inf)
+        on = lambda k: slice(k * n_levels, (k + 1) * n_levels)
+        off = lambda k: self.mu * n_levels + k
+        for u in range(n_units):
+            mu, md = src["min_up"][u], src["min_down"][u]
+            delta = levels[u][None, :] - levels[u][:, None]
+            ramp = (delta <= src["ramp_up"][u] + EPS) & (-delta <= src["ramp_down"][u] + EPS)
+            for k in range(mu):
+                cost[u, on(k), on(min(k + 1, mu - 1))] = np.where(ramp, 0.0, np.inf)
+            stop = levels[u] <= src["stop_limit"][u] + EPS
+            cost[u, on(mu - 1), off(0)] = np.where(stop, 0.0, np.inf)
+            for k in range(md):
+                cost[u, off(k), off(min(k + 1, md - 1))] = 0.0
+            start = levels[u] <= src["start_limit"][u] + EPS
+            cost[u, off(md - 1), on(0)] = np.where(start, src["startup_cost"][u], np.inf)
+        self.cost = cost
+        self.initial = np.array([off(m - 1) for m in src["min_down"]], dtype=int)
+
+
+def _schedule(table, prices, unit_cost, avail):
+    """
+    Cheapest state path per unit under hourly prices (the relaxed
+    problem). Returns (states (H, U), summed path value).
+    """
+    n_hours, n_units = avail.shape
+    rows = np.arange(n_units)[:, None]
+    value = np.full((n_units, table.n_states), np.inf)
+    value[np.arange(n_units), table.initial] = 0.0
+    choice = np.empty((n_hours, n_units, table.n_states), dtype=np.int16)
+    on = table.is_on[None, :]
+    for t in range(n_hours):
+        step = np.where(on, (unit_cost[:, None] - prices[t]) * table.power, 0.0)
+        step = np.where(on & ~avail[t][:, None], np.inf, step)
+        total = value[:, :, None] + table.cost
+        choice[t] = total.argmin(axis=1)
+        value = total[rows, choice[t], np.arange(table.n_states)[None, :]] + step
+
+    states = np.empty((n_hours, n_units), dtype=int)
+    states[-1] = value.argmin(axis=1)
+    for t in range(n_hours - 1, 0, -1):
+        states[t - 1] = choice[t, np.arange(n_units), states[t]]
+    return states, float(value.min(axis=1).sum())
+
+
+#  RAMP-FEASIBLE DISPATCH FOR A FIXED ON / OFF PLAN
+
+def dispatch_commitment(on, totals, caps, src, floor=None):
+    """
+    Continuous dispatch hour by hour for a fixed plan `on` (H, U): every
+    running unit stays inside its ramp window, the remaining demand is
+    filled cheapest first. Output is also capped so a unit can ramp down
+    to its stop limit in time. `floor` (H, U) optionally holds units at
+    least at a planned output, so they are already ramped up when a peak
+    arrives. Returns (use, startups, unserved, spilled).
+    """
+    n_hours, n_units = on.shape
+    # Highest output from which each unit can still reach its next stop
+    limit = np.where(on, caps, 0.0)
+    for t in range(n_hours - 1, -1, -1):
+        if t + 1 < n_hours:
+            stopping = on[t] & ~on[t + 1]
+            running = on[t] & on[t + 1]
+            limit[t] = np.where(stopping, np.minimum(limit[t], src["stop_limit"]), limit[t])
+            limit[t] = np.where(running, np.minimum(limit[t], limit[t + 1] + src["ramp_down"]), limit[t])
+
+    use = np.zeros((n_hours, n_units))
+    unserved = np.zeros(n_hours)
+    spilled = np.zeros(n_hours)
+    prev = np.zeros(n_units)
+    was_on = np.zeros(n_units, dtype=bool)
+    for t in range(n_hours):
+        cont = on[t] & was_on
+        lo = np.where(cont, np.maximum(src["min_output"], prev - src["ramp_down"]),
+                      np.where(on[t], src["min_output"], 0.0))
+        hi = np.where(cont, prev + src["ramp_up"], np.where(on[t], src["start_limit"], 0.0))
+        hi = np.maximum(np.minimum(hi, limit[t]), lo)
+        if floor is not None:
+            lo = np.clip(floor[t], lo, hi)
+        need = totals[t] - lo.sum()
+        use[t] = lo + greedy_fill(np.array([max(need, 0.0)]), (hi - lo)[None, :])[0]
+        unserved[t] = max(need - (hi - lo).sum(), 0.0)
+        spilled[t] = max(-need, 0.0)
+        prev, was_on = use[t], on[t]
+    startups = on & ~np.vstack([np.zeros((1, n_units), dtype=bool), on[:-1]])
+    return use, startups, unserved, spilled
+
+
+def ramp_floor(on, totals, caps, src):
+    """
+    Merit-order output of the running units with ramps ignored, raised
+    backwards so every unit can ramp up to it in time: a floor for
+    dispatch_commitment that looks ahead to the peaks.
+    """
+    floor = greedy_fill(totals, np.where(on, caps, 0.0))
+    for t in range(len(floor) - 2, -1, -1):
+        lead = np.where(on[t] & on[t + 1], floor[t + 1] - src["ramp_up"], 0.0)
+        floor[t] = np.maximum(floor[t], lead)
+    return floor
+
+
+def audit(use, hours, sources):
+    """
+    Check an (H, U) cost-ordered dispatch, e.g. the greedy one, against the
+    commitment rules: starts, their cost, and how often ramps or minimum
+    up / down times are broken.
+    """
+    src = unit_arrays(sources)
+    on = use > EPS
+    prev = np.vstack([np.zeros((1, use.shape[1])), use[:-1]])
+    was_on = np.vstack([np.zeros((1, use.shape[1]), dtype=bool), on[:-1]])
+    starts = on & ~was_on
+    stops = ~on & was_on
+    rise = np.where(starts, use - src["start_limit"], np.where(on & was_on, use - prev - src["ramp_up"], 0))
+    fall = np.where(stops, prev - src["stop_limit"], np.where(on & was_on, prev - use - src["ramp_down"], 0))
+    below_min = on & (use < src["min_output"] - EPS)
+
+    min_up = min_down = 0
+    for u in range(use.shape[1]):
+        runs = np.diff(np.concatenate(([0], on[:, u].astype(int), [0])))
+        first, last = np.flatnonzero(runs == 1), np.flatnonzero(runs == -1)
+        # The final run / gap may continue past the horizon, so it is not counted
+        min_up += int(((last - first)[last < len(use)] < src["min_up"][u]).sum())
+        gaps = first[1:] - last[:-1]
+        min_down += int((gaps < src["min_down"][u]).sum())
+    return {
+        "startups": int(starts.sum()),
+        "startup_cost": round(float((starts * src["startup_cost"]).sum()), 2),
+        "ramp_violations": int((rise > EPS).sum() + (fall > EPS).sum()),
+        "min_output_violations": int(below_min.sum()),
+        "min_up_violations": min_up,
+        "min_down_violations": min_down,
+    }
+
+
+#  RESULT
+
+class CommitmentPlan:
+    """On / off plan, dispatch and bounds for one horizon."""
+
+    def __init__(self, labels, hours, totals, src, on, use, startups, unserved,
+                 spilled, lower_bound, approx_bound, iterations, penalty,
+                 renewable_types=RENEWABLE_TYPES):
+        self.labels = labels
+        self.hours = hours
+        self.totals = totals
+        self.ids = src["ids"]
+        self.types = src["types"]
+        self.on = on                                  # (H, U) bool
+        self.use = use                                # (H, U) kWh, cost order
+        self.startups = startups                      # (H, U) bool
+        self.unserved = unserved
+        self.spilled = spilled                        # must-run output above demand
+        self.fuel_cost = use @ src["cost"]
+        self.startup_cost = startups @ src["startup_cost"]
+        self.cost = self.fuel_cost + self.startup_cost
+        self.fulfilled = totals - unserved
+        self.lower_bound = lower_bound                # valid (continuous relaxation)
+        self.approx_bound = approx_bound              # DP dual on discrete levels
+        self.iterations = iterations
+        self.penalty = penalty
+        self.renewable_types = renewable_types
+
+    @property
+    def total_cost(self):
+        return round(float(self.cost.sum()), 2)
+
+    @property
+    def objective(self):
+        """Cost plus the unserved-demand penalty (what the solver minimizes)."""
+        return float(self.cost.sum() + self.penalty * self.unserved.sum())
+
+    def _gap_to(self, bound):
+        return max(self.objective - bound, 0.0) / self.objective if self.objective > 0 else 0.0
+
+    @property
+    def gap(self):
+        """Relative distance to the valid lower bound (an overestimate of the true gap)."""
+        return self._gap_to(self.lower_bound)
+
+    @property
+    def approx_gap(self):
+        """Relative distance to the approximate DP bound (can understate the gap)."""
+        return self._gap_to(self.approx_bound)
+
+    def summary(self):
+        return {
+            "hours": len(self.labels),
+            "total_cost": self.total_cost,
+            "fuel_cost": round(float(self.fuel_cost.sum()), 2),
+            "startup_cost": round(float(self.startup_cost.sum()), 2),
+            "startups": int(self.startups.sum()),
+            "unserved_kwh": round(float(self.unserved.sum()), 2),
+            "spilled_kwh": round(float(self.spilled.sum()), 2),
+            # Bounds and gaps are on the objective, not on total_cost
+            "unserved_penalty": self.penalty,
+            "objective": round(self.objective, 2),
+            "objective_lower_bound": round(self.lower_bound, 2),
+            "gap_pct": round(self.gap * 100, 2),
+            "objective_approx_bound": round(self.approx_bound, 2),
+            "approx_gap_pct": round(self.approx_gap * 100, 2),
+            "iterations": self.iterations,
+        }
+
+    def to_results(self):
+        """run_full_day style dicts with the units running per hour."""
+        results = []
+        for i, label in enumerate(self.labels):
+            allocations = dict.fromkeys(self.types, 0)
+            for typ, v in zip(self.types, self.use[i]):
+                allocations[typ] = round(allocations[typ] + float(v), 2)
+            generated = sum(allocations.values())
+            renewable = sum(v for k, v in allocations.items() if k in self.renewable_types)
+            total = float(self.totals[i])
+            fulfilled = round(float(self.fulfilled[i]), 2)
+            results.append({
+                "hour": label,
+                "total_demand": total,
+                "allocations": allocations,
+                "cost": round(float(self.cost[i]), 2),
+                "fulfilled": fulfilled,
+                "pct_met": round(fulfilled / total * 100, 1) if total > 0 else 0,
+                "within_tolerance": abs(fulfilled - total) <= total * 0.10,
+                "renewable_pct": round(renewable / generated * 100, 1) if generated > 0 else 0,
+                "diesel_used": allocations.get("Diesel", 0) > 0,
+                "committed": [sid for sid, on in zip(self.ids, self.on[i]) if on],
+                "started": [sid for sid, s in zip(self.ids, self.startups[i]) if s],
+            })
+        return results
+
+
+#  SOLVER
+
+def relaxed_dual(prices, caps, cost, totals):
+    """
+    Lagrangian dual of the continuous problem without ramps, minimum
+    up / down times or start-up costs: a valid lower bound for any prices
+    between 0 and the unserved penalty.
+    """
+    return float(np.minimum((cost[None, :] - prices[:, None]) * caps, 0.0).sum() + prices @ totals)
+
+
+def commit_units(totals, hours, sources, steps=10, labels=None, max_iterations=MAX_ITERATIONS,
+                 tolerance=GAP_TOLERANCE, unserved_penalty=UNSERVED_PENALTY, table=None):
+    """
+    Unit commitment over any horizon.
+    totals : (H,) total demand per hour (kWh)
+    hours  : (H,) hour-of-day ints for source availability
+    steps  : output levels per unit in the DP (the final dispatch is
+             continuous; the levels only steer the on / off decisions)
+    Cost per iteration is H steps of (units x states x states), with
+    states = min_up x (steps + 1) + min_down.
+    """
+    totals = np.asarray(totals, dtype=float)
+    hours = np.asarray(hours, dtype=int)
+    if labels is None:
+        labels = [f"{h:02d}" for h in hours]
+    src = unit_arrays(sources)
+    table = table or CommitmentTable(src, steps)
+    avail = (src["start"][None, :] <= hours[:, None]) & (hours[:, None] < src["end"][None, :])
+    caps = np.where(avail, src["cap"][None, :], 0.0)
+
+    # Start from the greedy marginal price of every hour
+    greedy = greedy_fill(totals, caps)
+    marginal = np.where(greedy > EPS, src["cost"][None, :], 0.0).max(axis=1, initial=0.0)
+    prices = np.where(greedy.sum(axis=1) < totals - EPS, unserved_penalty, marginal)
+
+    best = None
+    lower = approx = -np.inf
+    scale, stalled = 2.0, 0
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        states, value = _schedule(table, prices, src["cost"], avail)
+        dual = value + float(prices @ totals)
+        lower = max(lower, relaxed_dual(prices, caps, src["cost"], totals))
+        if dual > approx + EPS:
+            approx, stalled = dual, 0
+        else:
+            stalled += 1
+            if stalled >= 3:
+                scale, stalled = scale / 2, 0
+
+        on = table.is_on[states]
+        output = np.take_along_axis(table.power, states.T, axis=1).T
+        # Plain merit order, ramped ahead of the peaks, and the relaxed plan's own output
+        for floor in (None, ramp_floor(on, totals, caps, src), output):
+            plan = CommitmentPlan(labels, hours, totals, src, on,
+                                  *dispatch_commitment(on, totals, caps, src, floor),
+                                  lower, approx, iterations, unserved_penalty)
+            if best is None or plan.objective < best.objective - EPS:
+                best = plan
+        best.lower_bound, best.approx_bound = lower, approx
+        if best.approx_gap <= tolerance:
+            break
+
+        # Subgradient step towards balancing relaxed output and demand
+        slack = totals - output.sum(axis=1)
+        norm = float(slack @ slack)
+        if norm < EPS:
+            break
+        prices = np.clip(prices + scale * (best.objective - dual) / norm * slack, 0.0, unserved_penalty)
+    best.iterations = iterations
+    return best
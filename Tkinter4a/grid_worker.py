@@ -0,0 +1,122 @@
+"""
+Background simulation worker for the Smart Energy Grid GUI.
+Jobs run on a worker thread and report progress through a queue that
+the Tk main thread drains with after(). Progress updates are coalesced
+(only the newest one per poll is shown), every run has a generation
+number, and messages from a cancelled or superseded run are dropped.
+"""
+
+import queue
+import threading
+
+
+class Cancelled(Exception):
+    """Raised inside a job when its run has been cancelled."""
+
+
+class _RunContext:
+    """Handed to the job: report progress and check for cancellation."""
+
+    def __init__(self, run_id, messages, cancel_event):
+        self.run_id = run_id
+        self._messages = messages
+        self._cancel = cancel_event
+
+    def progress(self, fraction, text=""):
+        self.check()
+        self._messages.put(("progress", self.run_id, (fraction, text)))
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise Cancelled()
+
+
+class SimulationWorker:
+    """One job at a time; submitting a new job cancels the current one."""
+
+    def __init__(self, root, poll_ms=50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._messages = queue.Queue()
+        self._run_id = 0
+        self._cancel = threading.Event()
+        self._callbacks = {}
+        self._polling = False
+
+    @property
+    def busy(self):
+        return bool(self._callbacks)
+
+    def submit(self, job, on_done, on_progress=None, on_error=None, on_cancel=None):
+        """
+        Run job(ctx) on a thread. ctx.progress(fraction, text) reports
+        progress; ctx.check() raises Cancelled once the run is cancelled.
+        Callbacks are always called on the Tk main thread.
+        """
+        self.cancel()
+        self._run_id += 1
+        run_id = self._run_id
+        self._cancel = threading.Event()
+        self._callbacks = {"done": on_done, "progress": on_progress,
+                        "error": on_error, "cancel": on_cancel}
+        ctx = _RunContext(run_id, self._messages, self._cancel)
+
+        def target():
+            try:
+                result = job(ctx)
+                ctx.check()
+                self._messages.put(("done", run_id, result))
+            except Cancelled:
+                self._messages.put(("cancel", run_id, None))
+            except Exception as e:              # reported on the main thread
+                self._messages.put(("error", run_id, e))
+
+        threading.Thread(target=target, daemon=True).start()
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return run_id
+
+    def cancel(self):
+        """Cancel the current run; its late messages are discarded."""
+        if self._callbacks:
+            self._cancel.set()
+            on_cancel = self._callbacks.get("cancel")
+            self._callbacks = {}
+            if on_cancel:
+                on_cancel()
+
+    def _poll(self):
+        latest_progress = None
+        finished = None
+        while True:
+            try:
+                kind, run_id, payload = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if run_id != self._run_id or not self._callbacks:
+                continue                        # stale run
+            if kind == "progress":
+                latest_progress = payload
+            else:
+                finished = (kind, payload)
+
+        callbacks = self._callbacks
+        if latest_progress and callbacks.get("progress"):
+            callbacks["progress"](*latest_progress)
+        if finished:
+            kind, payload = finished
+            self._callbacks = {}
+            if callbacks.get(kind):
+                if kind == "cancel":
+                    callbacks[kind]()
+                else:
+                    callbacks[kind](payload)
+
+        if self._callbacks:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
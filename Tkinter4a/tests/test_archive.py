@@ -0,0 +1,80 @@
+"""grid_archive: date ranges and UTC offsets survive conversion, bad files fail clearly."""
+
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Smart_Grid  # noqa: E402
+import grid_archive  # noqa: E402
+import grid_stream  # noqa: E402
+
+
+def _write_csv(path, tz, hours=96, seed=0, skip=()):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=tz)
+    with open(path, "w") as f:
+        f.write("timestamp,A,B,C\n")
+        for i in range(hours):
+            if i in skip:
+                continue
+            values = ",".join(str(rng.randint(10, 60)) for _ in range(3))
+            f.write(f"{(start + timedelta(hours=i)).isoformat()},{values}\n")
+
+
+def test_offset_archive_dispatches_like_its_csv(tmp_path):
+    csv_path, arc_path = str(tmp_path / "d.csv"), str(tmp_path / "d.gridarc")
+    _write_csv(csv_path, timezone(timedelta(hours=5, minutes=45)))
+    grid_archive.convert(csv_path, arc_path)
+    assert Smart_Grid.run_batch(arc_path) == Smart_Grid.run_batch(csv_path)
+    with grid_archive.DemandArchive(arc_path) as archive:
+        part = archive.slice("2024-01-02", "2024-01-02T02:00")
+        assert part.labels() == ["2024-01-02T00:00:00+05:45", "2024-01-02T01:00:00+05:45"]
+        assert part.hours.tolist() == [0, 1]
+        del part
+
+
+def test_date_range_slices_match_the_csv(tmp_path):
+    csv_path, arc_path = str(tmp_path / "d.csv"), str(tmp_path / "d.gridarc")
+    _write_csv(csv_path, None, hours=24 * 10, skip={5, 6, 100, 200})
+    grid_archive.convert(csv_path, arc_path)
+    rows = list(grid_stream.read_demand(csv_path))
+    rng = random.Random(1)
+    with grid_archive.DemandArchive(arc_path) as archive:
+        assert archive.info()["gap_rows"] == 4
+        for _ in range(30):
+            a, b = sorted(rng.uniform(-24, 24 * 11) for _ in range(2))
+            start, end = (datetime(2024, 1, 1) + timedelta(hours=x) for x in (a, b))
+            expected = [r for r in rows if start <= datetime.fromisoformat(r[0]) < end]
+            got = list(archive.iter_readings(start.isoformat(), end.isoformat()))
+            assert got == expected, (start, end)
+
+
+def test_mixed_offsets_rejected(tmp_path):
+    path = tmp_path / "d.csv"
+    path.write_text("timestamp,A\n2024-03-01T01:00:00+01:00,5\n2024-03-01T03:00:00+02:00,5\n")
+    with pytest.raises(ValueError, match="UTC offset"):
+        grid_archive.convert(str(path), str(tmp_path / "d.gridarc"))
+
+
+def test_short_file_is_not_an_archive(tmp_path):
+    path = tmp_path / "short.gridarc"
+    path.write_bytes(b"GRIDARC1")
+    with pytest.raises(ValueError, match="not a demand archive"):
+        grid_archive.DemandArchive(str(path))
+
+
+def test_close_with_live_views_raises(tmp_path):
+    csv_path, arc_path = str(tmp_path / "d.csv"), str(tmp_path / "d.gridarc")
+    _write_csv(csv_path, None, hours=4)
+    grid_archive.convert(csv_path, arc_path)
+    archive = grid_archive.DemandArchive(arc_path)
+    view = archive.slice().demand
+    with pytest.raises(BufferError):
+        archive.close()
+    del view
+    archive.close()
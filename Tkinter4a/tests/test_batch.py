@@ -0,0 +1,71 @@
+"""allocate_batch (vectorized) against allocate_hour (scalar merit order)."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Smart_Grid  # noqa: E402
+import grid_batch  # noqa: E402
+import grid_network  # noqa: E402
+
+
+def _random_year(seed):
+    """A year of 2-dp float district demand with the DEMAND_DATA hours cycled."""
+    rng = np.random.default_rng(seed)
+    labels = sorted(Smart_Grid.DEMAND_DATA)
+    districts = list(Smart_Grid.DEMAND_DATA[labels[0]])
+    hour_labels = [labels[i % len(labels)] for i in range(8760)]
+    demand = np.round(rng.uniform(0, 120, (len(hour_labels), len(districts))), 2)
+    return hour_labels, districts, demand
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batch_matches_allocate_hour(seed):
+    hour_labels, districts, demand = _random_year(seed)
+    hours = np.array([int(h) for h in hour_labels])
+    batch = grid_batch.allocate_batch(demand, hours, Smart_Grid.SOURCES,
+                                    labels=hour_labels, districts=districts)
+    for i, label in enumerate(hour_labels):
+        row = dict(zip(districts, demand[i].tolist()))
+        scalar = Smart_Grid.allocate_hour(label, row)
+        assert batch.cost[i] == scalar["cost"], (label, row)
+        assert batch.fulfilled[i] == pytest.approx(scalar["fulfilled"])
+        assert batch.within_tolerance[i] == scalar["within_tolerance"]
+        for typ, kwh in scalar["allocations"].items():
+            assert batch.by_type(typ)[i] == pytest.approx(kwh)
+
+
+def _random_network(districts, seed):
+    """Each source wired to a random subset of districts, half the lines capped."""
+    rng = np.random.default_rng(seed + 100)
+    links = []
+    for s in Smart_Grid.SOURCES:
+        picks = rng.choice(len(districts), size=rng.integers(1, len(districts) + 1), replace=False)
+        for d in picks:
+            cap = None if rng.random() < 0.5 else round(float(rng.uniform(5, 60)), 1)
+            links.append((s["id"], districts[d], cap))
+    return grid_network.Connectivity(districts, [s["id"] for s in Smart_Grid.SOURCES], links)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_network_batch_matches_allocate_hour(seed):
+    hour_labels, districts, demand = _random_year(seed)
+    hours = np.array([int(h) for h in hour_labels])
+    network = _random_network(districts, seed)
+    batch = grid_batch.allocate_batch(demand, hours, Smart_Grid.SOURCES, labels=hour_labels,
+                                    districts=districts, network=network)
+    Smart_Grid.set_network(network)
+    try:
+        for i, label in enumerate(hour_labels):
+            scalar = Smart_Grid.allocate_hour(label, dict(zip(districts, demand[i].tolist())))
+            assert batch.cost[i] == scalar["cost"], label
+            assert batch.fulfilled[i] == scalar["fulfilled"], label
+            assert batch.within_tolerance[i] == scalar["within_tolerance"]
+            for j, d in enumerate(districts):
+                assert batch.served[i, j] == scalar["served"][d]
+    finally:
+        Smart_Grid.set_network(None)
@@ -0,0 +1,27 @@
+"""allocate_hour_cached after a SOURCES edit: no stale entries, no stale index."""
+
+import copy
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Smart_Grid  # noqa: E402
+
+
+@pytest.fixture
+def sources():
+    saved = copy.deepcopy(Smart_Grid.SOURCES)
+    yield Smart_Grid.SOURCES
+    Smart_Grid.SOURCES[:] = saved
+
+
+def test_cached_result_follows_sources_edit(sources):
+    demand = dict(Smart_Grid.DEMAND_DATA["20"])
+    assert Smart_Grid.allocate_hour_cached("20", demand)["cost"] == 240.0
+    sources[2]["cost"] = 0.5
+    assert Smart_Grid.allocate_hour_cached("20", demand)["cost"] == 90.0
+    # and the refreshed entry is what later lookups get
+    assert Smart_Grid.allocate_hour_cached("20", demand)["cost"] == 90.0
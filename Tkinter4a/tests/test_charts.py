@@ -0,0 +1,47 @@
+"""grid_charts: redraws update the existing artists instead of adding new ones."""
+
+import os
+import sys
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Smart_Grid  # noqa: E402
+import grid_charts  # noqa: E402
+
+TYPES = ["Solar", "Hydro", "Diesel"]
+
+
+def _day(scale):
+    hours = [f"{h:02d}" for h in range(24)]
+    by_type = {t: np.full(24, scale * (i + 1)) for i, t in enumerate(TYPES)}
+    return dict(hours=hours, by_type=by_type, demand=np.full(24, scale * 7.0),
+                costs=np.full(24, scale * 10.0), diesel_used=[h >= 17 for h in range(24)],
+                renewable_pct=np.full(24, 50.0),
+                totals={t: float(v.sum()) for t, v in by_type.items()})
+
+
+def test_full_day_redraw_reuses_artists():
+    fig, axes = plt.subplots(2, 2)
+    charts = grid_charts.DashboardCharts(fig, axes, fig.canvas, Smart_Grid.COLORS, TYPES)
+    charts.show_full_day(**_day(1.0))
+    artists = dict(charts.artists)
+    counts = [len(ax.patches) + len(ax.lines) for ax in axes.flat]
+
+    charts.show_full_day(**_day(2.0))
+    for key in ("stack", "demand", "cost_bars", "ren_fill", "ren_line", "totals_pie"):
+        assert charts.artists[key] is artists[key], key
+    assert [len(ax.patches) + len(ax.lines) for ax in axes.flat] == counts
+    # The new data is what is drawn: top of the stack is Solar + Hydro + Diesel
+    assert charts.artists["stack"][-1].get_xy()[:, 1].max() == 2.0 * 6
+    assert [b.get_height() for b in charts.artists["cost_bars"]] == [20.0] * 24
+    wedges = charts.artists["totals_pie"].wedges
+    spans = [w.theta2 - w.theta1 for w in wedges]
+    assert np.allclose(spans, [60, 120, 180])
+    plt.close(fig)
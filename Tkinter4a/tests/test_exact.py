@@ -0,0 +1,24 @@
+"""grid_exact: tolerance floors in the flow graph and the bounded memo."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import grid_exact  # noqa: E402
+
+SHARED = {"id": "S1", "type": "Solar", "cost": 1.0, "max_cap": 180,
+        "start": 0, "end": 24, "districts": ["A", "B"]}
+
+
+def test_floors_filled_before_top_ups():
+    flows, cost = grid_exact.solve_hour(9, {"A": 100, "B": 100}, [SHARED])
+    assert flows == {"S1": {"A": 90, "B": 90}}
+    assert cost == 180.0
+
+
+def test_memo_is_bounded():
+    dispatcher = grid_exact.ExactDispatcher([SHARED], memo_size=3)
+    for i in range(10):
+        dispatcher.allocate_hour("09", {"A": i + 0.5, "B": 1.0})
+    assert len(dispatcher._memo) == 3
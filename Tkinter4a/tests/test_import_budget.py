@@ -0,0 +1,40 @@
+"""
+Import-time budget for Smart_Grid: headless use (--batch, the grid_*
+helpers) must not pay for tkinter or matplotlib, and the import itself
+must stay under IMPORT_BUDGET_MS. Measured with python -X importtime in a
+fresh interpreter, so modules already loaded by pytest do not count.
+"""
+
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+from Smart_Grid import GUI_MODULES, IMPORT_BUDGET_MS  # noqa: E402
+
+
+def _import_times():
+    """{module: cumulative microseconds} for a fresh `import Smart_Grid`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import Smart_Grid"],
+                        cwd=HERE, capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_no_gui_modules_on_import():
+    loaded = {name.split(".")[0] for name in _import_times()}
+    assert not loaded & set(GUI_MODULES)
+
+
+def test_import_within_budget():
+    # Best of three runs, so one slow start on a busy machine does not fail it
+    best_ms = min(_import_times()["Smart_Grid"] for _ in range(3)) / 1000
+    assert best_ms <= IMPORT_BUDGET_MS, f"import Smart_Grid took {best_ms:.1f} ms"
@@ -0,0 +1,33 @@
+"""The scalar merit-order path follows SOURCES edits without a manual reset."""
+
+import copy
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Smart_Grid  # noqa: E402
+import grid_batch  # noqa: E402
+
+
+@pytest.fixture
+def sources():
+    saved = copy.deepcopy(Smart_Grid.SOURCES)
+    yield Smart_Grid.SOURCES
+    Smart_Grid.SOURCES[:] = saved
+
+
+def _batch_costs():
+    return [round(float(c), 2) for c in
+            grid_batch.allocate_demand_data(Smart_Grid.DEMAND_DATA, Smart_Grid.SOURCES).cost]
+
+
+def test_scalar_follows_sources_edit(sources):
+    Smart_Grid.run_full_day()                  # build the index on the original SOURCES
+    sources[2]["cost"] = 0.5
+    sources.append(dict(sources[0], id="S4", max_cap=10))
+    scalar = [r["cost"] for r in Smart_Grid.run_full_day()]
+    assert scalar == _batch_costs()
+    assert Smart_Grid.allocate_hour("20")["cost"] == 90.0
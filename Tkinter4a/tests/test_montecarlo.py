@@ -0,0 +1,34 @@
+"""grid_montecarlo: worker-count independence and the no-noise limit."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Smart_Grid  # noqa: E402
+import grid_batch  # noqa: E402
+import grid_montecarlo  # noqa: E402
+
+
+def _run(workers):
+    return grid_montecarlo.run_monte_carlo(2500, Smart_Grid.DEMAND_DATA, Smart_Grid.SOURCES,
+                                           seed=7, chunk_size=500, workers=workers)
+
+
+def test_same_result_for_any_worker_count():
+    assert _run(1) == _run(2)
+
+
+def test_fixed_noise_reproduces_greedy_day():
+    fixed = {"dist": "fixed"}
+    summary = grid_montecarlo.run_monte_carlo(
+        50, Smart_Grid.DEMAND_DATA, Smart_Grid.SOURCES, demand_noise=fixed,
+        capacity_noise={}, chunk_size=20, workers=1)
+    day = grid_batch.allocate_demand_data(Smart_Grid.DEMAND_DATA, Smart_Grid.SOURCES)
+    diesel_hours = int((day.by_type("Diesel") > 0).sum())
+    assert summary["mean_cost"] == pytest.approx(day.cost.sum(), abs=0.01 * len(day.cost))
+    assert summary["std_cost"] == 0
+    assert summary["diesel_hours_distribution"] == {diesel_hours: 50}
+    assert summary["prob_tolerance_miss"] == (0.0 if day.within_tolerance.all() else 1.0)
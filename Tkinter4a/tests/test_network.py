@@ -0,0 +1,54 @@
+"""grid_network / sparse links: pooled limit and line limits."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Smart_Grid  # noqa: E402
+import grid_exact  # noqa: E402
+import grid_network  # noqa: E402
+
+
+@pytest.fixture
+def network():
+    yield
+    Smart_Grid.set_network(None)
+
+
+def test_fully_linked_network_matches_pooled_dispatch(network):
+    districts = Smart_Grid.district_names()
+    pooled = Smart_Grid.run_full_day()
+    Smart_Grid.set_network(grid_network.Connectivity.full(Smart_Grid.SOURCES, districts))
+    linked = Smart_Grid.run_full_day()
+    for p, n in zip(pooled, linked):
+        assert n["cost"] == p["cost"], p["hour"]
+        assert n["fulfilled"] == pytest.approx(p["fulfilled"])
+        assert n["allocations"] == pytest.approx(p["allocations"])
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_dispatch_stays_on_the_links(network, seed):
+    rng = np.random.default_rng(seed)
+    districts = Smart_Grid.district_names()
+    links = []
+    for s in Smart_Grid.SOURCES:
+        for d in rng.choice(districts, size=rng.integers(1, len(districts) + 1), replace=False):
+            links.append((s["id"], str(d), None if rng.random() < 0.5 else round(float(rng.uniform(5, 30)), 1)))
+    net = grid_network.Connectivity(districts, [s["id"] for s in Smart_Grid.SOURCES], links)
+    Smart_Grid.set_network(net)
+    exact = grid_exact.ExactDispatcher(Smart_Grid.SOURCES, network=net)
+    caps = {s["id"]: s["max_cap"] for s in Smart_Grid.SOURCES}
+    for hour, demand in sorted(Smart_Grid.DEMAND_DATA.items()):
+        greedy = Smart_Grid.allocate_hour(hour, demand)
+        for d in districts:
+            assert greedy["served"][d] <= demand[d] + 1e-9
+        # Only linked districts are served, within each line's capacity
+        for sid, flows in exact.allocate_hour(hour, demand)["flows"].items():
+            lines = net.links_of(sid)
+            assert sum(flows.values()) <= caps[sid] + 1e-9
+            for d, kwh in flows.items():
+                assert d in lines and kwh <= lines[d] + 1e-9, (sid, d)
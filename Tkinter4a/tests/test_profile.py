@@ -0,0 +1,51 @@
+"""grid_profile: counters, ring buffer percentiles and the disabled fast path."""
+
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import grid_profile  # noqa: E402
+
+
+def test_summary_over_the_ring_buffer(tmp_path):
+    prof = grid_profile.Profiler(enabled=True, ring_size=100)
+    for ms in range(1, 301):
+        prof.record("dispatch", float(ms))
+    s = prof.summary()["dispatch"]
+    # Calls and mean cover every sample, percentiles only the last 100
+    assert s["calls"] == 300 and s["mean_ms"] == 150.5
+    assert (s["last_ms"], s["max_ms"]) == (300.0, 300.0)
+    assert s["p50_ms"] == sorted(range(201, 301))[round(0.5 * 99)]
+    assert s["p99_ms"] == sorted(range(201, 301))[round(0.99 * 99)]
+
+    path = tmp_path / "timings.jsonl"
+    assert prof.export_jsonl(path) == 100
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["ms"] for r in rows] == list(range(201, 301))
+
+
+def test_disabled_profiler_records_nothing():
+    prof = grid_profile.Profiler()
+    with prof.stage("dispatch"):
+        pass
+    assert prof.wrap("redraw", lambda: 42)() == 42
+    assert prof.summary() == {}
+
+
+def test_records_from_several_threads():
+    prof = grid_profile.Profiler(enabled=True)
+
+    def work():
+        for _ in range(1000):
+            with prof.stage("worker"):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert prof.summary()["worker"]["calls"] == 4000
@@ -0,0 +1,41 @@
+"""grid_realtime: incremental window KPIs against a rescan of the results."""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Smart_Grid  # noqa: E402
+import grid_realtime  # noqa: E402
+import grid_stream  # noqa: E402
+
+
+def _rescan(results, since):
+    kpis = grid_stream.KpiAggregator()
+    for r in results:
+        if datetime.fromisoformat(r["hour"]).timestamp() > since:
+            kpis.write(r)
+    return kpis.summary()
+
+
+def test_window_kpis_match_a_full_rescan():
+    feed = grid_realtime.SimulatedFeed(Smart_Grid.DEMAND_DATA, seed=3)
+    live = grid_realtime.LiveDispatcher(Smart_Grid.allocate_hour, budget_ms=1000)
+    seen = []
+    for _ in range(20):
+        live.submit(feed.poll(17))
+        seen += live.tick()
+        now = datetime.fromisoformat(seen[-1]["hour"]).timestamp()
+        kpis = live.kpis()
+        assert kpis["all"] == _rescan(seen, float("-inf"))
+        for name, span in grid_realtime.WINDOWS.items():
+            assert kpis[name] == _rescan(seen, now - span), name
+
+
+def test_zero_budget_dispatches_one_reading_per_tick():
+    feed = grid_realtime.SimulatedFeed(Smart_Grid.DEMAND_DATA, seed=0)
+    live = grid_realtime.LiveDispatcher(Smart_Grid.allocate_hour, budget_ms=0)
+    live.submit(feed.poll(5))
+    assert len(live.tick()) == 1
+    assert live.backlog == 4
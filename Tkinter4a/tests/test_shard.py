@@ -0,0 +1,52 @@
+"""grid_shard: sharded runs against the unsharded dispatch."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import grid_batch  # noqa: E402
+import grid_shard  # noqa: E402
+
+
+def _without_timings(summary):
+    return {k: v for k, v in summary.items() if k != "timings"}
+
+
+def test_no_links_matches_each_region_alone():
+    regions, _ = grid_shard.synthetic_regions(3, districts=6, sources=5, days=2)
+    run = grid_shard.run_sharded(regions, workers=1)
+    for region, part in zip(regions, run.parts):
+        alone = grid_batch.allocate_batch(region["demand"], region["hours"], region["sources"],
+                                          districts=region["districts"], network=region["network"])
+        assert np.array_equal(part["use"], alone.use)
+    assert run.transfers == []
+    summary = run.summary()
+    # Per-region figures are rounded to 2 dp before they are summed
+    assert summary["unmet_after_kwh"] == pytest.approx(summary["unmet_before_kwh"], abs=0.05)
+
+
+def test_same_result_for_any_worker_count():
+    regions, links = grid_shard.synthetic_regions(4, districts=6, sources=5, days=2)
+    one = grid_shard.run_sharded(regions, links, workers=1)
+    two = grid_shard.run_sharded(regions, links, workers=2)
+    assert _without_timings(one.summary()) == _without_timings(two.summary())
+    assert one.transfers == two.transfers
+
+
+def test_free_unlimited_links_serve_like_one_pooled_grid():
+    regions, _ = grid_shard.synthetic_regions(4, districts=6, sources=5, days=2)
+    for r in regions:
+        r["network"] = None
+    names = [r["name"] for r in regions]
+    links = [(a, b, 1e9, 0.0) for a, b in zip(names, names[1:])]
+    run = grid_shard.run_sharded(regions, links, workers=1)
+    # One grid with every fleet (ids made unique) and the summed demand
+    fleet = [dict(s, id=f"{r['name']}/{s['id']}") for r in regions for s in r["sources"]]
+    totals = sum(r["demand"].sum(axis=1) for r in regions)
+    pooled = grid_batch.allocate_batch(totals[:, None], regions[0]["hours"], fleet)
+    unmet = float((totals - pooled.fulfilled).sum())
+    assert run.summary()["unmet_after_kwh"] == pytest.approx(unmet, abs=0.05)
@@ -0,0 +1,39 @@
+"""grid_storage: the SoC DP schedule is feasible and never costs more than greedy."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Smart_Grid  # noqa: E402
+import grid_batch  # noqa: E402
+import grid_storage  # noqa: E402
+
+BATTERY = Smart_Grid.STORAGE[0]
+
+
+def _objective(cost, unserved):
+    return float(np.sum(cost) + grid_storage.UNSERVED_PENALTY * np.sum(unserved))
+
+
+@pytest.mark.parametrize("days", [1, 3])
+def test_storage_plan_is_feasible_and_no_dearer_than_greedy(days):
+    plan = Smart_Grid.run_full_day_with_storage(days=days)
+    soc = plan.soc
+    assert soc.min() >= 0 and soc.max() <= BATTERY["capacity"] + 1e-9
+    assert np.all(plan.charge <= BATTERY["charge_rate"] / BATTERY["efficiency"] + 1e-9)
+    assert np.all(plan.discharge <= BATTERY["discharge_rate"] + 1e-9)
+    # Losses are paid on the way in; nothing is dumped back into the grid
+    assert np.allclose(np.diff(soc), plan.charge * BATTERY["efficiency"] - plan.discharge)
+    assert np.all(plan.net_load >= -1e-9)
+
+    _, hours, _, demand = grid_batch.demand_matrix(Smart_Grid.DEMAND_DATA)
+    greedy = grid_batch.allocate_batch(np.tile(demand, (days, 1)), np.tile(hours, days),
+                                       Smart_Grid.SOURCES)
+    greedy_unserved = np.maximum(np.tile(demand.sum(axis=1), days) - greedy.fulfilled, 0)
+    # Greedy costs are rounded to 2 dp per hour
+    slack = 0.005 * len(plan.cost)
+    assert _objective(plan.cost, plan.unserved) <= _objective(greedy.cost, greedy_unserved) + slack
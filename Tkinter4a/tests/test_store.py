@@ -0,0 +1,22 @@
+"""grid_store: timestamp labels from grid_stream are stored in full."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Smart_Grid  # noqa: E402
+import grid_store  # noqa: E402
+import grid_stream  # noqa: E402
+
+
+def test_offset_timestamps_stream_into_store(tmp_path):
+    path = tmp_path / "d.csv"
+    path.write_text("timestamp,A,B,C\n"
+                    "2024-01-01T06:00:00+05:45,20,15,25\n"
+                    "2024-01-01T07:00:00.500000+05:45,22,17,27\n")
+    rows = grid_store.StoreBuilder(types=Smart_Grid.source_types())
+    Smart_Grid.stream_dispatch(str(path), grid_stream.TeeSink(rows))
+    store = rows.build()
+    assert [store[i]["hour"] for i in range(len(store))] == \
+        ["2024-01-01T06:00:00+05:45", "2024-01-01T07:00:00.500000+05:45"]
@@ -0,0 +1,58 @@
+"""grid_sweep: every sweep point against a scalar rerun with edited SOURCES."""
+
+import copy
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Smart_Grid  # noqa: E402
+import grid_batch  # noqa: E402
+import grid_sweep  # noqa: E402
+
+COST_MULTS = np.linspace(0.2, 2.0, 4)      # low end puts diesel first in the merit order
+CAP_MULTS = np.linspace(0.5, 2.0, 3)
+
+
+@pytest.fixture
+def sources():
+    saved = copy.deepcopy(Smart_Grid.SOURCES)
+    yield Smart_Grid.SOURCES
+    Smart_Grid.SOURCES[:] = saved
+    Smart_Grid.invalidate_merit_index()
+
+
+def _rerun(sources, cost_mult, cap_mult):
+    """Scalar full day with Diesel cost and Solar capacity scaled."""
+    base = copy.deepcopy(sources)
+    for s in sources:
+        if s["type"] == "Diesel":
+            s["cost"] *= cost_mult
+        if s["type"] == "Solar":
+            s["max_cap"] *= cap_mult
+    Smart_Grid.invalidate_merit_index()
+    results = Smart_Grid.run_full_day()
+    sources[:] = base
+    Smart_Grid.invalidate_merit_index()
+    return results
+
+
+@pytest.mark.parametrize("max_cells", [grid_sweep.MAX_CELLS, 50])
+def test_sweep_matches_scalar_reruns(sources, max_cells):
+    _, hours, _, demand = grid_batch.demand_matrix(Smart_Grid.DEMAND_DATA)
+    result = grid_sweep.sweep(np.tile(demand, (2, 1)), np.tile(hours, 2), sources,
+                              "Diesel", COST_MULTS, "Solar", CAP_MULTS, max_cells=max_cells)
+    assert result.merit_orders > 1
+    for i, cap_mult in enumerate(CAP_MULTS):
+        for j, cost_mult in enumerate(COST_MULTS):
+            day = _rerun(sources, cost_mult, cap_mult)
+            # Two days; scalar costs are rounded to 2 dp per hour
+            assert result.total_cost[i, j] == pytest.approx(2 * sum(r["cost"] for r in day),
+                                                            abs=0.005 * 2 * len(day))
+            unmet = sum(r["total_demand"] - r["fulfilled"] for r in day)
+            assert result.unmet_kwh[i, j] == pytest.approx(2 * unmet)
+            diesel = sum(r["allocations"]["Diesel"] for r in day)
+            assert result.diesel_kwh[i, j] == pytest.approx(2 * diesel)
@@ -0,0 +1,42 @@
+"""Cached distance matrix against the scalar haversine."""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tour_distance  # noqa: E402
+
+
+def _points(seed, n):
+    rng = random.Random(seed)
+    return [{"lat": rng.uniform(-80, 80), "lon": rng.uniform(-180, 180)} for _ in range(n)]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matrix_matches_haversine_pairwise(seed):
+    spots = _points(seed, 25)
+    start = {"lat": 27.7104, "lon": 85.3488}
+    dm = tour_distance.distance_matrix(spots, start)
+    points = spots + [start]
+    assert dm.km.shape == (26, 26) and dm.start == 25
+    for i, a in enumerate(points):
+        for j, b in enumerate(points):
+            assert dm.km[i, j] == pytest.approx(tour_distance.haversine_km(a, b), abs=1e-6)
+    route = [3, 7, 1]
+    legs = zip([start] + [spots[i] for i in route[:-1]], [spots[i] for i in route])
+    assert dm.route_km(route) == pytest.approx(sum(tour_distance.haversine_km(a, b) for a, b in legs))
+
+
+def test_cache_is_keyed_by_coordinates():
+    spots = _points(0, 5)
+    dm = tour_distance.distance_matrix(spots)
+    assert tour_distance.distance_matrix([dict(s) for s in spots]) is dm
+    moved = [dict(s) for s in spots]
+    moved[2]["lat"] += 0.5
+    fresh = tour_distance.distance_matrix(moved)
+    assert fresh is not dm
+    assert fresh.km[2, 0] == pytest.approx(tour_distance.haversine_km(moved[2], moved[0]))
@@ -0,0 +1,72 @@
+"""Spatial index order and the greedy itinerary it drives."""
+
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Tourist_Spot_GUI as tour  # noqa: E402
+import tour_spatial  # noqa: E402
+from tour_distance import haversine_km  # noqa: E402
+
+
+def _catalog(seed, n):
+    """Random spots around the city, tags from the real vocabulary."""
+    rng = random.Random(seed)
+    return [{"name": f"Spot {i}", "lat": 27.7 + rng.uniform(-0.1, 0.1),
+             "lon": 85.3 + rng.uniform(-0.1, 0.1), "fee": rng.choice([0, 50, 100, 200, 400]),
+             "open": rng.randint(6, 11), "close": rng.randint(14, 20),
+             "tags": rng.sample(tour.ALL_TAGS, rng.randint(1, 3)),
+             "duration": rng.choice([0.5, 1.0, 1.5])} for i in range(n)]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_nearest_order_matches_haversine_argsort(seed):
+    spots = _catalog(seed, 300)
+    index = tour_spatial.spot_index(spots)
+    rng = random.Random(seed)
+    for _ in range(5):
+        q = {"lat": 27.7 + rng.uniform(-0.15, 0.15), "lon": 85.3 + rng.uniform(-0.15, 0.15)}
+        km = np.array([haversine_km(q, s) for s in spots])
+        walked = list(index.nearest(q["lat"], q["lon"]))
+        assert [i for i, _ in walked] == np.argsort(km, kind="stable").tolist()
+        assert np.allclose([d for _, d in walked], np.sort(km), atol=1e-6)
+
+
+def _linear_greedy(budget, total_hours, interests, start_hour=9):
+    """Reference greedy: score every spot on every step."""
+    hour, left, pos, route = start_hour, budget, tour.START_POS, []
+    while True:
+        best, best_score = None, -999
+        for i, spot in enumerate(tour.SPOTS):
+            if spot in route or spot["fee"] > left:
+                continue
+            if hour < spot["open"] or hour + spot["duration"] > spot["close"]:
+                continue
+            if (hour - start_hour) + spot["duration"] > total_hours:
+                continue
+            s = tour.score_spot(spot, pos, interests, left, hour)
+            if s > best_score:
+                best, best_score = spot, s
+        if best is None:
+            return route
+        route.append(best)
+        left -= best["fee"]
+        hour += best["duration"] + tour.TRAVEL_HOURS
+        pos = best
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("matrix_max", [tour.MATRIX_MAX_SPOTS, 0])
+def test_greedy_matches_linear_scan(monkeypatch, seed, matrix_max):
+    # matrix_max=0 sends the same catalog through the spatial index
+    monkeypatch.setattr(tour, "SPOTS", _catalog(seed, 200))
+    monkeypatch.setattr(tour, "MATRIX_MAX_SPOTS", matrix_max)
+    interests = random.Random(seed).sample(tour.ALL_TAGS, 2)
+    route, reasons = tour.greedy_itinerary(1500, 8, interests)
+    assert route and len(reasons) == len(route)
+    assert [s["name"] for s in route] == [s["name"] for s in _linear_greedy(1500, 8, interests)]
@@ -0,0 +1,48 @@
+"""Tag bitmasks against plain set intersection."""
+
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Tourist_Spot_GUI as tour  # noqa: E402
+import tour_tags  # noqa: E402
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_matches_equal_set_intersection(seed):
+    rng = random.Random(seed)
+    spots = [{"tags": rng.sample(tour.ALL_TAGS, rng.randint(0, 4)) + ["not-a-tag"] * rng.randint(0, 1)}
+             for _ in range(50)]
+    interests = rng.sample(tour.ALL_TAGS, rng.randint(1, 4))
+    expected = [len(set(s["tags"]) & set(interests)) for s in spots]
+    assert tour_tags.tag_masks(spots, tour.ALL_TAGS).matches(interests).tolist() == expected
+    assert tour.count_matches(spots, interests) == sum(expected)
+
+
+def test_encode_decode_round_trip():
+    vocab = [f"t{i}" for i in range(tour_tags.MAX_TAGS)]
+    bits = tour_tags.tag_bits(vocab)
+    rng = random.Random(0)
+    for _ in range(100):
+        tags = sorted(rng.sample(vocab, rng.randint(0, 10)), key=vocab.index)
+        assert tour_tags.decode(tour_tags.encode(tags, bits), vocab) == tags
+    with pytest.raises(ValueError):
+        tour_tags.tag_bits(vocab + ["one too many"])
+
+
+def test_popcount():
+    rng = np.random.default_rng(0)
+    masks = rng.integers(0, 2 ** 63, 200, dtype=np.uint64) | np.uint64(1 << 63)
+    assert tour_tags.popcount(masks).tolist() == [bin(int(m)).count("1") for m in masks]
+    assert tour_tags.popcount([0]).tolist() == [0]
+
+
+def test_popcount_fallback_without_bitwise_count(monkeypatch):
+    masks = np.array([0, 1, 2 ** 64 - 1, 0b1011], dtype=np.uint64)
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    assert tour_tags.popcount(masks).tolist() == [0, 1, 64, 3]
@@ -0,0 +1,53 @@
+"""Exact itinerary solvers against the brute force on small catalogs."""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Tourist_Spot_GUI as tour  # noqa: E402
+
+
+def _catalog(seed, n=6):
+    """Random spots with the real tag vocabulary, fees and opening hours."""
+    rng = random.Random(seed)
+    return [{"name": f"Spot {i}", "lat": 27.7 + rng.uniform(-0.05, 0.05),
+             "lon": 85.3 + rng.uniform(-0.05, 0.05), "fee": rng.choice([0, 50, 100, 200, 400, 700]),
+             "open": rng.randint(6, 11), "close": rng.randint(14, 20),
+             "tags": rng.sample(tour.ALL_TAGS, rng.randint(1, 2)),
+             "duration": rng.choice([0.5, 1.0, 1.5, 2.0])} for i in range(n)]
+
+
+def _score(route, interests):
+    return tour.count_matches(route, interests), len(route)
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("budget, hours", [(300, 4), (800, 6), (5000, 12)])
+def test_exact_solvers_match_brute_force(monkeypatch, seed, budget, hours):
+    monkeypatch.setattr(tour, "SPOTS", _catalog(seed))
+    interests = random.Random(seed).sample(tour.ALL_TAGS, 2)
+    best = _score(tour.brute_force_itinerary(budget, hours, interests), interests)
+    for solver in (tour.held_karp_itinerary, tour.branch_and_bound_itinerary):
+        route = solver(budget, hours, interests)
+        assert _score(route, interests) == best, solver.__name__
+        assert sum(s["fee"] for s in route) <= budget
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_branch_and_bound_agrees_with_held_karp_beyond_brute_force(seed):
+    spots = _catalog(100 + seed, n=14)
+    interests = random.Random(seed).sample(tour.ALL_TAGS, 2)
+    stats = {}
+    bnb = tour.branch_and_bound_itinerary(2000, 10, interests, spots=spots, stats=stats)
+    held_karp = tour.held_karp_itinerary(2000, 10, interests, spots=spots)
+    assert _score(bnb, interests) == _score(held_karp, interests)
+    # Prefixes are shared and cut: far fewer nodes than 14! orderings
+    assert stats["pruned"] > 0 and stats["expanded"] < 10 ** 6
+    clock = 9
+    for s in bnb:
+        assert s["open"] <= clock and clock + s["duration"] <= s["close"]
+        clock += s["duration"] + tour.TRAVEL_HOURS
@@ -0,0 +1,70 @@
+"""
+Distance matrix for the Tourist Spot Optimizer.
+Great-circle (haversine) distances between every pair of spots, plus an
+optional start position, computed once per catalog with NumPy. Matrices
+are cached by catalog contents (coordinates in order) and start, so the
+solvers, reason strings and route chart all read the same numbers
+instead of recomputing them per candidate.
+Required libraries: numpy (installed together with matplotlib)
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+CACHE_SIZE = 8
+MATRIX_MAX_SPOTS = 2000     # larger catalogs use tour_spatial instead of n x n
+
+
+def haversine_km(a, b):
+    """Great-circle distance between two {"lat", "lon"} points (km)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (a["lat"], a["lon"], b["lat"], b["lon"]))
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return float(2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(h)))
+
+
+def pairwise_km(lat, lon):
+    """(n, n) haversine distances for coordinate arrays in degrees."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+class DistanceMatrix:
+    """
+    km[i, j] between catalog spots i and j; with a start position it is
+    row / column `start` (= len(catalog)).
+    """
+
+    def __init__(self, coords, start=None):
+        points = list(coords) + ([start] if start is not None else [])
+        lat = np.array([p[0] for p in points], dtype=float)
+        lon = np.array([p[1] for p in points], dtype=float)
+        self.km = pairwise_km(lat, lon)
+        self.km.setflags(write=False)       # shared through the cache
+        self.n_spots = len(coords)
+        self.start = self.n_spots if start is not None else None
+
+    def route_km(self, indices, from_start=True):
+        """Length of a route through catalog indices (from the start, if any)."""
+        stops = ([self.start] if from_start and self.start is not None else []) + list(indices)
+        return float(self.km[stops[:-1], stops[1:]].sum()) if len(stops) > 1 else 0.0
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _cached(coords, start):
+    return DistanceMatrix(coords, start)
+
+
+def distance_matrix(spots, start=None):
+    """
+    Cached DistanceMatrix for a list of spot dicts and an optional start
+    {"lat", "lon"}. Editing a spot's coordinates gives a new key, so the
+    cache never serves a stale matrix.
+    """
+    coords = tuple((float(s["lat"]), float(s["lon"])) for s in spots)
+    key = (float(start["lat"]), float(start["lon"])) if start is not None else None
+    return _cached(coords, key)
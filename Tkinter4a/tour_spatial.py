@@ -0,0 +1,114 @@
+"""
+Spatial index for the Tourist Spot Optimizer.
+A KD-tree over the spots' positions on the unit sphere (x, y, z). Straight
+-line (chord) distance in 3D grows with great-circle distance, so a
+best-first walk of the tree yields spots in exact order of increasing
+haversine distance from any point, without looking at far-away parts of
+the catalog. Callers stop the walk as soon as nothing further away can
+matter (greedy_itinerary's distance penalty gives that bound), so each
+step only touches a neighbourhood of the current position.
+
+Spots at exactly the same distance come out in catalog order.
+Required libraries: numpy (installed together with matplotlib)
+"""
+
+import heapq
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from tour_distance import EARTH_RADIUS_KM
+
+LEAF_SIZE = 32
+CACHE_SIZE = 4
+_NODE, _POINT = 0, 1        # at equal distance, open boxes before yielding points
+
+
+def unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord_sq):
+    """Squared chord(s) on the unit sphere -> great-circle km."""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.sqrt(chord_sq) / 2, 1.0))
+
+
+def _box_km(gap):
+    """Lower bound in km from the per-axis gaps to a bounding box."""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(math.sqrt(float(gap @ gap)) / 2, 1.0))
+
+
+class SpotIndex:
+    """KD-tree with bounding boxes; nodes live in flat lists."""
+
+    def __init__(self, coords, leaf_size=LEAF_SIZE):
+        coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        self.xyz = unit_vectors(coords[:, 0], coords[:, 1])
+        self.order = np.arange(len(coords))
+        self.lo, self.hi, self.span, self.children = [], [], [], []
+        if len(coords):
+            self._build(leaf_size)
+
+    def __len__(self):
+        return len(self.xyz)
+
+    def _build(self, leaf_size):
+        stack = [(self._new_node(0, len(self.order)), 0, len(self.order))]
+        while stack:
+            node, start, end = stack.pop()
+            if end - start <= leaf_size:
+                continue
+            ids = self.order[start:end]
+            dim = int((self.hi[node] - self.lo[node]).argmax())
+            mid = (end - start) // 2
+            self.order[start:end] = ids[np.argpartition(self.xyz[ids, dim], mid)]
+            left = self._new_node(start, start + mid)
+            right = self._new_node(start + mid, end)
+            self.children[node] = (left, right)
+            stack += [(left, start, start + mid), (right, start + mid, end)]
+
+    def _new_node(self, start, end):
+        pts = self.xyz[self.order[start:end]]
+        self.lo.append(pts.min(axis=0))
+        self.hi.append(pts.max(axis=0))
+        self.span.append((start, end))
+        self.children.append(None)
+        return len(self.span) - 1
+
+    def _box_km(self, node, q):
+        return _box_km(np.maximum(np.maximum(self.lo[node] - q, q - self.hi[node]), 0.0))
+
+    def nearest(self, lat, lon):
+        """Yield (catalog index, km) from (lat, lon), nearest first."""
+        if not len(self):
+            return
+        q = unit_vectors(np.array([lat]), np.array([lon]))[0]
+        heap = [(self._box_km(0, q), _NODE, 0)]
+        while heap:
+            km, kind, item = heapq.heappop(heap)
+            if kind == _POINT:
+                yield item, km
+                continue
+            children = self.children[item]
+            if children is None:
+                start, end = self.span[item]
+                ids = self.order[start:end]
+                diff = self.xyz[ids] - q
+                kms = chord_to_km(np.einsum("ij,ij->i", diff, diff))
+                for entry in zip(kms.tolist(), [_POINT] * len(ids), ids.tolist()):
+                    heapq.heappush(heap, entry)
+            else:
+                for child in children:
+                    heapq.heappush(heap, (self._box_km(child, q), _NODE, child))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _cached(coords):
+    return SpotIndex(coords)
+
+
+def spot_index(spots):
+    """Cached SpotIndex for a list of spot dicts (keyed by coordinates)."""
+    return _cached(tuple((float(s["lat"]), float(s["lon"])) for s in spots))
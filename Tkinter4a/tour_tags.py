@@ -0,0 +1,76 @@
+"""
+Tag bitmasks for the Tourist Spot Optimizer.
+Each tag in the vocabulary (ALL_TAGS) gets one bit, so a spot's tags and
+the user's interests are single integers and "how many interests does
+this spot match" is popcount(tags & interests). Catalog masks are built
+once per catalog (cached by its tags, in order) as a NumPy array, so all
+spots can be matched against the interests in one vectorized step.
+Tags outside the vocabulary have no bit and never match.
+Required libraries: numpy (installed together with matplotlib)
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+CACHE_SIZE = 8
+MAX_TAGS = 64               # one uint64 per spot
+
+
+def tag_bits(vocab):
+    """{tag: bit} for a vocabulary of at most MAX_TAGS tags."""
+    if len(vocab) > MAX_TAGS:
+        raise ValueError(f"at most {MAX_TAGS} tags can be encoded, got {len(vocab)}")
+    return {tag: 1 << i for i, tag in enumerate(vocab)}
+
+
+def encode(tags, bits):
+    """Bitmask of the known tags in `tags`."""
+    mask = 0
+    for tag in tags:
+        mask |= bits.get(tag, 0)
+    return mask
+
+
+def decode(mask, vocab):
+    """Tags whose bits are set in `mask`, in vocabulary order."""
+    return [tag for i, tag in enumerate(vocab) if mask >> i & 1]
+
+
+def popcount(masks):
+    """Set bits per element of a uint64 array."""
+    masks = np.asarray(masks, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):        # NumPy 2.0+
+        return np.bitwise_count(masks).astype(int)
+    count = np.zeros(masks.shape, dtype=int)
+    while masks.any():
+        count += (masks & np.uint64(1)).astype(int)
+        masks = masks >> np.uint64(1)
+    return count
+
+
+class TagMasks:
+    """One uint64 tag mask per catalog spot, against a fixed vocabulary."""
+
+    def __init__(self, tag_lists, vocab):
+        self.vocab = tuple(vocab)
+        self.bits = tag_bits(self.vocab)
+        self.masks = np.array([encode(tags, self.bits) for tags in tag_lists], dtype=np.uint64)
+        self.masks.setflags(write=False)    # shared through the cache
+
+    def interest_mask(self, interests):
+        return encode(interests, self.bits)
+
+    def matches(self, interests):
+        """Interest matches for every spot, as an int array."""
+        return popcount(self.masks & np.uint64(self.interest_mask(interests)))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _cached(tag_lists, vocab):
+    return TagMasks(tag_lists, vocab)
+
+
+def tag_masks(spots, vocab):
+    """Cached TagMasks for a list of spot dicts (keyed by their tags)."""
+    return _cached(tuple(tuple(s["tags"]) for s in spots), tuple(vocab))